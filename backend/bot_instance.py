@@ -9,6 +9,7 @@ Fecha: 21/01/2026
 Versión: 2.0.0
 """
 
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -16,6 +17,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
+    Application,
     ApplicationBuilder,
     CallbackQueryHandler,
     CommandHandler,
@@ -24,12 +26,35 @@ from telegram.ext import (
     filters,
 )
 
+from db_async import cerrar_pool
 from db_manager import (
+    CLAVE_SUPABASE,
     inicializar_supabase,
-    get_resumen_financiero,
-    get_dolar_blue,
-    get_clientes_activos,
-    verificar_conexion_supabase
+    obtener_supabase,
+    get_resumen_financiero_async,
+    get_clientes_activos
+)
+from cotizacion_dolar import obtener_cotizacion_blue, servicio_cotizacion
+from cache_pantallas import PANTALLA_RESUMEN, Pantalla, cache_pantallas
+from health_monitor import monitor_salud
+from recordatorios import construir_mensaje_cobros, servicio_recordatorios
+from callback_router import (
+    BORRAR_COSTO,
+    BORRAR_INGRESO,
+    CLIENTE_PAGO,
+    CONFIRMAR_BORRAR_COSTO,
+    CONFIRMAR_BORRAR_INGRESO,
+    EDITAR_CLIENTE,
+    EDITAR_COSTO,
+    EDITAR_ESTADO,
+    EDITAR_FEE,
+    EDITAR_MONTO_COSTO,
+    EDITAR_NOMBRE_COSTO,
+    NUEVO_COSTO_TIPO,
+    SET_ESTADO,
+    TOGGLE_COMISION,
+    VER_CLIENTES_PAGINA,
+    RouterCallbacks,
 )
 from handlers_costos import (
     handler_gestionar_costos,
@@ -55,6 +80,7 @@ from handlers_ingresos import (
     procesar_monto_pago
 )
 from handlers_clientes import (
+    obtener_pantalla_clientes,
     handler_ver_clientes,
     handler_editar_cliente,
     handler_edit_estado,
@@ -63,13 +89,17 @@ from handlers_clientes import (
     handler_toggle_comision,
     procesar_nuevo_fee
 )
-from utils import formato_argentino
+from utils import formato_argentino, nombre_periodo, periodo_actual
 
 
 # ============================================================================
 # CONFIGURACIÓN
 # ============================================================================
 
+# .env en la raíz del proyecto
+ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+
+
 def obtener_token_telegram() -> str:
     """
     Obtiene el token de Telegram desde las variables de entorno.
@@ -77,11 +107,6 @@ def obtener_token_telegram() -> str:
     Returns:
         str: Token de Telegram
     """
-    # Obtener ruta del .env
-    SCRIPT_DIR = Path(__file__).resolve().parent
-    ROOT_DIR = SCRIPT_DIR.parent
-    ENV_PATH = ROOT_DIR / '.env'
-    
     print(f"📁 Cargando .env desde: {ENV_PATH}")
     
     if ENV_PATH.exists():
@@ -103,6 +128,117 @@ def obtener_token_telegram() -> str:
     return TELEGRAM_TOKEN
 
 
+# ============================================================================
+# MENSAJES
+# ============================================================================
+
+def construir_mensaje_resumen(resumen: dict, dolar_mercado: float) -> str:
+    """
+    Arma el mensaje de estado de resultados de un periodo.
+    
+    Args:
+        resumen: Resultado de get_resumen_financiero
+        dolar_mercado: Cotización de venta del dólar blue
+    
+    Returns:
+        str: Mensaje en formato Markdown
+    """
+    if 'error' in resumen:
+        return f"""
+❌ *ERROR AL CONSULTAR DATOS*
+
+No se pudo obtener el resumen financiero.
+
+*Detalle del error:*
+`{resumen['error']}`
+"""
+    
+    total_ars = resumen['total_ars']
+    total_usd = resumen['total_usd']
+    total_costos = resumen['total_costos']
+    dolar_conversion = resumen.get('dolar_conversion_costos', 1500.0)
+    
+    utilidad_neta_usdt = total_usd - total_costos
+    pesos_en_usdt = total_ars / dolar_mercado
+    
+    ars_fmt = formato_argentino(total_ars).split(',')[0]
+    usd_fmt = formato_argentino(total_usd)
+    costos_fmt = formato_argentino(total_costos)
+    neto_fmt = formato_argentino(utilidad_neta_usdt)
+    dolar_blue_fmt = formato_argentino(dolar_mercado)
+    dolar_conversion_fmt = formato_argentino(dolar_conversion)
+    pesos_en_usd_fmt = formato_argentino(pesos_en_usdt)
+    
+    return f"""
+🚀 *ESTADO DE RESULTADOS - {nombre_periodo(resumen['periodo'])}*
+
+📈 **INGRESOS:**
+💰 Ingresos ARS: ${ars_fmt}
+💵 Ingresos USD: ${usd_fmt}
+
+📉 **EGRESOS:**
+💸 Costos USD: ${costos_fmt}
+
+---
+💎 **UTILIDAD NETA (USDT):** ${neto_fmt}
+---
+
+ℹ️ *Datos adicionales:*
+🏦 Dólar Blue (Ingresos): ${dolar_blue_fmt}
+💱 Dólar Conversión (Costos): ${dolar_conversion_fmt}
+🪙 Equivalente Pesos: ${pesos_en_usd_fmt} USDT
+   _(Si los cambiaras hoy)_
+"""
+
+
+def linea_estado_supabase() -> str:
+    """
+    Estado de Supabase según la última verificación del monitor de salud (sin consultar).
+    """
+    conexion_ok = monitor_salud.ok('supabase')
+    if conexion_ok is None:
+        return "⏳ Supabase: Verificando..."
+    return "✅ Supabase: Conectado" if conexion_ok else "❌ Supabase: Error de conexión"
+
+
+async def construir_pantalla_resumen(supabase, periodo: str) -> Pantalla:
+    """
+    Arma el resumen financiero del período con el botón de volver.
+    
+    Args:
+        supabase: Cliente de Supabase
+        periodo: Período en formato MM-YYYY
+    
+    Returns:
+        Pantalla: (mensaje, reply_markup, cacheable)
+    """
+    # Resumen y cotización en paralelo: la espera es la de la consulta más lenta
+    resumen, cotizacion_dolar = await asyncio.gather(
+        get_resumen_financiero_async(supabase, periodo),
+        obtener_cotizacion_blue()
+    )
+    
+    if 'error' in cotizacion_dolar:
+        dolar_mercado = 1500.0
+    else:
+        dolar_mercado = cotizacion_dolar['venta']
+    
+    mensaje = construir_mensaje_resumen(resumen, dolar_mercado)
+    
+    keyboard = [[InlineKeyboardButton("🔙 Volver al Menú", callback_data='menu_principal')]]
+    return Pantalla(mensaje, InlineKeyboardMarkup(keyboard), cacheable='error' not in resumen)
+
+
+async def obtener_pantalla_resumen(supabase, periodo: str) -> Pantalla:
+    """
+    Resumen del período desde la caché de pantallas (se arma solo si hubo cambios).
+    """
+    return await cache_pantallas.obtener(
+        (PANTALLA_RESUMEN, periodo),
+        lambda: construir_pantalla_resumen(supabase, periodo)
+    )
+
+
 # ============================================================================
 # COMANDOS
 # ============================================================================
@@ -113,9 +249,6 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     user = update.effective_user
     
-    supabase = inicializar_supabase()
-    conexion_ok = verificar_conexion_supabase(supabase)
-    
     mensaje = f"""
 🚀 **BLACK INFRASTRUCTURE SYSTEM**
 
@@ -125,14 +258,14 @@ Sistema operativo y conectado.
 
 **Estado del Sistema:**
 ✅ Bot de Telegram: Activo
-{"✅ Supabase: Conectado" if conexion_ok else "❌ Supabase: Error de conexión"}
+{linea_estado_supabase()}
 
 ---
 Selecciona una opción del menú:
 """
     
     keyboard = [
-        [InlineKeyboardButton("📊 Resumen Enero", callback_data='ver_resumen')],
+        [InlineKeyboardButton("📊 Resumen del Mes", callback_data='ver_resumen')],
         [InlineKeyboardButton("📥 Nuevo Pago", callback_data='nuevo_pago')],
         [InlineKeyboardButton("💸 Nuevo Costo", callback_data='nuevo_costo')],
         [InlineKeyboardButton("👥 Ver Clientes", callback_data='ver_clientes')],
@@ -148,144 +281,51 @@ async def resumen_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Handler para el comando /resumen - Muestra resumen financiero.
     """
-    mensaje_procesando = await update.message.reply_text("⏳ Consultando datos de Enero 2026...")
+    periodo = periodo_actual()
+    mensaje_procesando = await update.message.reply_text(
+        f"⏳ Consultando datos de {nombre_periodo(periodo).title()}..."
+    )
     
-    supabase = inicializar_supabase()
-    resumen = get_resumen_financiero(supabase)
+    supabase = obtener_supabase(context)
+    pantalla = await obtener_pantalla_resumen(supabase, periodo)
     
-    cotizacion_dolar = get_dolar_blue()
-    if 'error' in cotizacion_dolar:
-        dolar_mercado = 1500.0
-    else:
-        dolar_mercado = cotizacion_dolar['venta']
-    
-    if 'error' in resumen:
-        mensaje = f"""
-❌ *ERROR AL CONSULTAR DATOS*
-
-No se pudo obtener el resumen financiero.
-
-*Detalle del error:*
-`{resumen['error']}`
-"""
-    else:
-        total_ars = resumen['total_ars']
-        total_usd = resumen['total_usd']
-        total_costos = resumen['total_costos']
-        dolar_conversion = resumen.get('dolar_conversion_costos', 1500.0)
-        
-        utilidad_neta_usdt = total_usd - total_costos
-        pesos_en_usdt = total_ars / dolar_mercado
-        
-        ars_fmt = formato_argentino(total_ars).split(',')[0]
-        usd_fmt = formato_argentino(total_usd)
-        costos_fmt = formato_argentino(total_costos)
-        neto_fmt = formato_argentino(utilidad_neta_usdt)
-        dolar_blue_fmt = formato_argentino(dolar_mercado)
-        dolar_conversion_fmt = formato_argentino(dolar_conversion)
-        pesos_en_usd_fmt = formato_argentino(pesos_en_usdt)
-        
-        mensaje = f"""
-🚀 *ESTADO DE RESULTADOS - ENERO 2026*
-
-📈 **INGRESOS:**
-💰 Ingresos ARS: ${ars_fmt}
-💵 Ingresos USD: ${usd_fmt}
-
-📉 **EGRESOS:**
-💸 Costos USD: ${costos_fmt}
+    await mensaje_procesando.edit_text(pantalla.mensaje, parse_mode='Markdown')
 
----
-💎 **UTILIDAD NETA (USDT):** ${neto_fmt}
----
 
-ℹ️ *Datos adicionales:*
-🏦 Dólar Blue (Ingresos): ${dolar_blue_fmt}
-💱 Dólar Conversión (Costos): ${dolar_conversion_fmt}
-🪙 Equivalente Pesos: ${pesos_en_usd_fmt} USDT
-   _(Si los cambiaras hoy)_
-"""
+async def cobros_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Handler para el comando /cobros - Vencimientos de los próximos 7 días.
+    """
+    supabase = obtener_supabase(context)
+    datos = await servicio_recordatorios.cobros_semana(supabase)
     
-    await mensaje_procesando.edit_text(mensaje, parse_mode='Markdown')
+    await update.message.reply_text(construir_mensaje_cobros(datos), parse_mode='Markdown')
 
 
 async def clientes_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Handler para el comando /clientes - Gestión de clientes con edición.
     """
-    from handlers_clientes import get_todos_clientes
-    
     mensaje_procesando = await update.message.reply_text("⏳ Consultando clientes...")
     
-    supabase = inicializar_supabase()
-    clientes = get_todos_clientes(supabase)
+    supabase = obtener_supabase(context)
+    pantalla = await obtener_pantalla_clientes(supabase)
     
-    if isinstance(clientes, dict) and 'error' in clientes:
-        mensaje = f"❌ **ERROR**\n\n`{clientes['error']}`"
-        keyboard = []
-    elif not clientes:
-        mensaje = "📋 **GESTIÓN DE CLIENTES**\n\nNo hay clientes en el sistema."
-        keyboard = []
-    else:
-        # Calcular resumen
-        activos = sum(1 for c in clientes if c.get('estado') == 'Activo')
-        con_comision = sum(1 for c in clientes if c.get('estado') == 'Activo' and c.get('comisiona_agustin', False))
-        ingresos_proy = sum(float(c.get('fee_mensual', 0) or 0) for c in clientes if c.get('estado') == 'Activo')
-        costo_agustin = con_comision * 55
-        
-        mensaje = f"""
-📋 **GESTIÓN DE CLIENTES**
-
-**Resumen:**
-👥 Total: {len(clientes)}
-✅ Activos: {activos}
-💰 Con comisión: {con_comision}
-💵 Ingresos proyectados: ${ingresos_proy:,.2f} USD
-💸 Costo Agustín: ${costo_agustin:,.2f} USD
-
----
-
-**Selecciona un cliente para editar:**
-"""
-        
-        # Crear botones para cada cliente
-        keyboard = []
-        for cliente in clientes[:10]:  # Limitar a 10
-            nombre = cliente.get('nombre', 'Sin nombre')
-            estado = cliente.get('estado', 'Inactivo')
-            emoji = "✅" if estado == 'Activo' else "⚠️"
-            
-            keyboard.append([
-                InlineKeyboardButton(
-                    f"{emoji} {nombre} ({estado})", 
-                    callback_data=f'editar_cliente_{cliente["id"]}'
-                )
-            ])
-    
-    reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
-    await mensaje_procesando.edit_text(mensaje, parse_mode='Markdown', reply_markup=reply_markup)
+    await mensaje_procesando.edit_text(pantalla.mensaje, parse_mode='Markdown', reply_markup=pantalla.reply_markup)
 
 
 # ============================================================================
 # HANDLER PRINCIPAL DE BOTONES
 # ============================================================================
 
-async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def handler_menu_principal(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
-    Handler central para todos los botones inline (CallbackQuery).
+    Vuelve al menú principal.
     """
     query = update.callback_query
-    await query.answer()
-    
-    callback_data = query.data
-    supabase = inicializar_supabase()
+    user = update.effective_user
     
-    # MENÚ PRINCIPAL
-    if callback_data == 'menu_principal':
-        user = update.effective_user
-        conexion_ok = verificar_conexion_supabase(supabase)
-        
-        mensaje = f"""
+    mensaje = f"""
 🚀 **BLACK INFRASTRUCTURE SYSTEM**
 
 ¡Hola {user.first_name}! 👋
@@ -294,144 +334,103 @@ Sistema operativo y conectado.
 
 **Estado del Sistema:**
 ✅ Bot de Telegram: Activo
-{"✅ Supabase: Conectado" if conexion_ok else "❌ Supabase: Error de conexión"}
+{linea_estado_supabase()}
 
 ---
 Selecciona una opción del menú:
 """
-        
-        keyboard = [
-            [InlineKeyboardButton("📊 Resumen Enero", callback_data='ver_resumen')],
-            [InlineKeyboardButton("📥 Nuevo Pago", callback_data='nuevo_pago')],
-            [InlineKeyboardButton("💸 Nuevo Costo", callback_data='nuevo_costo')],
-            [InlineKeyboardButton("👥 Ver Clientes", callback_data='ver_clientes')],
-            [InlineKeyboardButton("📜 Últimos Movimientos", callback_data='ver_movimientos')],
-            [InlineKeyboardButton("⚙️ Gestionar Costos", callback_data='gestionar_costos')],
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await query.edit_message_text(mensaje, parse_mode='Markdown', reply_markup=reply_markup)
     
-    # VER RESUMEN
-    elif callback_data == 'ver_resumen':
-        await query.edit_message_text("⏳ Consultando datos de Enero 2026...")
-        
-        resumen = get_resumen_financiero(supabase)
-        cotizacion_dolar = get_dolar_blue()
-        
-        if 'error' in cotizacion_dolar:
-            dolar_mercado = 1500.0
-        else:
-            dolar_mercado = cotizacion_dolar['venta']
-        
-        if 'error' in resumen:
-            mensaje = f"❌ *ERROR*\n\n`{resumen['error']}`"
-        else:
-            total_ars = resumen['total_ars']
-            total_usd = resumen['total_usd']
-            total_costos = resumen['total_costos']
-            dolar_conversion = resumen.get('dolar_conversion_costos', 1500.0)
-            utilidad_neta_usdt = total_usd - total_costos
-            pesos_en_usdt = total_ars / dolar_mercado
-            
-            ars_fmt = formato_argentino(total_ars).split(',')[0]
-            usd_fmt = formato_argentino(total_usd)
-            costos_fmt = formato_argentino(total_costos)
-            neto_fmt = formato_argentino(utilidad_neta_usdt)
-            dolar_blue_fmt = formato_argentino(dolar_mercado)
-            dolar_conversion_fmt = formato_argentino(dolar_conversion)
-            pesos_en_usd_fmt = formato_argentino(pesos_en_usdt)
-            
-            mensaje = f"""
-🚀 *ESTADO DE RESULTADOS - ENERO 2026*
-
-📈 **INGRESOS:**
-💰 Ingresos ARS: ${ars_fmt}
-💵 Ingresos USD: ${usd_fmt}
-
-📉 **EGRESOS:**
-💸 Costos USD: ${costos_fmt}
+    keyboard = [
+        [InlineKeyboardButton("📊 Resumen del Mes", callback_data='ver_resumen')],
+        [InlineKeyboardButton("📥 Nuevo Pago", callback_data='nuevo_pago')],
+        [InlineKeyboardButton("💸 Nuevo Costo", callback_data='nuevo_costo')],
+        [InlineKeyboardButton("👥 Ver Clientes", callback_data='ver_clientes')],
+        [InlineKeyboardButton("📜 Últimos Movimientos", callback_data='ver_movimientos')],
+        [InlineKeyboardButton("⚙️ Gestionar Costos", callback_data='gestionar_costos')],
+    ]
+    reply_markup = InlineKeyboardMarkup(keyboard)
+    
+    await query.edit_message_text(mensaje, parse_mode='Markdown', reply_markup=reply_markup)
 
----
-💎 **UTILIDAD NETA (USDT):** ${neto_fmt}
----
 
-ℹ️ *Datos adicionales:*
-🏦 Dólar Blue (Ingresos): ${dolar_blue_fmt}
-💱 Dólar Conversión (Costos): ${dolar_conversion_fmt}
-🪙 Equivalente Pesos: ${pesos_en_usd_fmt} USDT
-   _(Si los cambiaras hoy)_
-"""
-        
-        keyboard = [[InlineKeyboardButton("🔙 Volver al Menú", callback_data='menu_principal')]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await query.edit_message_text(mensaje, parse_mode='Markdown', reply_markup=reply_markup)
-    
-    # VER CLIENTES
-    elif callback_data == 'ver_clientes':
-        await handler_ver_clientes(update, context)
-        return
-        
-        keyboard = [[InlineKeyboardButton("🔙 Volver al Menú", callback_data='menu_principal')]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await query.edit_message_text(mensaje, parse_mode='Markdown', reply_markup=reply_markup)
-    
-    # HANDLERS DE COSTOS
-    elif callback_data == 'gestionar_costos':
-        await handler_gestionar_costos(query, supabase)
-    
-    elif callback_data.startswith('editar_costo_'):
-        await handler_editar_costo(query, supabase)
-    
-    elif callback_data.startswith('edit_nombre_'):
-        await handler_edit_nombre(query, context)
-    
-    elif callback_data.startswith('edit_monto_'):
-        await handler_edit_monto(query, context)
-    
-    elif callback_data.startswith('borrar_costo_'):
-        await handler_borrar_costo(query, supabase)
-    
-    elif callback_data.startswith('confirmar_borrar_costo_'):
-        await handler_confirmar_borrar_costo(query, supabase)
-    
-    elif callback_data == 'nuevo_costo':
-        await handler_nuevo_costo(query, context)
-    
-    elif callback_data.startswith('nuevo_costo_tipo_'):
-        await handler_nuevo_costo_tipo_seleccionado(query, context)
-    
-    # HANDLERS DE INGRESOS
-    elif callback_data == 'nuevo_pago':
-        await handler_nuevo_pago(query, supabase)
-    
-    elif callback_data.startswith('cliente_'):
-        await handler_cliente_seleccionado(query, context, supabase)
-    
-    elif callback_data == 'ver_movimientos':
-        await handler_ver_movimientos(query, supabase)
-    
-    elif callback_data.startswith('borrar_ingreso_'):
-        await handler_borrar_ingreso(query, supabase)
-    
-    elif callback_data.startswith('confirmar_borrar_'):
-        await handler_confirmar_borrar_ingreso(query, supabase)
-    
-    # HANDLERS DE CLIENTES
-    elif callback_data.startswith('editar_cliente_'):
-        await handler_editar_cliente(update, context)
-    
-    elif callback_data.startswith('edit_estado_'):
-        await handler_edit_estado(update, context)
+async def handler_ver_resumen(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Muestra el resumen financiero del mes en curso.
+    """
+    query = update.callback_query
+    supabase = obtener_supabase(context)
     
-    elif callback_data.startswith('set_estado_'):
-        await handler_set_estado(update, context)
+    periodo = periodo_actual()
+    if not cache_pantallas.contiene((PANTALLA_RESUMEN, periodo)):
+        await query.edit_message_text(f"⏳ Consultando datos de {nombre_periodo(periodo).title()}...")
     
-    elif callback_data.startswith('edit_fee_'):
-        await handler_edit_fee(update, context)
+    pantalla = await obtener_pantalla_resumen(supabase, periodo)
+    await query.edit_message_text(pantalla.mensaje, parse_mode='Markdown', reply_markup=pantalla.reply_markup)
+
+
+def _con_query(handler):
+    """Adapta handlers con firma (query, supabase)."""
+    return lambda update, context: handler(update.callback_query, obtener_supabase(context))
+
+
+def _con_query_context(handler):
+    """Adapta handlers con firma (query, context)."""
+    return lambda update, context: handler(update.callback_query, context)
+
+
+def crear_router_callbacks() -> RouterCallbacks:
+    """
+    Registra cada acción de botón con su handler (despacho O(1) por código).
+    """
+    router = RouterCallbacks()
+    
+    # Menú
+    router.registrar('menu_principal', handler_menu_principal)
+    router.registrar('ver_resumen', handler_ver_resumen)
+    router.registrar('ver_clientes', handler_ver_clientes)
+    router.registrar(VER_CLIENTES_PAGINA, handler_ver_clientes)
+    
+    # Costos
+    router.registrar('gestionar_costos', _con_query(handler_gestionar_costos))
+    router.registrar('nuevo_costo', _con_query_context(handler_nuevo_costo))
+    router.registrar(EDITAR_COSTO, _con_query(handler_editar_costo))
+    router.registrar(EDITAR_NOMBRE_COSTO, _con_query_context(handler_edit_nombre))
+    router.registrar(EDITAR_MONTO_COSTO, _con_query_context(handler_edit_monto))
+    router.registrar(BORRAR_COSTO, _con_query(handler_borrar_costo))
+    router.registrar(CONFIRMAR_BORRAR_COSTO, _con_query(handler_confirmar_borrar_costo))
+    router.registrar(NUEVO_COSTO_TIPO, _con_query_context(handler_nuevo_costo_tipo_seleccionado))
+    
+    # Ingresos
+    router.registrar('nuevo_pago', _con_query(handler_nuevo_pago))
+    router.registrar('ver_movimientos', _con_query(handler_ver_movimientos))
+    router.registrar(
+        CLIENTE_PAGO,
+        lambda update, context: handler_cliente_seleccionado(update.callback_query, context, obtener_supabase(context))
+    )
+    router.registrar(BORRAR_INGRESO, _con_query(handler_borrar_ingreso))
+    router.registrar(CONFIRMAR_BORRAR_INGRESO, _con_query(handler_confirmar_borrar_ingreso))
+    
+    # Clientes
+    router.registrar(EDITAR_CLIENTE, handler_editar_cliente)
+    router.registrar(EDITAR_ESTADO, handler_edit_estado)
+    router.registrar(SET_ESTADO, handler_set_estado)
+    router.registrar(EDITAR_FEE, handler_edit_fee)
+    router.registrar(TOGGLE_COMISION, handler_toggle_comision)
+    
+    return router
+
+
+router_callbacks = crear_router_callbacks()
+
+
+async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Handler central para todos los botones inline (CallbackQuery).
+    """
+    query = update.callback_query
+    await query.answer()
     
-    elif callback_data.startswith('toggle_comision_'):
-        await handler_toggle_comision(update, context)
+    await router_callbacks.despachar(update, context)
 
 
 # ============================================================================
@@ -442,7 +441,7 @@ async def procesar_texto_usuario(update: Update, context: ContextTypes.DEFAULT_T
     """
     Procesa mensajes de texto del usuario para diferentes flujos.
     """
-    supabase = inicializar_supabase()
+    supabase = obtener_supabase(context)
     
     if context.user_data.get('esperando_monto'):
         await procesar_monto_pago(update, context, supabase)
@@ -477,41 +476,92 @@ async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
 
 
+# ============================================================================
+# CICLO DE VIDA
+# ============================================================================
+
+async def post_init(application):
+    """
+    Al iniciar el bot: lanza el monitor de salud (Supabase / PST.NET) y los recordatorios de cobro.
+    """
+    await monitor_salud.iniciar(application.bot_data[CLAVE_SUPABASE])
+    await servicio_recordatorios.iniciar(application.bot, application.bot_data[CLAVE_SUPABASE])
+
+
+async def post_shutdown(application):
+    """
+    Al detener el bot: frena el monitor y los recordatorios, espera las consultas en curso y libera el pool de hilos.
+    """
+    await monitor_salud.detener()
+    await servicio_recordatorios.detener()
+    cerrar_pool()
+
+
+def crear_aplicacion(token: str, supabase, webhook: bool = False) -> Application:
+    """
+    Construye la aplicación del bot con todos los handlers registrados.
+    
+    Args:
+        token: Token de Telegram
+        supabase: Cliente único de Supabase compartido por los handlers
+        webhook: Si es True, se arma sin Updater (los updates los entrega
+                 la ruta /telegram/webhook de la API, ver bot_webhook.py)
+    
+    Returns:
+        Application: Aplicación lista para run_polling() o initialize()/start()
+    """
+    servicio_cotizacion.configurar_supabase(supabase)
+    
+    builder = ApplicationBuilder().token(token).post_init(post_init).post_shutdown(post_shutdown)
+    if webhook:
+        builder = builder.updater(None)
+    
+    application = builder.build()
+    application.bot_data[CLAVE_SUPABASE] = supabase
+    
+    # Registrar handlers de comandos
+    application.add_handler(CommandHandler("start", start_command))
+    application.add_handler(CommandHandler("resumen", resumen_command))
+    application.add_handler(CommandHandler("clientes", clientes_command))
+    application.add_handler(CommandHandler("cobros", cobros_command))
+    
+    # Registrar handler de botones
+    application.add_handler(CallbackQueryHandler(button_handler))
+    
+    # Registrar handler de mensajes de texto
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, procesar_texto_usuario))
+    
+    # Registrar handler de errores
+    application.add_error_handler(error_handler)
+    
+    return application
+
+
 # ============================================================================
 # FUNCIÓN PRINCIPAL
 # ============================================================================
 
 def main():
     """
-    Función principal que inicia el bot.
+    Función principal que inicia el bot (modo polling).
     """
     print("\n" + "="*70)
     print("🤖 INICIANDO BOT DE TELEGRAM - SISTEMA BLACK v2.0")
     print("="*70 + "\n")
     
+    # BOT_MODO puede venir solo del .env: cargarlo antes de decidir el modo
+    load_dotenv(ENV_PATH)
+    if os.getenv("BOT_MODO", "polling").strip().strip('"').strip("'").lower() == "webhook":
+        print("⚠️  BOT_MODO=webhook: el bot lo atiende la API (uvicorn main:app), no se inicia polling")
+        return
+    
     try:
         # Obtener token
         TELEGRAM_TOKEN = obtener_token_telegram()
         
-        # Inicializar Supabase
+        # Inicializar Supabase (un único cliente para todos los handlers)
         supabase = inicializar_supabase()
-        
-        # Crear aplicación
-        application = ApplicationBuilder().token(TELEGRAM_TOKEN).build()
-        
-        # Registrar handlers de comandos
-        application.add_handler(CommandHandler("start", start_command))
-        application.add_handler(CommandHandler("resumen", resumen_command))
-        application.add_handler(CommandHandler("clientes", clientes_command))
-        
-        # Registrar handler de botones
-        application.add_handler(CallbackQueryHandler(button_handler))
-        
-        # Registrar handler de mensajes de texto
-        application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, procesar_texto_usuario))
-        
-        # Registrar handler de errores
-        application.add_error_handler(error_handler)
+        application = crear_aplicacion(TELEGRAM_TOKEN, supabase)
         
         print("✅ Bot configurado correctamente")
         print("📡 Esperando mensajes...\n")
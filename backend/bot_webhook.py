@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+BLACK INFRASTRUCTURE - BOT EN MODO WEBHOOK
+===========================================
+Con BOT_MODO=webhook el bot no corre como proceso aparte con polling:
+Telegram envía cada update a POST /telegram/webhook de la API (main.py) y
+la ruta lo encola en el update_queue de la Application. Un solo proceso
+atiende API y bot, y los updates llegan al instante.
+
+VARIABLES:
+- BOT_MODO=webhook           → activa el modo (default: polling, bot_instance.py)
+- TELEGRAM_TOKEN             → token del bot
+- TELEGRAM_WEBHOOK_SECRET    → obligatorio; Telegram lo manda en el header
+                               X-Telegram-Bot-Api-Secret-Token (A-Z a-z 0-9 _ -)
+- TELEGRAM_WEBHOOK_URL       → URL pública de la API (ej: https://api.onrender.com).
+                               Si falta, no se registra el webhook en Telegram:
+                               sirve para probar localmente con updates simulados.
+
+PRUEBA LOCAL:
+    BOT_MODO=webhook TELEGRAM_WEBHOOK_SECRET=prueba uvicorn main:app
+    python bot_webhook.py --simular "/start" --chat-id <tu_chat_id>
+
+Autor: Senior Backend Developer
+Fecha: 19/10/2026
+Versión: 1.0.0
+"""
+
+import argparse
+import hmac
+import os
+import time
+
+from telegram import Update
+
+from bot_instance import crear_aplicacion
+
+
+RUTA_WEBHOOK = '/telegram/webhook'
+HEADER_SECRETO = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+def _env(nombre: str) -> str:
+    return os.getenv(nombre, "").strip().strip('"').strip("'")
+
+
+def webhook_activo() -> bool:
+    """
+    Indica si la API debe atender al bot (BOT_MODO=webhook).
+    """
+    return _env("BOT_MODO").lower() == "webhook"
+
+
+# Aplicación del bot levantada dentro de la API
+_application = None
+
+
+# ============================================================================
+# CICLO DE VIDA (startup / shutdown de FastAPI)
+# ============================================================================
+
+async def iniciar_bot_webhook(supabase):
+    """
+    Construye e inicia la Application sin Updater y registra el webhook.
+
+    Args:
+        supabase: Cliente de Supabase de la API (el bot no carga credenciales propias)
+
+    Raises:
+        Exception: Si faltan TELEGRAM_TOKEN o TELEGRAM_WEBHOOK_SECRET
+    """
+    global _application
+
+    token = _env("TELEGRAM_TOKEN")
+    secreto = _env("TELEGRAM_WEBHOOK_SECRET")
+    url_publica = _env("TELEGRAM_WEBHOOK_URL").rstrip('/')
+
+    if not token:
+        raise Exception("TELEGRAM_TOKEN no está definido")
+    if not secreto:
+        raise Exception("TELEGRAM_WEBHOOK_SECRET es obligatorio en modo webhook")
+
+    print("🤖 Iniciando bot en modo webhook...")
+
+    application = crear_aplicacion(token, supabase, webhook=True)
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    await application.start()
+
+    if url_publica:
+        await application.bot.set_webhook(
+            url=f"{url_publica}{RUTA_WEBHOOK}",
+            secret_token=secreto,
+            allowed_updates=Update.ALL_TYPES
+        )
+        print(f"✅ Webhook registrado en {url_publica}{RUTA_WEBHOOK}")
+    else:
+        print("⚠️ TELEGRAM_WEBHOOK_URL no definido: webhook sin registrar (modo simulación local)")
+
+    _application = application
+
+
+async def detener_bot_webhook():
+    """
+    Detiene la Application (procesa lo encolado) y libera recursos.
+
+    El webhook queda registrado en Telegram: los updates que lleguen durante
+    un redeploy se reintentan contra la nueva instancia.
+    """
+    global _application
+
+    if _application is None:
+        return
+
+    application, _application = _application, None
+
+    await application.stop()
+    if application.post_shutdown:
+        await application.post_shutdown(application)
+    await application.shutdown()
+    print("🛑 Bot en modo webhook detenido")
+
+
+# ============================================================================
+# RECEPCIÓN DE UPDATES
+# ============================================================================
+
+def secreto_valido(secreto_recibido: str) -> bool:
+    """
+    Compara el header de Telegram con TELEGRAM_WEBHOOK_SECRET (tiempo constante).
+    """
+    secreto = _env("TELEGRAM_WEBHOOK_SECRET")
+    return bool(secreto) and hmac.compare_digest(secreto, secreto_recibido or "")
+
+
+async def encolar_update(payload: dict) -> bool:
+    """
+    Convierte el JSON recibido en Update y lo deja en el update_queue.
+
+    Los handlers corren en la Application: la ruta responde sin esperarlos.
+
+    Args:
+        payload: Cuerpo del POST de Telegram
+
+    Returns:
+        bool: False si el bot no está iniciado
+    """
+    if _application is None:
+        return False
+
+    update = Update.de_json(payload, _application.bot)
+    await _application.update_queue.put(update)
+    return True
+
+
+# ============================================================================
+# SIMULACIÓN LOCAL
+# ============================================================================
+
+def construir_update_simulado(texto: str, chat_id: int, update_id: int = None) -> dict:
+    """
+    Arma el JSON de un mensaje de texto como lo enviaría Telegram.
+
+    Args:
+        texto: Texto del mensaje (ej: "/start", "/resumen")
+        chat_id: Chat privado al que responderá el bot
+        update_id: Id del update (default: derivado de la hora)
+
+    Returns:
+        dict: Payload de un Update con message
+    """
+    ahora = int(time.time())
+    usuario = {'id': chat_id, 'is_bot': False, 'first_name': 'Simulado'}
+    mensaje = {
+        'message_id': ahora % 1_000_000,
+        'date': ahora,
+        'chat': {'id': chat_id, 'type': 'private', 'first_name': 'Simulado'},
+        'from': usuario,
+        'text': texto
+    }
+
+    if texto.startswith('/'):
+        mensaje['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(texto.split()[0])}]
+
+    return {'update_id': update_id or ahora, 'message': mensaje}
+
+
+if __name__ == "__main__":
+    import requests
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Envía un update simulado a /telegram/webhook")
+    parser.add_argument('--simular', default='/start', help="Texto del mensaje (default: /start)")
+    parser.add_argument('--chat-id', type=int, required=True, help="Chat al que responderá el bot")
+    parser.add_argument('--url', default=f"http://localhost:{os.getenv('PORT', '8000')}", help="URL base de la API")
+    args = parser.parse_args()
+
+    payload = construir_update_simulado(args.simular, args.chat_id)
+    print(f"\n🧪 Enviando update simulado '{args.simular}' a {args.url}{RUTA_WEBHOOK}\n")
+
+    response = requests.post(
+        f"{args.url}{RUTA_WEBHOOK}",
+        json=payload,
+        headers={HEADER_SECRETO: _env("TELEGRAM_WEBHOOK_SECRET")},
+        timeout=10
+    )
+    print(f"📡 {response.status_code}: {response.text}")
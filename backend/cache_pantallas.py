@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+BLACK INFRASTRUCTURE - CACHÉ DE PANTALLAS DEL BOT
+==================================================
+Guarda el mensaje y el teclado ya armados de las pantallas de solo
+lectura (resumen, costos, clientes, movimientos), por pantalla y
+parámetros. Navegar de nuevo a una pantalla sin cambios no consulta la
+base.
+
+Los handlers de escritura invalidan las pantallas afectadas con
+invalidar_por('ingresos' | 'costos' | 'clientes'). Además cada entrada
+vence a los PANTALLAS_CACHE_TTL segundos (default 300) para reflejar
+cambios hechos fuera del bot (webapp, migraciones).
+
+USO:
+    from cache_pantallas import PANTALLA_COSTOS, Pantalla, cache_pantallas
+
+    pantalla = await cache_pantallas.obtener((PANTALLA_COSTOS,), lambda: construir_pantalla_costos(supabase))
+    cache_pantallas.invalidar_por('costos')
+
+Autor: Senior Backend Developer
+Fecha: 19/10/2026
+Versión: 1.0.0
+"""
+
+import os
+import threading
+import time
+from collections import namedtuple
+
+
+# Segundos que una pantalla armada se considera vigente
+TTL_PANTALLAS = int(os.getenv('PANTALLAS_CACHE_TTL', '300'))
+
+# Pantallas cacheables (primer elemento de la clave)
+PANTALLA_RESUMEN = 'resumen'
+PANTALLA_COSTOS = 'costos'
+PANTALLA_CLIENTES = 'clientes'
+PANTALLA_MOVIMIENTOS = 'movimientos'
+
+# Qué pantallas muestran datos de cada tabla
+DEPENDENCIAS = {
+    'ingresos': (PANTALLA_RESUMEN, PANTALLA_MOVIMIENTOS),
+    'costos': (PANTALLA_RESUMEN, PANTALLA_COSTOS),
+    # Estado / comisión cambian el costo de Agustín y los nombres en movimientos
+    'clientes': (PANTALLA_RESUMEN, PANTALLA_COSTOS, PANTALLA_CLIENTES, PANTALLA_MOVIMIENTOS),
+}
+
+# Resultado de una función de render. cacheable=False para pantallas de error.
+Pantalla = namedtuple('Pantalla', ['mensaje', 'reply_markup', 'cacheable'], defaults=(True,))
+
+
+class CachePantallas:
+    """
+    Pantallas renderizadas por clave (pantalla, *parámetros).
+    """
+
+    def __init__(self, ttl: int = TTL_PANTALLAS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entradas = {}              # clave → (Pantalla, time.monotonic())
+        self._versiones = {}             # pantalla → contador de invalidaciones
+
+    def _vigente(self, clave: tuple):
+        entrada = self._entradas.get(clave)
+        if entrada is not None and time.monotonic() - entrada[1] < self.ttl:
+            return entrada[0]
+        return None
+
+    def contiene(self, clave: tuple) -> bool:
+        """
+        Indica si la pantalla está cacheada y vigente (sin armarla).
+        """
+        return self._vigente(clave) is not None
+
+    async def obtener(self, clave: tuple, construir) -> Pantalla:
+        """
+        Devuelve la pantalla cacheada o la arma con construir().
+
+        Args:
+            clave: (pantalla, *parámetros), ej: (PANTALLA_CLIENTES, 2)
+            construir: Función async sin argumentos que devuelve una Pantalla
+
+        Returns:
+            Pantalla: (mensaje, reply_markup, cacheable)
+        """
+        pantalla = self._vigente(clave)
+        if pantalla is not None:
+            return pantalla
+
+        version = self._versiones.get(clave[0], 0)
+        pantalla = await construir()
+
+        with self._lock:
+            # Si hubo una escritura mientras se armaba, no se guarda lo leído antes
+            if pantalla.cacheable and self._versiones.get(clave[0], 0) == version:
+                self._entradas[clave] = (pantalla, time.monotonic())
+
+        return pantalla
+
+    def invalidar(self, *pantallas: str):
+        """
+        Descarta todas las entradas de las pantallas indicadas (cualquier parámetro).
+        """
+        with self._lock:
+            for pantalla in pantallas:
+                self._versiones[pantalla] = self._versiones.get(pantalla, 0) + 1
+            self._entradas = {
+                clave: entrada for clave, entrada in self._entradas.items()
+                if clave[0] not in pantallas
+            }
+
+    def invalidar_por(self, tabla: str):
+        """
+        Invalida las pantallas que muestran datos de la tabla modificada.
+
+        Args:
+            tabla: 'ingresos', 'costos' o 'clientes'
+        """
+        self.invalidar(*DEPENDENCIAS.get(tabla, ()))
+
+
+# Instancia única del proceso
+cache_pantallas = CachePantallas()
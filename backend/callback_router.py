@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+BLACK INFRASTRUCTURE - ROUTER DE CALLBACKS
+===========================================
+Despacho de botones inline por código de acción (dict, O(1)) y formato
+compacto de callback_data:
+
+    '<codigo>:<id>[:<extra>]'   ej: 'ec:VQ6EAOKbQdSnFkRmVUQAAA'
+
+- Los UUID viajan en base64url sin padding (22 caracteres en lugar de 36).
+- Otros ids viajan tal cual con prefijo '=' (ej: 'ecl:=42').
+- Acciones sin id (menu_principal, ver_resumen...) se registran por nombre.
+
+Telegram limita callback_data a 64 bytes. Los botones ya enviados con el
+formato anterior ('borrar_costo_<UUID>') se siguen reconociendo.
+
+USO:
+    from callback_router import EDITAR_COSTO, callback, extraer_id
+
+    InlineKeyboardButton("✏️", callback_data=callback(EDITAR_COSTO, costo_id))
+    costo_id = extraer_id(query.data)
+
+Autor: Senior Backend Developer
+Fecha: 19/10/2026
+Versión: 1.0.0
+"""
+
+import base64
+import binascii
+import uuid
+
+from utils import limpiar_id
+
+
+SEPARADOR = ':'
+PREFIJO_ID_CRUDO = '='
+LIMITE_CALLBACK = 64
+
+# ============================================================================
+# CÓDIGOS DE ACCIÓN
+# ============================================================================
+
+# Costos
+EDITAR_COSTO = 'ec'
+EDITAR_NOMBRE_COSTO = 'enc'
+EDITAR_MONTO_COSTO = 'emc'
+BORRAR_COSTO = 'bc'
+CONFIRMAR_BORRAR_COSTO = 'cbc'
+NUEVO_COSTO_TIPO = 'nct'
+
+# Ingresos
+CLIENTE_PAGO = 'cp'
+BORRAR_INGRESO = 'bi'
+CONFIRMAR_BORRAR_INGRESO = 'cbi'
+
+# Clientes
+VER_CLIENTES_PAGINA = 'vcl'
+EDITAR_CLIENTE = 'ecl'
+EDITAR_ESTADO = 'ees'
+SET_ESTADO = 'ses'
+EDITAR_FEE = 'efe'
+TOGGLE_COMISION = 'tco'
+
+# Formato anterior 'prefijo_<id>' → código (botones enviados antes del cambio)
+PREFIJOS_LEGACY = {
+    'editar_costo_': EDITAR_COSTO,
+    'edit_nombre_': EDITAR_NOMBRE_COSTO,
+    'edit_monto_': EDITAR_MONTO_COSTO,
+    'borrar_costo_': BORRAR_COSTO,
+    'confirmar_borrar_costo_': CONFIRMAR_BORRAR_COSTO,
+    'nuevo_costo_tipo_': NUEVO_COSTO_TIPO,
+    'cliente_': CLIENTE_PAGO,
+    'borrar_ingreso_': BORRAR_INGRESO,
+    'confirmar_borrar_': CONFIRMAR_BORRAR_INGRESO,
+    'editar_cliente_': EDITAR_CLIENTE,
+    'edit_estado_': EDITAR_ESTADO,
+    'set_estado_': SET_ESTADO,
+    'edit_fee_': EDITAR_FEE,
+    'toggle_comision_': TOGGLE_COMISION,
+}
+
+# El prefijo más largo primero ('confirmar_borrar_costo_' antes que 'confirmar_borrar_')
+_PREFIJOS_LEGACY_ORDENADOS = sorted(PREFIJOS_LEGACY.items(), key=lambda item: -len(item[0]))
+
+# Acciones legacy donde lo que sigue al prefijo no es un id
+_LEGACY_SOLO_EXTRA = {NUEVO_COSTO_TIPO}
+_LEGACY_ID_Y_EXTRA = {SET_ESTADO}
+
+
+# ============================================================================
+# CODIFICACIÓN
+# ============================================================================
+
+def codificar_id(valor) -> str:
+    """
+    UUID → base64url de 16 bytes (22 caracteres); cualquier otro id → '=<id>'.
+    """
+    texto = str(valor)
+    try:
+        return base64.urlsafe_b64encode(uuid.UUID(texto).bytes).rstrip(b'=').decode('ascii')
+    except ValueError:
+        return f"{PREFIJO_ID_CRUDO}{texto}"
+
+
+def decodificar_id(texto: str) -> str:
+    """
+    Inversa de codificar_id.
+
+    Raises:
+        ValueError: Si el texto no es un id codificado válido
+    """
+    if texto.startswith(PREFIJO_ID_CRUDO):
+        return texto[len(PREFIJO_ID_CRUDO):]
+
+    try:
+        crudo = base64.urlsafe_b64decode(texto + '==')
+    except (binascii.Error, ValueError):
+        raise ValueError(f"Id de callback inválido: {texto!r}")
+
+    if len(crudo) != 16:
+        raise ValueError(f"Id de callback inválido: {texto!r}")
+    return str(uuid.UUID(bytes=crudo))
+
+
+def callback(codigo: str, id_registro=None, extra: str = None) -> str:
+    """
+    Arma el callback_data compacto de un botón.
+
+    Args:
+        codigo: Código de acción (ej: EDITAR_COSTO)
+        id_registro: Id del registro (UUID u otro)
+        extra: Dato adicional sin ':' (ej: el estado elegido)
+
+    Returns:
+        str: callback_data (máximo 64 bytes)
+
+    Raises:
+        ValueError: Si excede el límite de Telegram
+    """
+    partes = [codigo, codificar_id(id_registro) if id_registro is not None else '']
+    if extra is not None:
+        partes.append(str(extra))
+
+    data = SEPARADOR.join(partes)
+    if len(data.encode('utf-8')) > LIMITE_CALLBACK:
+        raise ValueError(f"callback_data excede {LIMITE_CALLBACK} bytes: {data!r}")
+    return data
+
+
+def decodificar(callback_data: str) -> tuple:
+    """
+    Separa un callback_data en (código, id, extra).
+
+    Acepta el formato compacto, el formato anterior 'prefijo_<id>' y
+    acciones simples ('menu_principal').
+
+    Returns:
+        tuple: (codigo, id o None, extra o None)
+    """
+    if SEPARADOR in callback_data:
+        codigo, _, resto = callback_data.partition(SEPARADOR)
+        id_codificado, _, extra = resto.partition(SEPARADOR)
+        return (
+            codigo,
+            decodificar_id(id_codificado) if id_codificado else None,
+            extra or None
+        )
+
+    for prefijo, codigo in _PREFIJOS_LEGACY_ORDENADOS:
+        if callback_data.startswith(prefijo):
+            resto = callback_data[len(prefijo):]
+            if codigo in _LEGACY_SOLO_EXTRA:
+                return codigo, None, resto
+            if codigo in _LEGACY_ID_Y_EXTRA:
+                id_registro, _, extra = resto.rpartition('_')
+                return codigo, id_registro, extra
+            return codigo, limpiar_id(resto), None
+
+    return callback_data, None, None
+
+
+def extraer_id(callback_data: str):
+    """
+    Id del registro de un callback_data (compacto o formato anterior).
+    """
+    return decodificar(callback_data)[1]
+
+
+def extraer_extra(callback_data: str):
+    """
+    Dato adicional de un callback_data (ej: estado o tipo de costo).
+    """
+    return decodificar(callback_data)[2]
+
+
+# ============================================================================
+# ROUTER
+# ============================================================================
+
+class RouterCallbacks:
+    """
+    Tabla código de acción → handler(update, context).
+    """
+
+    def __init__(self):
+        self._handlers = {}
+
+    def registrar(self, codigo: str, handler):
+        """
+        Asocia un código (o el nombre de una acción simple) a un handler async.
+        """
+        if codigo in self._handlers:
+            raise ValueError(f"Acción de callback duplicada: {codigo}")
+        self._handlers[codigo] = handler
+
+    async def despachar(self, update, context) -> bool:
+        """
+        Ejecuta el handler del callback recibido.
+
+        Returns:
+            bool: False si la acción no está registrada o el payload es inválido
+        """
+        callback_data = update.callback_query.data or ''
+
+        try:
+            codigo = decodificar(callback_data)[0]
+        except ValueError as e:
+            print(f"⚠️ {e}")
+            return False
+
+        handler = self._handlers.get(codigo)
+        if handler is None:
+            print(f"⚠️ Callback sin handler: {callback_data}")
+            return False
+
+        await handler(update, context)
+        return True
+
+
+if __name__ == "__main__":
+    print("\n🧪 TEST - Router de callbacks\n")
+
+    costo_id = '550e8400-e29b-41d4-a716-446655440000'
+    for data in (
+        callback(CONFIRMAR_BORRAR_COSTO, costo_id),
+        callback(SET_ESTADO, costo_id, 'Prospecto'),
+        callback(EDITAR_CLIENTE, 42),
+        f'confirmar_borrar_costo_{costo_id}',
+        f'set_estado_{costo_id}_Activo',
+        'nuevo_costo_tipo_Fijo',
+        'menu_principal',
+    ):
+        print(f"{data:<60} ({len(data):>2} bytes) → {decodificar(data)}")
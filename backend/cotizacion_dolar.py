@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+BLACK INFRASTRUCTURE - SERVICIO DE COTIZACIÓN DEL DÓLAR BLUE
+=============================================================
+Cotización de DolarAPI con caché en memoria:
+
+- Dentro del TTL se responde desde memoria (sin red).
+- Vencido el TTL se sirve la última cotización y se refresca en segundo
+  plano (stale-while-revalidate); solo un refresco a la vez.
+- El guardado en la tabla 'cotizaciones' sale del camino del request: lo
+  hace un hilo aparte y solo cuando DolarAPI publica un valor nuevo
+  (deduplicado por fechaActualizacion).
+
+Para montos históricos (ej: pagos de PST.NET) ventas_por_fecha() toma la
+cotización guardada de cada fecha con una sola consulta.
+
+USO:
+- Async (bot, FastAPI): await obtener_cotizacion_blue()
+- Sync (scripts):       obtener_cotizacion_blue_sync()
+- Por fecha:            ventas_por_fecha(supabase, ['2026-01-15', ...])
+
+Autor: Senior Backend Developer
+Fecha: 19/10/2026
+Versión: 1.0.0
+"""
+
+import asyncio
+import bisect
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import httpx
+import requests
+from supabase import create_client, Client
+
+
+URL_DOLAR_BLUE = 'https://dolarapi.com/v1/dolares/blue'
+HEADERS_DOLAR_API = {
+    'User-Agent': 'BLACK-Infrastructure-Bot/2.0',
+    'Accept': 'application/json',
+}
+TIMEOUT_DOLAR_API = 10
+
+# Segundos que una cotización se considera fresca
+TTL_COTIZACION = int(os.getenv('DOLAR_CACHE_TTL', '300'))
+
+# Días hacia atrás que se acepta una cotización guardada para una fecha sin cotización propia
+DIAS_COTIZACION_GUARDADA = int(os.getenv('DOLAR_DIAS_COTIZACION_GUARDADA', '7'))
+
+# Filas por pedido al leer cotizaciones guardadas
+FILAS_POR_PAGINA_COTIZACIONES = 1000
+
+
+class ServicioCotizacion:
+    """
+    Caché de la cotización blue compartida por todo el proceso.
+    """
+
+    def __init__(self, ttl: int = TTL_COTIZACION, url: str = URL_DOLAR_BLUE):
+        self.ttl = ttl
+        self.url = url
+
+        self._lock = threading.Lock()
+        self._cotizacion = None          # Último dict válido
+        self._obtenida_en = 0.0          # time.monotonic() de la última actualización
+        self._tarea_refresco = None      # asyncio.Task en curso (single-flight async)
+        self._refresco_sync = None       # Future en curso (single-flight sync)
+
+        self._supabase = None
+        self._ultima_persistida = None   # fechaActualizacion ya guardada
+        self._segundo_plano = ThreadPoolExecutor(max_workers=1, thread_name_prefix='cotizacion')
+
+    # ------------------------------------------------------------------------
+    # Configuración
+    # ------------------------------------------------------------------------
+
+    def configurar_supabase(self, supabase: Client):
+        """
+        Usa un cliente ya creado para persistir (evita crear uno por consulta).
+        """
+        self._supabase = supabase
+
+    def _cliente(self) -> Client:
+        if self._supabase is None:
+            url = os.getenv("SUPABASE_URL", "").strip().strip('"').strip("'")
+            key = os.getenv("SUPABASE_KEY", "").strip().strip('"').strip("'")
+            if not url or not key:
+                raise Exception("Faltan SUPABASE_URL o SUPABASE_KEY para guardar cotizaciones")
+            self._supabase = create_client(url, key)
+        return self._supabase
+
+    # ------------------------------------------------------------------------
+    # Estado de la caché
+    # ------------------------------------------------------------------------
+
+    def _es_fresca(self) -> bool:
+        return self._cotizacion is not None and time.monotonic() - self._obtenida_en < self.ttl
+
+    def _respuesta(self, desactualizada: bool = False) -> dict:
+        return {**self._cotizacion, 'desactualizada': desactualizada}
+
+    def _actualizar(self, data: dict) -> dict:
+        compra = float(data['compra'])
+        venta = float(data['venta'])
+        cotizacion = {
+            'compra': compra,
+            'venta': venta,
+            'fecha': datetime.now().isoformat(),
+            'fecha_api': data.get('fechaActualizacion', datetime.now().isoformat())
+        }
+
+        with self._lock:
+            self._cotizacion = cotizacion
+            self._obtenida_en = time.monotonic()
+
+        print(f"✅ Dólar Blue - Compra: ${compra:,.2f} | Venta: ${venta:,.2f}")
+        self._persistir_en_segundo_plano(cotizacion)
+        return cotizacion
+
+    # ------------------------------------------------------------------------
+    # Persistencia (fuera del request, deduplicada)
+    # ------------------------------------------------------------------------
+
+    def _persistir_en_segundo_plano(self, cotizacion: dict):
+        with self._lock:
+            if cotizacion['fecha_api'] == self._ultima_persistida:
+                return
+            self._ultima_persistida = cotizacion['fecha_api']
+
+        self._segundo_plano.submit(self._persistir, cotizacion)
+
+    def _persistir(self, cotizacion: dict):
+        try:
+            self._cliente().table('cotizaciones').insert({
+                'tipo': 'dolar_blue',
+                'compra': cotizacion['compra'],
+                'venta': cotizacion['venta'],
+                'created_at': cotizacion['fecha']
+            }).execute()
+            print("💾 Cotización guardada en Supabase")
+        except Exception as e:
+            # Se libera la clave para reintentar con la próxima cotización
+            with self._lock:
+                if self._ultima_persistida == cotizacion['fecha_api']:
+                    self._ultima_persistida = None
+            print(f"⚠️ Warning: No se pudo guardar cotización: {e}")
+
+    # ------------------------------------------------------------------------
+    # API async
+    # ------------------------------------------------------------------------
+
+    async def _consultar_async(self) -> dict:
+        print("💱 Consultando cotización del dólar blue...")
+        async with httpx.AsyncClient(timeout=TIMEOUT_DOLAR_API, headers=HEADERS_DOLAR_API) as client:
+            response = await client.get(self.url)
+            response.raise_for_status()
+            return self._actualizar(response.json())
+
+    def _refrescar_async(self) -> asyncio.Task:
+        if self._tarea_refresco is None or self._tarea_refresco.done():
+            self._tarea_refresco = asyncio.get_running_loop().create_task(self._consultar_async())
+            self._tarea_refresco.add_done_callback(self._registrar_fallo)
+        return self._tarea_refresco
+
+    @staticmethod
+    def _registrar_fallo(tarea: asyncio.Task):
+        if not tarea.cancelled() and tarea.exception() is not None:
+            print(f"⚠️ No se pudo refrescar la cotización: {tarea.exception()}")
+
+    async def obtener(self) -> dict:
+        """
+        Devuelve la cotización sin bloquear el event loop.
+
+        Returns:
+            dict: {'compra', 'venta', 'fecha', 'fecha_api', 'desactualizada'} o {'error': str}
+        """
+        if self._es_fresca():
+            return self._respuesta()
+
+        tarea = self._refrescar_async()
+
+        if self._cotizacion is not None:
+            # Stale-while-revalidate: el refresco sigue en segundo plano
+            return self._respuesta(desactualizada=True)
+
+        try:
+            await asyncio.shield(tarea)
+            return self._respuesta()
+        except Exception as e:
+            print(f"❌ Error al obtener cotización: {e}")
+            return {'error': str(e)}
+
+    # ------------------------------------------------------------------------
+    # API sync
+    # ------------------------------------------------------------------------
+
+    def _consultar_sync(self) -> dict:
+        print("💱 Consultando cotización del dólar blue...")
+        response = requests.get(self.url, headers=HEADERS_DOLAR_API, timeout=TIMEOUT_DOLAR_API)
+        response.raise_for_status()
+        return self._actualizar(response.json())
+
+    def obtener_sync(self) -> dict:
+        """
+        Igual que obtener(), para código sincrónico.
+
+        Returns:
+            dict: {'compra', 'venta', 'fecha', 'fecha_api', 'desactualizada'} o {'error': str}
+        """
+        if self._es_fresca():
+            return self._respuesta()
+
+        if self._cotizacion is not None:
+            with self._lock:
+                if self._refresco_sync is None or self._refresco_sync.done():
+                    self._refresco_sync = self._segundo_plano.submit(self._refrescar_sync_seguro)
+            return self._respuesta(desactualizada=True)
+
+        try:
+            self._consultar_sync()
+            return self._respuesta()
+        except Exception as e:
+            print(f"❌ Error al obtener cotización: {e}")
+            return {'error': str(e)}
+
+    def _refrescar_sync_seguro(self):
+        try:
+            self._consultar_sync()
+        except Exception as e:
+            print(f"⚠️ No se pudo refrescar la cotización: {e}")
+
+
+# Instancia única del proceso
+servicio_cotizacion = ServicioCotizacion()
+
+
+async def obtener_cotizacion_blue() -> dict:
+    """
+    Cotización del dólar blue (async, con caché).
+
+    Returns:
+        dict: {'compra', 'venta', 'fecha', 'fecha_api', 'desactualizada'} o {'error': str}
+    """
+    return await servicio_cotizacion.obtener()
+
+
+def obtener_cotizacion_blue_sync() -> dict:
+    """
+    Cotización del dólar blue (sync, con caché).
+
+    Returns:
+        dict: {'compra', 'venta', 'fecha', 'fecha_api', 'desactualizada'} o {'error': str}
+    """
+    return servicio_cotizacion.obtener_sync()
+
+
+# ============================================================================
+# COTIZACIONES GUARDADAS
+# ============================================================================
+
+def _leer_cotizaciones(supabase: Client, columna_fecha: str, columna_venta: str, desde: str, hasta: str) -> list:
+    filas = []
+    inicio = 0
+    while True:
+        response = supabase.table('cotizaciones') \
+            .select(f'{columna_fecha}, {columna_venta}') \
+            .gte(columna_fecha, desde) \
+            .lt(columna_fecha, hasta) \
+            .order(columna_fecha) \
+            .range(inicio, inicio + FILAS_POR_PAGINA_COTIZACIONES - 1) \
+            .execute()
+        pagina = response.data or []
+        filas.extend((str(fila[columna_fecha])[:10], fila[columna_venta]) for fila in pagina)
+        if len(pagina) < FILAS_POR_PAGINA_COTIZACIONES:
+            return filas
+        inicio += FILAS_POR_PAGINA_COTIZACIONES
+
+
+def ventas_por_fecha(supabase: Client, fechas: list, max_dias: int = DIAS_COTIZACION_GUARDADA) -> dict:
+    """
+    Cotización de venta guardada para cada fecha (una consulta por rango y origen).
+
+    Usa la última cotización del día o, si ese día no tiene, la más reciente
+    de los max_dias anteriores. Combina las del bot (venta) con las de la
+    planilla (blue_venta); el mismo día con ambas usa la del bot.
+
+    Args:
+        supabase: Cliente de Supabase
+        fechas: Fechas 'YYYY-MM-DD'
+        max_dias: Antigüedad máxima aceptada para una cotización anterior
+
+    Returns:
+        dict: {fecha: venta}; las fechas sin cotización cercana no aparecen
+    """
+    dias_pedidos = set()
+    for fecha in fechas:
+        try:
+            dias_pedidos.add(date.fromisoformat(str(fecha)[:10]))
+        except ValueError:
+            print(f"⚠️ Fecha inválida al buscar cotizaciones: {fecha!r}")
+    if not dias_pedidos:
+        return {}
+
+    desde = (min(dias_pedidos) - timedelta(days=max_dias)).isoformat()
+    hasta = (max(dias_pedidos) + timedelta(days=1)).isoformat()
+
+    # Cotizaciones importadas de la planilla (fecha, blue_venta) y del bot
+    # (created_at, venta): se leen ambas y, si un día tiene las dos, gana la del bot
+    por_dia = {}
+    for columna_fecha, columna_venta in (('fecha', 'blue_venta'), ('created_at', 'venta')):
+        try:
+            filas = _leer_cotizaciones(supabase, columna_fecha, columna_venta, desde, hasta)
+        except Exception as e:
+            print(f"⚠️ No se pudieron leer cotizaciones por {columna_fecha}: {e}")
+            continue
+
+        # Última cotización válida de cada día (las filas vienen ordenadas)
+        del_origen = {}
+        for dia, venta in filas:
+            try:
+                venta = float(venta)
+            except (TypeError, ValueError):
+                continue
+            if venta > 0:
+                del_origen[dia] = venta
+        por_dia.update(del_origen)
+
+    if not por_dia:
+        return {}
+    dias = sorted(por_dia)
+
+    ventas = {}
+    for dia_pedido in dias_pedidos:
+        fecha = dia_pedido.isoformat()
+        posicion = bisect.bisect_right(dias, fecha) - 1
+        if posicion < 0:
+            continue
+        dia = dias[posicion]
+        if (dia_pedido - date.fromisoformat(dia)).days <= max_dias:
+            ventas[fecha] = por_dia[dia]
+    return ventas
+
+
+# ============================================================================
+# TEST
+# ============================================================================
+
+if __name__ == "__main__":
+    print("\n🧪 TEST - Servicio de cotización\n")
+
+    async def _probar():
+        inicio = time.perf_counter()
+        primera = await obtener_cotizacion_blue()
+        print(f"1️⃣  Primera consulta: {primera} ({(time.perf_counter() - inicio) * 1000:.0f} ms)")
+
+        inicio = time.perf_counter()
+        segunda = await obtener_cotizacion_blue()
+        print(f"2️⃣  Desde caché: {segunda} ({(time.perf_counter() - inicio) * 1000:.2f} ms)")
+
+    asyncio.run(_probar())
+    servicio_cotizacion._segundo_plano.shutdown(wait=True)
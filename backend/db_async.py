@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+BLACK INFRASTRUCTURE - ACCESO A DATOS NO BLOQUEANTE PARA EL BOT
+================================================================
+El cliente de supabase-py (y requests) es sincrónico: llamado directo
+desde un handler async frena el event loop de run_polling para todos los
+chats. Este módulo corre ese trabajo en un pool de hilos acotado.
+
+USO:
+    from db_async import ejecutar
+
+    resumen = await ejecutar(get_resumen_financiero, supabase, periodo)
+    response = await ejecutar(supabase.table('costos').select('*').eq('id', costo_id).execute)
+
+Armar la consulta (table/select/eq) no hace I/O; solo execute() va al pool.
+
+Autor: Senior Backend Developer
+Fecha: 19/10/2026
+Versión: 1.0.0
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Máximo de consultas simultáneas del bot contra Supabase / APIs externas
+BOT_DB_WORKERS = int(os.getenv('BOT_DB_WORKERS', '8'))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _obtener_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=BOT_DB_WORKERS, thread_name_prefix='bot-db')
+                print(f"🧵 Pool de acceso a datos iniciado ({BOT_DB_WORKERS} hilos)")
+    return _pool
+
+
+async def ejecutar(funcion, *args, **kwargs):
+    """
+    Ejecuta una función bloqueante en el pool sin frenar el event loop.
+
+    Args:
+        funcion: Función sincrónica (consulta, llamada HTTP, etc.)
+        *args, **kwargs: Argumentos de la función
+
+    Returns:
+        Lo que devuelva la función (las excepciones se propagan al handler)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_obtener_pool(), functools.partial(funcion, *args, **kwargs))
+
+
+def cerrar_pool():
+    """
+    Espera las consultas en curso y libera los hilos (al detener el bot).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+            print("🧵 Pool de acceso a datos cerrado")
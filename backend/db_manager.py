@@ -9,16 +9,33 @@ Fecha: 21/01/2026
 Versión: 2.0.0
 """
 
+import asyncio
 import os
 import sys
 from datetime import datetime
 from pathlib import Path
 
-import requests
+import numpy as np
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
-from utils import formato_argentino
+from cotizacion_dolar import obtener_cotizacion_blue_sync
+from db_async import ejecutar
+from directorio_clientes import directorio_clientes
+from montos import FORMATO_EN, parsear_montos
+from resumen_mensual import (
+    TIPO_COSTOS_FIJOS,
+    TIPO_COSTOS_VARIABLES,
+    TIPO_INGRESOS,
+    leer_resumen_mensual,
+)
+from utils import (
+    formato_argentino,
+    parsear_periodo,
+    periodo_actual,
+    periodo_de_fecha,
+    rango_periodo,
+)
 
 
 # ============================================================================
@@ -73,160 +90,410 @@ def inicializar_supabase() -> Client:
         sys.exit(1)
 
 
+# Clave del cliente único del bot en application.bot_data
+CLAVE_SUPABASE = 'supabase'
+
+
+def obtener_supabase(context) -> Client:
+    """
+    Devuelve el cliente de Supabase compartido por todos los handlers del bot.
+    
+    El cliente se crea una sola vez en main() y se guarda en
+    application.bot_data; si falta (ej: handlers usados fuera del bot), se
+    crea en la primera llamada y queda registrado.
+    
+    Args:
+        context: ContextTypes.DEFAULT_TYPE del handler
+    
+    Returns:
+        Client: Cliente de Supabase
+    """
+    supabase = context.bot_data.get(CLAVE_SUPABASE)
+    if supabase is None:
+        supabase = inicializar_supabase()
+        context.bot_data[CLAVE_SUPABASE] = supabase
+    return supabase
+
+
 # ============================================================================
 # CONSULTAS DE DATOS
 # ============================================================================
 
 def get_dolar_blue() -> dict:
     """
-    Obtiene la cotización del dólar blue desde DolarAPI.
-    Guarda los valores en la tabla 'cotizaciones' de Supabase.
+    Obtiene la cotización del dólar blue desde DolarAPI (con caché en memoria).
+    
+    El guardado en la tabla 'cotizaciones' se hace en segundo plano y solo
+    cuando cambia la cotización (ver cotizacion_dolar.py). Desde código async
+    usar obtener_cotizacion_blue().
     
     Returns:
         dict: {'compra': float, 'venta': float, 'fecha': str} o {'error': str}
     """
+    return obtener_cotizacion_blue_sync()
+
+
+def _agregar_ingresos_local(supabase: Client, periodos: list, inicio: str, fin: str) -> dict:
+    """
+    Agrega los ingresos en Python descargando las filas del rango.
+    
+    Solo se usa como respaldo si la función obtener_resumen_ingresos todavía no
+    fue creada en Supabase (ver migration_resumen_ingresos.sql).
+    """
+    response = supabase.table('ingresos') \
+        .select('monto_ars, monto_usd_total, fecha_cobro') \
+        .gte('fecha_cobro', inicio) \
+        .lte('fecha_cobro', fin) \
+        .execute()
+    
+    if not hasattr(response, 'data') or response.data is None:
+        raise Exception("Respuesta inválida de la tabla ingresos")
+    
+    filas = response.data
+    
+    # Parseo por columnas completas (numeric llega como número o '1234.50')
+    ars = np.nan_to_num(parsear_montos([f.get('monto_ars') for f in filas], FORMATO_EN))
+    usd = np.nan_to_num(parsear_montos([f.get('monto_usd_total') for f in filas], FORMATO_EN))
+    periodo_fila = np.array([periodo_de_fecha(f.get('fecha_cobro') or '') for f in filas], dtype=object)
+    
+    con_cotizacion = (ars > 0) & (usd > 0)
+    cotizacion = np.divide(ars, usd, out=np.zeros_like(ars), where=con_cotizacion)
+    
+    resultado = {}
+    for periodo in periodos:
+        mascara = periodo_fila == periodo
+        mascara_cotizacion = mascara & con_cotizacion
+        resultado[periodo] = {
+            'total_ars': float(ars[mascara].sum()),
+            'total_usd': float(usd[mascara].sum()),
+            'registros': int(mascara.sum()),
+            'cotizacion_promedio': float(cotizacion[mascara_cotizacion].mean()) if mascara_cotizacion.any() else 0.0
+        }
+    
+    return resultado
+
+
+def get_ingresos_periodos(supabase: Client, periodos: list, tipo_vista: str = 'liquidez') -> dict:
+    """
+    Obtiene los totales de ingresos de varios periodos agregados en Postgres.
+    
+    Usa la RPC obtener_resumen_ingresos: solo viaja una fila por periodo
+    (sumas, cantidad y cotización promedio), sin importar el volumen de datos.
+    
+    Args:
+        supabase: Cliente de Supabase
+        periodos: Lista de periodos MM-YYYY
+        tipo_vista: 'liquidez' (por fecha_cobro) o 'performance' (por mes_aplicado)
+    
+    Returns:
+        dict: {periodo: {total_ars, total_usd, registros, cotizacion_promedio}}
+    """
+    inicio = min(rango_periodo(p)[0] for p in periodos)
+    fin = max(rango_periodo(p)[1] for p in periodos)
+    
+    print(f"📊 Agregando ingresos ({tipo_vista}) desde {inicio} hasta {fin}...")
+    
     try:
-        print("💱 Consultando cotización del dólar blue...")
-        
-        url = 'https://dolarapi.com/v1/dolares/blue'
-        headers = {
-            'User-Agent': 'BLACK-Infrastructure-Bot/2.0',
-            'Accept': 'application/json',
+        response = supabase.rpc('obtener_resumen_ingresos', {
+            'fecha_desde': inicio,
+            'fecha_hasta': fin,
+            'periodos_param': periodos,
+            'tipo_vista': tipo_vista
+        }).execute()
+    except Exception as e:
+        if tipo_vista != 'liquidez':
+            raise
+        print(f"⚠️ RPC obtener_resumen_ingresos no disponible, agregando localmente: {e}")
+        return _agregar_ingresos_local(supabase, periodos, inicio, fin)
+    
+    resultado = {
+        p: {'total_ars': 0.0, 'total_usd': 0.0, 'registros': 0, 'cotizacion_promedio': 0.0}
+        for p in periodos
+    }
+    
+    for fila in response.data or []:
+        bucket = resultado.get(fila.get('periodo'))
+        if bucket is None:
+            continue
+        bucket['total_ars'] = float(fila.get('total_ars') or 0)
+        bucket['total_usd'] = float(fila.get('total_usd') or 0)
+        bucket['registros'] = int(fila.get('cantidad_registros') or 0)
+        bucket['cotizacion_promedio'] = float(fila.get('cotizacion_promedio') or 0)
+    
+    return resultado
+
+
+def _resumen_desde_rollup(rollup: dict, dolar_actual: float, calc_agustin) -> tuple:
+    """
+    Convierte las filas de resumen_mensual al formato de ingresos/costos por periodo.
+    
+    Los costos en ARS se convierten con el dólar de configuración y los
+    dinámicos se valorizan con el cálculo de Agustín, igual que en
+    get_costos_agrupados.
+    
+    Args:
+        rollup: Resultado de leer_resumen_mensual
+        dolar_actual: Dólar de conversión para costos en ARS
+        calc_agustin: Función sin argumentos que devuelve el cálculo de Agustín
+    
+    Returns:
+        tuple: (ingresos por periodo, {'dolar_actual', 'por_periodo'})
+    """
+    ingresos = {}
+    por_periodo = {}
+    
+    for periodo, tipos in rollup.items():
+        fila = tipos.get(TIPO_INGRESOS, {})
+        cantidad_cotizaciones = int(fila.get('cantidad_cotizaciones') or 0)
+        ingresos[periodo] = {
+            'total_ars': float(fila.get('total_ars') or 0),
+            'total_usd': float(fila.get('total_usd') or 0),
+            'registros': int(fila.get('cantidad') or 0),
+            'cotizacion_promedio': (
+                float(fila.get('suma_cotizaciones') or 0) / cantidad_cotizaciones
+                if cantidad_cotizaciones else 0.0
+            )
         }
         
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        bucket = {'total_fijo': 0.0, 'total_variable': 0.0, 'total_general': 0.0}
+        for tipo, clave_total in ((TIPO_COSTOS_FIJOS, 'total_fijo'), (TIPO_COSTOS_VARIABLES, 'total_variable')):
+            fila = tipos.get(tipo)
+            if not fila:
+                continue
+            
+            monto = float(fila.get('total_usd') or 0) + round(float(fila.get('total_ars') or 0) / dolar_actual, 2)
+            
+            dinamicos = int(fila.get('cantidad_dinamicos') or 0)
+            if dinamicos:
+                monto += dinamicos * calc_agustin()['total_usd']
+            
+            bucket[clave_total] = monto
+            bucket['total_general'] += monto
         
-        data = response.json()
-        compra = float(data['compra'])
-        venta = float(data['venta'])
-        fecha_api = data.get('fechaActualizacion', datetime.now().isoformat())
+        por_periodo[periodo] = bucket
+    
+    return ingresos, {'dolar_actual': dolar_actual, 'por_periodo': por_periodo}
+
+
+def _normalizar_periodos(periodos: list) -> list:
+    """
+    Valida y ordena cronológicamente los periodos (sin duplicados).
+    """
+    if not periodos:
+        raise ValueError("Debe indicarse al menos un periodo")
+    return sorted(set(periodos), key=parsear_periodo)
+
+
+def _costos_en_cero(periodos: list, dolar_actual: float) -> dict:
+    """
+    Costos vacíos: si fallan los costos, el resumen se calcula con costos en 0.
+    """
+    return {
+        'dolar_actual': dolar_actual,
+        'por_periodo': {p: {'total_general': 0.0} for p in periodos}
+    }
+
+
+def _combinar_resumen(periodos: list, ingresos: dict, costos: dict) -> dict:
+    """
+    Une ingresos y costos ya consultados en el resumen por periodo.
+    
+    Args:
+        periodos: Periodos normalizados
+        ingresos: {periodo: {total_ars, total_usd, registros, cotizacion_promedio}}
+        costos: {'dolar_actual', 'por_periodo': {periodo: {'total_general', ...}}}
+    
+    Returns:
+        dict: {periodos: [fila por mes], totales: {...}, dolar_conversion_costos, fecha_consulta}
+    """
+    filas = []
+    totales = {'total_ars': 0.0, 'total_usd': 0.0, 'total_costos': 0.0, 'neto_usd': 0.0}
+    
+    for periodo in periodos:
+        ing = ingresos[periodo]
+        total_costos = costos['por_periodo'][periodo]['total_general']
+        neto_usd = ing['total_usd'] - total_costos
+        
+        filas.append({
+            'periodo': periodo,
+            'total_ars': ing['total_ars'],
+            'total_usd': ing['total_usd'],
+            'total_costos': total_costos,
+            'neto_usd': neto_usd,
+            'cotizacion_promedio': ing['cotizacion_promedio'],
+            'registros_ingresos': ing['registros']
+        })
+        
+        totales['total_ars'] += ing['total_ars']
+        totales['total_usd'] += ing['total_usd']
+        totales['total_costos'] += total_costos
+        totales['neto_usd'] += neto_usd
+    
+    print(f"✅ Neto USD acumulado: ${totales['neto_usd']:,.2f}")
+    
+    return {
+        'periodos': filas,
+        'totales': totales,
+        'dolar_conversion_costos': costos['dolar_actual'],
+        'fecha_consulta': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+def _resumen_de_un_periodo(resumen: dict, periodo: str) -> dict:
+    """
+    Aplana el resumen de un único periodo al formato de get_resumen_financiero.
+    """
+    if 'error' in resumen:
+        return resumen
+    
+    fila = resumen['periodos'][0]
+    
+    return {
+        'periodo': periodo,
+        'total_ars': fila['total_ars'],
+        'total_usd': fila['total_usd'],
+        'total_costos': fila['total_costos'],
+        'neto_ars': fila['total_ars'],
+        'neto_usd': fila['neto_usd'],
+        'cotizacion_promedio': fila['cotizacion_promedio'],
+        'dolar_conversion_costos': resumen['dolar_conversion_costos'],
+        'registros_ingresos': fila['registros_ingresos'],
+        'fecha_consulta': resumen['fecha_consulta']
+    }
+
+
+def get_resumen_periodos(supabase: Client, periodos: list) -> dict:
+    """
+    Calcula ingresos, costos y neto de varios periodos en una sola pasada.
+    
+    Lee el rollup resumen_mensual (una fila por mes y tipo). Si la tabla no
+    existe todavía, agrega ingresos en Postgres y consulta los costos del
+    rango una sola vez.
+    
+    Args:
+        supabase: Cliente de Supabase
+        periodos: Lista de periodos MM-YYYY (ej: ['12-2025', '01-2026'])
+    
+    Returns:
+        dict: {periodos: [fila por mes], totales: {...}, dolar_conversion_costos, fecha_consulta}
+              o {'error': str}
+    """
+    try:
+        periodos = _normalizar_periodos(periodos)
+        inicio = rango_periodo(periodos[0])[0]
+        fin = rango_periodo(periodos[-1])[1]
         
-        print(f"✅ Dólar Blue - Compra: ${compra:,.2f} | Venta: ${venta:,.2f}")
+        print(f"📅 Resumen de {len(periodos)} periodo(s): {periodos[0]} → {periodos[-1]}")
         
-        # Guardar en Supabase (no crítico)
         try:
-            supabase = inicializar_supabase()
-            cotizacion_data = {
-                'tipo': 'dolar_blue',
-                'compra': compra,
-                'venta': venta,
-                'created_at': datetime.now().isoformat()
-            }
-            supabase.table('cotizaciones').insert(cotizacion_data).execute()
-            print("💾 Cotización guardada en Supabase")
+            # Camino rápido: una fila por periodo y tipo en resumen_mensual
+            rollup = leer_resumen_mensual(supabase, periodos)
+            ingresos, costos = _resumen_desde_rollup(rollup, get_valor_dolar(supabase), _agustin_perezoso(supabase))
         except Exception as e:
-            print(f"⚠️ Warning: No se pudo guardar cotización: {e}")
+            print(f"⚠️ resumen_mensual no disponible, calculando desde transacciones: {e}")
+            ingresos = get_ingresos_periodos(supabase, periodos)
+            costos = get_costos_agrupados(supabase, inicio, fin, periodos=periodos)
         
-        return {
-            'compra': compra,
-            'venta': venta,
-            'fecha': datetime.now().isoformat(),
-            'fecha_api': fecha_api
-        }
+        if 'error' in costos:
+            costos = _costos_en_cero(periodos, get_valor_dolar(supabase))
+        
+        return _combinar_resumen(periodos, ingresos, costos)
         
     except Exception as e:
-        print(f"❌ Error al obtener cotización: {e}")
+        print(f"❌ Error en get_resumen_periodos: {e}")
         return {'error': str(e)}
 
 
-def get_resumen_financiero(supabase: Client) -> dict:
+def get_resumen_financiero(supabase: Client, periodo: str = None) -> dict:
     """
-    Calcula el resumen financiero de Enero 2026.
+    Calcula el resumen financiero de un periodo (por defecto, el mes en curso).
     
     Args:
         supabase: Cliente de Supabase
+        periodo: Periodo MM-YYYY (default: periodo actual)
     
     Returns:
         dict: Resumen con ingresos, costos y neto
     """
+    periodo = periodo or periodo_actual()
+    return _resumen_de_un_periodo(get_resumen_periodos(supabase, [periodo]), periodo)
+
+
+# ============================================================================
+# RESUMEN CONCURRENTE (BOT)
+# ============================================================================
+
+def _leer_rollup_o_none(supabase: Client, periodos: list):
+    """
+    Lee resumen_mensual; None si la tabla todavía no existe.
+    """
     try:
-        start_date = '2026-01-01'
-        end_date = '2026-01-31'
-        
-        print(f"📊 Consultando ingresos de Enero 2026...")
-        
-        # Consultar ingresos
-        ingresos_response = supabase.table('ingresos') \
-            .select('monto_ars, monto_usd_total, fecha_cobro') \
-            .gte('fecha_cobro', start_date) \
-            .lte('fecha_cobro', end_date) \
-            .execute()
-        
-        if not hasattr(ingresos_response, 'data') or ingresos_response.data is None:
-            raise Exception("Respuesta inválida de la tabla ingresos")
-        
-        # Calcular totales
-        total_ars = 0.0
-        total_usd = 0.0
-        cotizaciones_aplicadas = []
-        
-        for ingreso in ingresos_response.data:
-            monto_ars = ingreso.get('monto_ars', 0)
-            monto_usd_total = ingreso.get('monto_usd_total', 0)
-            
-            ars_valor = None
-            usd_valor = None
-            
-            if monto_ars:
-                try:
-                    if isinstance(monto_ars, str):
-                        monto_ars = monto_ars.replace('.', '').replace(',', '.')
-                    ars_valor = float(monto_ars)
-                    total_ars += ars_valor
-                except (ValueError, TypeError):
-                    pass
-            
-            if monto_usd_total:
-                try:
-                    if isinstance(monto_usd_total, str):
-                        monto_usd_total = monto_usd_total.replace('.', '').replace(',', '.')
-                    usd_valor = float(monto_usd_total)
-                    total_usd += usd_valor
-                except (ValueError, TypeError):
-                    pass
-            
-            if ars_valor and usd_valor and usd_valor > 0:
-                cotizaciones_aplicadas.append(ars_valor / usd_valor)
-        
-        cotizacion_promedio = sum(cotizaciones_aplicadas) / len(cotizaciones_aplicadas) if cotizaciones_aplicadas else 0.0
+        return leer_resumen_mensual(supabase, periodos)
+    except Exception as e:
+        print(f"⚠️ resumen_mensual no disponible, calculando desde transacciones: {e}")
+        return None
+
+
+async def get_resumen_periodos_async(supabase: Client, periodos: list) -> dict:
+    """
+    Igual que get_resumen_periodos, pero lanza las consultas independientes
+    (rollup, dólar de conversión, clientes activos para Agustín) a la vez en
+    el pool del bot y las une una sola vez.
+    
+    Si el rollup no existe, ingresos y costos del rango se consultan también
+    en paralelo.
+    
+    Args:
+        supabase: Cliente de Supabase
+        periodos: Lista de periodos MM-YYYY
+    
+    Returns:
+        dict: Mismo formato que get_resumen_periodos
+    """
+    try:
+        periodos = _normalizar_periodos(periodos)
+        inicio = rango_periodo(periodos[0])[0]
+        fin = rango_periodo(periodos[-1])[1]
         
-        print(f"💰 Ingresos - ARS: ${total_ars:,.2f} | USD: ${total_usd:,.2f}")
+        print(f"📅 Resumen de {len(periodos)} periodo(s): {periodos[0]} → {periodos[-1]}")
         
-        # Consultar costos con lógica dinámica
-        print(f"💸 Consultando costos de Enero 2026...")
-        costos_agrupados = get_costos_agrupados(supabase, start_date, end_date)
+        rollup, dolar_actual, agustin = await asyncio.gather(
+            ejecutar(_leer_rollup_o_none, supabase, periodos),
+            ejecutar(get_valor_dolar, supabase),
+            ejecutar(calcular_costo_agustin, supabase)
+        )
         
-        if 'error' in costos_agrupados:
-            total_costos = 0.0
+        if rollup is not None:
+            ingresos, costos = _resumen_desde_rollup(rollup, dolar_actual, lambda: agustin)
         else:
-            total_costos = costos_agrupados.get('total_general', 0.0)
-        
-        dolar_usado = costos_agrupados.get('dolar_actual', get_valor_dolar(supabase))
-        
-        print(f"📉 Costos USD: ${total_costos:,.2f}")
-        
-        neto_usd = total_usd - total_costos
+            ingresos, filas_costos = await asyncio.gather(
+                ejecutar(get_ingresos_periodos, supabase, periodos),
+                ejecutar(_consultar_costos, supabase, inicio, fin),
+                return_exceptions=True
+            )
+            if isinstance(ingresos, Exception):
+                raise ingresos
+            if isinstance(filas_costos, Exception):
+                print(f"❌ Error al consultar costos: {filas_costos}")
+                costos = _costos_en_cero(periodos, dolar_actual)
+            else:
+                costos = _agrupar_costos(filas_costos, dolar_actual, lambda: agustin, periodos)
         
-        print(f"✅ Neto USD: ${neto_usd:,.2f}")
-        
-        return {
-            'total_ars': total_ars,
-            'total_usd': total_usd,
-            'total_costos': total_costos,
-            'neto_ars': total_ars,
-            'neto_usd': neto_usd,
-            'cotizacion_promedio': cotizacion_promedio,
-            'dolar_conversion_costos': dolar_usado,
-            'registros_ingresos': len(ingresos_response.data),
-            'fecha_consulta': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
+        return _combinar_resumen(periodos, ingresos, costos)
         
     except Exception as e:
-        print(f"❌ Error en get_resumen_financiero: {e}")
+        print(f"❌ Error en get_resumen_periodos_async: {e}")
         return {'error': str(e)}
 
 
+async def get_resumen_financiero_async(supabase: Client, periodo: str = None) -> dict:
+    """
+    Versión async de get_resumen_financiero (consultas en paralelo).
+    """
+    periodo = periodo or periodo_actual()
+    return _resumen_de_un_periodo(await get_resumen_periodos_async(supabase, [periodo]), periodo)
+
+
 def get_clientes_activos(supabase: Client) -> list:
     """
     Obtiene la lista de clientes activos.
@@ -347,83 +614,156 @@ def calcular_costo_agustin(supabase: Client) -> dict:
         }
 
 
-def get_costos_agrupados(supabase: Client, start_date: str = '2026-01-01', end_date: str = '2026-01-31') -> dict:
+def _monto_costo_usd(costo: dict, dolar_actual: float, calc_agustin) -> tuple:
+    """
+    Calcula el monto en USD de un costo según su tipo (dinámico, ARS o USD).
+    
+    Args:
+        costo: Fila de la tabla costos
+        dolar_actual: Dólar de conversión para costos en ARS
+        calc_agustin: Función sin argumentos que devuelve el cálculo de Agustín
+    
+    Returns:
+        tuple: (monto_usd, observacion)
+    """
+    if costo.get('nombre') == 'Agustin' or costo.get('es_calculo_dinamico', False):
+        # Cálculo dinámico para Agustín
+        agustin = calc_agustin()
+        monto = agustin['total_usd']
+        observacion = f"{agustin['cantidad_clientes']} clientes × ${agustin['honorario_unitario']} USD"
+    elif costo.get('monto_ars'):
+        # Conversión ARS → USD
+        monto = round(costo['monto_ars'] / dolar_actual, 2)
+        observacion = costo.get('observacion', '')
+    else:
+        # Monto fijo en USD
+        monto = float(costo.get('monto_usd', 0))
+        observacion = costo.get('observacion', '')
+    
+    return monto, observacion
+
+
+def _agustin_perezoso(supabase: Client):
+    """
+    Devuelve una función que calcula el costo de Agustín una sola vez (al primer uso).
+    """
+    cache_agustin = {}
+    
+    def calc_agustin():
+        if not cache_agustin:
+            cache_agustin.update(calcular_costo_agustin(supabase))
+        return cache_agustin
+    
+    return calc_agustin
+
+
+def _consultar_costos(supabase: Client, start_date: str, end_date: str) -> list:
+    """
+    Descarga las filas de costos cargadas entre dos fechas (inclusive).
+    
+    Raises:
+        Exception: Si la respuesta de Supabase es inválida
+    """
+    print(f"📊 Consultando costos agrupados desde {start_date} hasta {end_date}...")
+    
+    response = supabase.table('costos') \
+        .select('nombre, monto_ars, monto_usd, tipo, observacion, es_calculo_dinamico, created_at') \
+        .gte('created_at', start_date) \
+        .lte('created_at', f"{end_date}T23:59:59.999999") \
+        .order('tipo, nombre') \
+        .execute()
+    
+    if not hasattr(response, 'data') or response.data is None:
+        raise Exception("Respuesta inválida de la tabla costos")
+    
+    return response.data
+
+
+def _agrupar_costos(filas: list, dolar_actual: float, calc_agustin, periodos: list = None) -> dict:
+    """
+    Agrupa filas de costos por tipo (Fijo/Variable) y, opcionalmente, por periodo.
+    
+    Args:
+        filas: Filas de la tabla costos
+        dolar_actual: Dólar de conversión para costos en ARS
+        calc_agustin: Función sin argumentos que devuelve el cálculo de Agustín
+        periodos: Si se indica, agrega 'por_periodo' con totales por MM-YYYY
+    
+    Returns:
+        dict: Costos agrupados por tipo con totales
+    """
+    print(f"💱 Usando dólar: ${dolar_actual:,.2f}")
+    
+    agrupados = {
+        'Fijo': [],
+        'Variable': [],
+        'total_fijo': 0.0,
+        'total_variable': 0.0,
+        'total_general': 0.0,
+        'dolar_actual': dolar_actual
+    }
+    
+    if periodos:
+        agrupados['por_periodo'] = {
+            p: {'total_fijo': 0.0, 'total_variable': 0.0, 'total_general': 0.0} for p in periodos
+        }
+    
+    for costo in filas:
+        nombre = costo.get('nombre')
+        tipo = costo.get('tipo', 'Variable')
+        es_dinamico = costo.get('es_calculo_dinamico', False)
+        
+        monto, observacion = _monto_costo_usd(costo, dolar_actual, calc_agustin)
+        
+        item = {
+            'nombre': nombre,
+            'monto_usd': monto,
+            'monto_ars': costo.get('monto_ars'),
+            'observacion': observacion,
+            'es_dinamico': es_dinamico
+        }
+        
+        clave_total = 'total_fijo' if tipo == 'Fijo' else 'total_variable'
+        agrupados['Fijo' if tipo == 'Fijo' else 'Variable'].append(item)
+        agrupados[clave_total] += monto
+        agrupados['total_general'] += monto
+        
+        if periodos:
+            bucket = agrupados['por_periodo'].get(periodo_de_fecha(costo.get('created_at') or ''))
+            if bucket is not None:
+                bucket[clave_total] += monto
+                bucket['total_general'] += monto
+    
+    print(f"✅ Costos calculados - Fijo: ${agrupados['total_fijo']:,.2f} | Variable: ${agrupados['total_variable']:,.2f} | Total: ${agrupados['total_general']:,.2f}")
+    
+    return agrupados
+
+
+def get_costos_agrupados(supabase: Client, start_date: str = None, end_date: str = None, periodos: list = None) -> dict:
     """
     Obtiene los costos agrupados por tipo para un período específico.
     
     Args:
         supabase: Cliente de Supabase
-        start_date: Fecha de inicio (YYYY-MM-DD)
-        end_date: Fecha de fin (YYYY-MM-DD)
+        start_date: Fecha de inicio (YYYY-MM-DD, default: inicio del mes en curso)
+        end_date: Fecha de fin inclusive (YYYY-MM-DD, default: fin del mes en curso)
+        periodos: Si se indica, agrega además los totales por periodo MM-YYYY
+                  en la clave 'por_periodo'
     
     Returns:
         dict: Costos agrupados por tipo con totales
     """
     try:
-        dolar_actual = get_valor_dolar(supabase)
-        print(f"📊 Consultando costos agrupados desde {start_date} hasta {end_date}...")
-        print(f"💱 Usando dólar: ${dolar_actual:,.2f}")
+        if not start_date or not end_date:
+            inicio_mes, fin_mes = rango_periodo(periodo_actual())
+            start_date = start_date or inicio_mes
+            end_date = end_date or fin_mes
         
-        response = supabase.table('costos') \
-            .select('nombre, monto_ars, monto_usd, tipo, observacion, es_calculo_dinamico') \
-            .gte('created_at', start_date) \
-            .lte('created_at', end_date) \
-            .order('tipo, nombre') \
-            .execute()
-        
-        if not hasattr(response, 'data') or response.data is None:
-            raise Exception("Respuesta inválida de la tabla costos")
-        
-        # Agrupar por tipo con cálculos dinámicos
-        agrupados = {
-            'Fijo': [],
-            'Variable': [],
-            'total_fijo': 0.0,
-            'total_variable': 0.0,
-            'total_general': 0.0,
-            'dolar_actual': dolar_actual
-        }
-        
-        for costo in response.data:
-            nombre = costo.get('nombre')
-            tipo = costo.get('tipo', 'Variable')
-            es_dinamico = costo.get('es_calculo_dinamico', False)
-            
-            # Calcular monto USD según el tipo de costo
-            if nombre == 'Agustin' or es_dinamico:
-                # Cálculo dinámico para Agustín
-                calc_agustin = calcular_costo_agustin(supabase)
-                monto = calc_agustin['total_usd']
-                observacion = f"{calc_agustin['cantidad_clientes']} clientes × ${calc_agustin['honorario_unitario']} USD"
-            elif costo.get('monto_ars'):
-                # Conversión ARS → USD
-                monto = round(costo['monto_ars'] / dolar_actual, 2)
-                observacion = costo.get('observacion', '')
-            else:
-                # Monto fijo en USD
-                monto = float(costo.get('monto_usd', 0))
-                observacion = costo.get('observacion', '')
-            
-            item = {
-                'nombre': nombre,
-                'monto_usd': monto,
-                'monto_ars': costo.get('monto_ars'),
-                'observacion': observacion,
-                'es_dinamico': es_dinamico
-            }
-            
-            if tipo == 'Fijo':
-                agrupados['Fijo'].append(item)
-                agrupados['total_fijo'] += monto
-            else:
-                agrupados['Variable'].append(item)
-                agrupados['total_variable'] += monto
-            
-            agrupados['total_general'] += monto
-        
-        print(f"✅ Costos calculados - Fijo: ${agrupados['total_fijo']:,.2f} | Variable: ${agrupados['total_variable']:,.2f} | Total: ${agrupados['total_general']:,.2f}")
+        dolar_actual = get_valor_dolar(supabase)
+        filas = _consultar_costos(supabase, start_date, end_date)
         
-        return agrupados
+        # El costo de Agustín depende de los clientes activos: se calcula una sola vez
+        return _agrupar_costos(filas, dolar_actual, _agustin_perezoso(supabase), periodos)
         
     except Exception as e:
         print(f"❌ Error en get_costos_agrupados: {e}")
@@ -455,27 +795,10 @@ def get_ultimos_ingresos(supabase: Client, limite: int = 10) -> list:
         
         print(f"🔍 DEBUG: {len(response.data)} ingresos obtenidos")
         
-        # Obtener nombres de clientes
+        # Nombres de clientes desde el directorio en memoria (sin una consulta por fila)
         ingresos_con_cliente = []
         for ingreso in response.data:
-            cliente_id = ingreso.get('cliente_id')
-            
-            if cliente_id:
-                try:
-                    cliente_response = supabase.table('clientes') \
-                        .select('nombre') \
-                        .eq('id', cliente_id) \
-                        .execute()
-                    
-                    if cliente_response.data and len(cliente_response.data) > 0:
-                        ingreso['cliente_nombre'] = cliente_response.data[0].get('nombre', 'Cliente desconocido')
-                    else:
-                        ingreso['cliente_nombre'] = 'Cliente desconocido'
-                except:
-                    ingreso['cliente_nombre'] = 'Cliente desconocido'
-            else:
-                ingreso['cliente_nombre'] = 'Sin cliente'
-            
+            ingreso['cliente_nombre'] = directorio_clientes.nombre(supabase, ingreso.get('cliente_id'))
             ingresos_con_cliente.append(ingreso)
         
         print(f"✅ {len(ingresos_con_cliente)} ingresos encontrados")
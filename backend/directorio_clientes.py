@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+BLACK INFRASTRUCTURE - DIRECTORIO DE CLIENTES EN MEMORIA
+=========================================================
+Índice de clientes por id y por nombre, cargado una vez con una sola
+consulta y actualizado write-through por actualizar_cliente_campo.
+Buscar un cliente pasa a ser un acceso a dict en lugar de una consulta.
+
+- Se recarga completo cada CLIENTES_CACHE_TTL segundos (default 300) para
+  tomar cambios hechos fuera del bot (webapp, migraciones).
+- Un id que no está en el índice se busca puntualmente y se agrega.
+
+USO:
+    from directorio_clientes import directorio_clientes
+
+    cliente = await directorio_clientes.obtener_async(supabase, cliente_id)   # handlers
+    nombre = directorio_clientes.nombre(supabase, cliente_id)                 # código sync
+
+Autor: Senior Backend Developer
+Fecha: 19/10/2026
+Versión: 1.0.0
+"""
+
+import os
+import threading
+import time
+
+from supabase import Client
+
+from db_async import ejecutar
+
+
+# Columnas que usan el bot y los listados
+COLUMNAS_CLIENTE = 'id, nombre, estado, activo, honorario_usd, fee_mensual, comisiona_agustin'
+
+# Segundos hasta la próxima recarga completa
+TTL_CLIENTES = int(os.getenv('CLIENTES_CACHE_TTL', '300'))
+
+
+def _clave_nombre(nombre: str) -> str:
+    return (nombre or '').strip().casefold()
+
+
+class DirectorioClientes:
+    """
+    Clientes indexados por id y por nombre, compartidos por todo el proceso.
+    """
+
+    def __init__(self, ttl: int = TTL_CLIENTES):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._por_id = {}
+        self._por_nombre = {}
+        self._cargado_en = None          # time.monotonic() de la última carga completa
+
+    # ------------------------------------------------------------------------
+    # Carga
+    # ------------------------------------------------------------------------
+
+    def _vigente(self) -> bool:
+        return self._cargado_en is not None and time.monotonic() - self._cargado_en < self.ttl
+
+    def cargar(self, supabase: Client):
+        """
+        Reemplaza el índice con todos los clientes (una sola consulta).
+
+        Raises:
+            Exception: Si la consulta falla (el índice anterior se conserva)
+        """
+        response = supabase.table('clientes').select(COLUMNAS_CLIENTE).execute()
+
+        if not hasattr(response, 'data') or response.data is None:
+            raise Exception("Respuesta inválida de la tabla clientes")
+
+        por_id = {}
+        por_nombre = {}
+        for cliente in response.data:
+            por_id[str(cliente['id'])] = cliente
+            por_nombre[_clave_nombre(cliente.get('nombre'))] = cliente
+
+        with self._lock:
+            self._por_id = por_id
+            self._por_nombre = por_nombre
+            self._cargado_en = time.monotonic()
+
+        print(f"📇 Directorio de clientes cargado: {len(por_id)} cliente(s)")
+
+    def _asegurar_cargado(self, supabase: Client):
+        if self._vigente():
+            return
+        try:
+            self.cargar(supabase)
+        except Exception as e:
+            # Se sigue sirviendo el índice anterior (si lo hay)
+            print(f"⚠️ No se pudo cargar el directorio de clientes: {e}")
+
+    def invalidar(self):
+        """
+        Fuerza una recarga completa en la próxima búsqueda.
+        """
+        with self._lock:
+            self._cargado_en = None
+
+    # ------------------------------------------------------------------------
+    # Búsquedas
+    # ------------------------------------------------------------------------
+
+    def obtener(self, supabase: Client, cliente_id) -> dict:
+        """
+        Cliente por id (consulta puntual si no está en el índice).
+
+        Returns:
+            dict: Copia del cliente o None si no existe
+        """
+        self._asegurar_cargado(supabase)
+
+        cliente = self._por_id.get(str(cliente_id))
+        if cliente is None:
+            response = supabase.table('clientes').select(COLUMNAS_CLIENTE).eq('id', cliente_id).execute()
+            if not response.data:
+                return None
+            cliente = self.guardar(response.data[0])
+
+        return dict(cliente)
+
+    async def obtener_async(self, supabase: Client, cliente_id) -> dict:
+        """
+        Igual que obtener(); con el índice vigente es un acceso a dict sin salir del event loop.
+        """
+        if self._vigente():
+            cliente = self._por_id.get(str(cliente_id))
+            if cliente is not None:
+                return dict(cliente)
+        return await ejecutar(self.obtener, supabase, cliente_id)
+
+    def buscar_por_nombre(self, supabase: Client, nombre: str) -> dict:
+        """
+        Cliente por nombre (sin distinguir mayúsculas).
+
+        Returns:
+            dict: Copia del cliente o None si no existe
+        """
+        self._asegurar_cargado(supabase)
+        cliente = self._por_nombre.get(_clave_nombre(nombre))
+        return dict(cliente) if cliente else None
+
+    def nombre(self, supabase: Client, cliente_id, default: str = 'Cliente desconocido') -> str:
+        """
+        Nombre del cliente para listados.
+        """
+        if not cliente_id:
+            return 'Sin cliente'
+        try:
+            cliente = self.obtener(supabase, cliente_id)
+        except Exception:
+            cliente = None
+        return (cliente or {}).get('nombre') or default
+
+    # ------------------------------------------------------------------------
+    # Write-through
+    # ------------------------------------------------------------------------
+
+    def guardar(self, cliente: dict) -> dict:
+        """
+        Inserta o reemplaza un cliente en el índice (tras un insert/update).
+        """
+        with self._lock:
+            anterior = self._por_id.get(str(cliente['id']))
+            if anterior is not None:
+                self._por_nombre.pop(_clave_nombre(anterior.get('nombre')), None)
+                cliente = {**anterior, **cliente}
+
+            self._por_id[str(cliente['id'])] = cliente
+            self._por_nombre[_clave_nombre(cliente.get('nombre'))] = cliente
+        return cliente
+
+    def actualizar(self, cliente_id, cambios: dict):
+        """
+        Aplica cambios de campos ya guardados en Supabase.
+        """
+        with self._lock:
+            existe = str(cliente_id) in self._por_id
+        if existe:
+            self.guardar({'id': cliente_id, **cambios})
+
+    def eliminar(self, cliente_id):
+        """
+        Quita un cliente del índice (tras un delete).
+        """
+        with self._lock:
+            cliente = self._por_id.pop(str(cliente_id), None)
+            if cliente is not None:
+                self._por_nombre.pop(_clave_nombre(cliente.get('nombre')), None)
+
+
+# Instancia única del proceso
+directorio_clientes = DirectorioClientes()
@@ -9,39 +9,107 @@ Fecha: 21/01/2026
 Versión: 1.0.0
 """
 
+import asyncio
+
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from supabase import Client
 
-from db_manager import inicializar_supabase
+from callback_router import (
+    EDITAR_CLIENTE,
+    EDITAR_ESTADO,
+    EDITAR_FEE,
+    SET_ESTADO,
+    TOGGLE_COMISION,
+    VER_CLIENTES_PAGINA,
+    callback,
+    extraer_extra,
+    extraer_id,
+)
+from cache_pantallas import PANTALLA_CLIENTES, Pantalla, cache_pantallas
+from db_async import ejecutar
+from recordatorios import servicio_recordatorios
+from db_manager import obtener_supabase
+from directorio_clientes import COLUMNAS_CLIENTE, directorio_clientes
 
 
 # ============================================================================
 # FUNCIONES AUXILIARES
 # ============================================================================
 
-def get_todos_clientes(supabase: Client) -> list:
+# Clientes por pantalla en el listado del bot
+CLIENTES_POR_PAGINA = 10
+
+
+def get_pagina_clientes(supabase: Client, pagina: int = 0) -> dict:
     """
-    Obtiene TODOS los clientes (activos e inactivos).
+    Obtiene una página de clientes (activos e inactivos) ordenada por nombre.
+    
+    Solo trae las columnas que muestra el listado y el total vía count.
     
     Args:
         supabase: Cliente de Supabase
+        pagina: Número de página (desde 0)
     
     Returns:
-        list: Lista de clientes o {'error': str}
+        dict: {'clientes': list, 'total': int, 'pagina': int, 'paginas': int} o {'error': str}
     """
     try:
-        print("📋 Consultando todos los clientes...")
-        response = supabase.table('clientes').select('*').order('nombre').execute()
+        pagina = max(0, pagina)
+        desde = pagina * CLIENTES_POR_PAGINA
+        print(f"📋 Consultando clientes (página {pagina + 1})...")
+        
+        response = supabase.table('clientes') \
+            .select('id, nombre, estado', count='exact') \
+            .order('nombre') \
+            .range(desde, desde + CLIENTES_POR_PAGINA - 1) \
+            .execute()
         
         if not hasattr(response, 'data') or response.data is None:
             raise Exception("Respuesta inválida de la tabla clientes")
         
-        print(f"✅ {len(response.data)} clientes encontrados")
-        return response.data
+        total = response.count or 0
+        paginas = max(1, -(-total // CLIENTES_POR_PAGINA))
+        
+        return {
+            'clientes': response.data,
+            'total': total,
+            'pagina': pagina,
+            'paginas': paginas
+        }
         
     except Exception as e:
-        print(f"❌ Error en get_todos_clientes: {e}")
+        print(f"❌ Error en get_pagina_clientes: {e}")
+        return {'error': str(e)}
+
+
+def get_resumen_clientes(supabase: Client) -> dict:
+    """
+    Obtiene los totales de clientes en una sola consulta agregada
+    (vista_resumen_clientes, ver migration_clientes_v2.sql).
+    
+    Args:
+        supabase: Cliente de Supabase
+    
+    Returns:
+        dict: {activos, con_comision, ingresos_proyectados, costo_agustin} o {'error': str}
+    """
+    try:
+        response = supabase.table('vista_resumen_clientes').select('*').execute()
+        
+        if not hasattr(response, 'data') or not response.data:
+            raise Exception("Respuesta inválida de vista_resumen_clientes")
+        
+        fila = response.data[0]
+        return {
+            'activos': int(fila.get('clientes_activos') or 0),
+            'con_comision': int(fila.get('clientes_con_comision') or 0),
+            'ingresos_proyectados': float(fila.get('ingresos_proyectados') or 0),
+            'costo_agustin': float(fila.get('costo_agustin') or 0)
+        }
+        
+    except Exception as e:
+        print(f"❌ Error en get_resumen_clientes: {e}")
         return {'error': str(e)}
 
 
@@ -65,6 +133,14 @@ def actualizar_cliente_campo(supabase: Client, cliente_id: str, campo: str, valo
         if not hasattr(response, 'data') or response.data is None:
             raise Exception("Error al actualizar cliente")
         
+        # Write-through al directorio en memoria
+        if response.data:
+            directorio_clientes.guardar(response.data[0])
+        else:
+            directorio_clientes.actualizar(cliente_id, {campo: valor})
+        cache_pantallas.invalidar_por('clientes')
+        servicio_recordatorios.invalidar()
+        
         print(f"✅ Cliente actualizado correctamente")
         return True
         
@@ -77,62 +153,99 @@ def actualizar_cliente_campo(supabase: Client, cliente_id: str, campo: str, valo
 # HANDLERS
 # ============================================================================
 
-async def handler_ver_clientes(update: Update, context: ContextTypes.DEFAULT_TYPE):
+async def construir_pantalla_clientes(supabase: Client, pagina: int = 0) -> Pantalla:
     """
-    Muestra la lista de clientes con opciones de edición.
+    Arma el listado paginado de clientes con su resumen.
+    
+    La página y los totales se consultan en paralelo.
+    
+    Args:
+        supabase: Cliente de Supabase
+        pagina: Número de página (desde 0)
+    
+    Returns:
+        Pantalla: (mensaje, reply_markup, cacheable)
     """
-    query = update.callback_query
-    await query.answer()
+    datos, resumen = await asyncio.gather(
+        ejecutar(get_pagina_clientes, supabase, pagina),
+        ejecutar(get_resumen_clientes, supabase)
+    )
     
-    supabase = inicializar_supabase()
-    clientes = get_todos_clientes(supabase)
+    volver = [InlineKeyboardButton("🔙 Volver", callback_data='menu_principal')]
     
-    if isinstance(clientes, dict) and 'error' in clientes:
-        mensaje = f"❌ **ERROR**\n\n`{clientes['error']}`"
-        keyboard = [[InlineKeyboardButton("🔙 Volver", callback_data='menu_principal')]]
-    elif not clientes:
-        mensaje = "📋 **CLIENTES**\n\nNo hay clientes en el sistema."
-        keyboard = [[InlineKeyboardButton("🔙 Volver", callback_data='menu_principal')]]
-    else:
-        # Calcular resumen
-        activos = sum(1 for c in clientes if c.get('estado') == 'Activo')
-        con_comision = sum(1 for c in clientes if c.get('estado') == 'Activo' and c.get('comisiona_agustin', False))
-        ingresos_proy = sum(float(c.get('fee_mensual', 0) or 0) for c in clientes if c.get('estado') == 'Activo')
-        costo_agustin = con_comision * 55
-        
-        mensaje = f"""
+    error = datos.get('error') or resumen.get('error')
+    if error:
+        return Pantalla(f"❌ **ERROR**\n\n`{error}`", InlineKeyboardMarkup([volver]), cacheable=False)
+    
+    if not datos['total']:
+        return Pantalla("📋 **CLIENTES**\n\nNo hay clientes en el sistema.", InlineKeyboardMarkup([volver]))
+    
+    mensaje = f"""
 📋 **GESTIÓN DE CLIENTES**
 
 **Resumen:**
-👥 Total: {len(clientes)}
-✅ Activos: {activos}
-💰 Con comisión: {con_comision}
-💵 Ingresos proyectados: ${ingresos_proy:,.2f} USD
-💸 Costo Agustín: ${costo_agustin:,.2f} USD
+👥 Total: {datos['total']}
+✅ Activos: {resumen['activos']}
+💰 Con comisión: {resumen['con_comision']}
+💵 Ingresos proyectados: ${resumen['ingresos_proyectados']:,.2f} USD
+💸 Costo Agustín: ${resumen['costo_agustin']:,.2f} USD
 
 ---
 
-**Selecciona un cliente para editar:**
+**Selecciona un cliente para editar** (página {datos['pagina'] + 1}/{datos['paginas']}):
 """
+    
+    # Crear botones para cada cliente de la página
+    keyboard = []
+    for cliente in datos['clientes']:
+        nombre = cliente.get('nombre', 'Sin nombre')
+        estado = cliente.get('estado', 'Inactivo')
+        emoji = "✅" if estado == 'Activo' else "⚠️"
         
-        # Crear botones para cada cliente
-        keyboard = []
-        for cliente in clientes[:10]:  # Limitar a 10 para no exceder límite de botones
-            nombre = cliente.get('nombre', 'Sin nombre')
-            estado = cliente.get('estado', 'Inactivo')
-            emoji = "✅" if estado == 'Activo' else "⚠️"
-            
-            keyboard.append([
-                InlineKeyboardButton(
-                    f"{emoji} {nombre} ({estado})", 
-                    callback_data=f'editar_cliente_{cliente["id"]}'
-                )
-            ])
-        
-        keyboard.append([InlineKeyboardButton("🔙 Volver", callback_data='menu_principal')])
+        keyboard.append([
+            InlineKeyboardButton(
+                f"{emoji} {nombre} ({estado})", 
+                callback_data=callback(EDITAR_CLIENTE, cliente['id'])
+            )
+        ])
     
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    await query.edit_message_text(mensaje, parse_mode='Markdown', reply_markup=reply_markup)
+    # Navegación entre páginas
+    navegacion = []
+    if datos['pagina'] > 0:
+        navegacion.append(InlineKeyboardButton("◀️ Anterior", callback_data=callback(VER_CLIENTES_PAGINA, extra=datos['pagina'] - 1)))
+    if datos['pagina'] + 1 < datos['paginas']:
+        navegacion.append(InlineKeyboardButton("Siguiente ▶️", callback_data=callback(VER_CLIENTES_PAGINA, extra=datos['pagina'] + 1)))
+    if navegacion:
+        keyboard.append(navegacion)
+    
+    keyboard.append(volver)
+    
+    return Pantalla(mensaje, InlineKeyboardMarkup(keyboard))
+
+
+async def obtener_pantalla_clientes(supabase: Client, pagina: int = 0) -> Pantalla:
+    """
+    Pantalla de clientes desde la caché (se arma solo si hubo cambios).
+    """
+    return await cache_pantallas.obtener(
+        (PANTALLA_CLIENTES, pagina),
+        lambda: construir_pantalla_clientes(supabase, pagina)
+    )
+
+
+async def handler_ver_clientes(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Muestra una página de la lista de clientes con opciones de edición.
+    """
+    query = update.callback_query
+    await query.answer()
+    
+    pagina = int(extraer_extra(query.data) or 0)
+    
+    supabase = obtener_supabase(context)
+    pantalla = await obtener_pantalla_clientes(supabase, pagina)
+    
+    await query.edit_message_text(pantalla.mensaje, parse_mode='Markdown', reply_markup=pantalla.reply_markup)
 
 
 async def handler_editar_cliente(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -142,13 +255,14 @@ async def handler_editar_cliente(update: Update, context: ContextTypes.DEFAULT_T
     query = update.callback_query
     await query.answer()
     
-    cliente_id = query.data.split('_')[-1]
+    cliente_id = extraer_id(query.data)
     
-    supabase = inicializar_supabase()
+    supabase = obtener_supabase(context)
     
     try:
-        response = supabase.table('clientes').select('*').eq('id', cliente_id).single().execute()
-        cliente = response.data
+        cliente = await directorio_clientes.obtener_async(supabase, cliente_id)
+        if cliente is None:
+            raise Exception(f"Cliente con ID {cliente_id} no encontrado")
         
         nombre = cliente.get('nombre', 'Sin nombre')
         estado = cliente.get('estado', 'Inactivo')
@@ -169,11 +283,11 @@ async def handler_editar_cliente(update: Update, context: ContextTypes.DEFAULT_T
 """
         
         keyboard = [
-            [InlineKeyboardButton("🔄 Cambiar Estado", callback_data=f'edit_estado_{cliente_id}')],
-            [InlineKeyboardButton("💵 Cambiar Fee Mensual", callback_data=f'edit_fee_{cliente_id}')],
+            [InlineKeyboardButton("🔄 Cambiar Estado", callback_data=callback(EDITAR_ESTADO, cliente_id))],
+            [InlineKeyboardButton("💵 Cambiar Fee Mensual", callback_data=callback(EDITAR_FEE, cliente_id))],
             [InlineKeyboardButton(
                 f"{'✅' if not comisiona else '❌'} {'Activar' if not comisiona else 'Desactivar'} Comisión",
-                callback_data=f'toggle_comision_{cliente_id}'
+                callback_data=callback(TOGGLE_COMISION, cliente_id)
             )],
             [InlineKeyboardButton("🔙 Volver a Lista", callback_data='ver_clientes')],
         ]
@@ -195,7 +309,7 @@ async def handler_edit_estado(update: Update, context: ContextTypes.DEFAULT_TYPE
     query = update.callback_query
     await query.answer()
     
-    cliente_id = query.data.split('_')[-1]
+    cliente_id = extraer_id(query.data)
     
     mensaje = """
 🔄 **CAMBIAR ESTADO**
@@ -208,10 +322,10 @@ Selecciona el nuevo estado:
     
     for estado in estados:
         keyboard.append([
-            InlineKeyboardButton(estado, callback_data=f'set_estado_{cliente_id}_{estado}')
+            InlineKeyboardButton(estado, callback_data=callback(SET_ESTADO, cliente_id, estado))
         ])
     
-    keyboard.append([InlineKeyboardButton("🔙 Cancelar", callback_data=f'editar_cliente_{cliente_id}')])
+    keyboard.append([InlineKeyboardButton("🔙 Cancelar", callback_data=callback(EDITAR_CLIENTE, cliente_id))])
     
     reply_markup = InlineKeyboardMarkup(keyboard)
     await query.edit_message_text(mensaje, parse_mode='Markdown', reply_markup=reply_markup)
@@ -224,13 +338,12 @@ async def handler_set_estado(update: Update, context: ContextTypes.DEFAULT_TYPE)
     query = update.callback_query
     await query.answer()
     
-    parts = query.data.split('_')
-    cliente_id = parts[2]
-    nuevo_estado = parts[3]
+    cliente_id = extraer_id(query.data)
+    nuevo_estado = extraer_extra(query.data)
     
-    supabase = inicializar_supabase()
+    supabase = obtener_supabase(context)
     
-    if actualizar_cliente_campo(supabase, cliente_id, 'estado', nuevo_estado):
+    if await ejecutar(actualizar_cliente_campo, supabase, cliente_id, 'estado', nuevo_estado):
         await query.answer(f"✅ Estado actualizado a: {nuevo_estado}", show_alert=True)
     else:
         await query.answer("❌ Error al actualizar estado", show_alert=True)
@@ -248,7 +361,7 @@ async def handler_edit_fee(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
     
-    cliente_id = query.data.split('_')[-1]
+    cliente_id = extraer_id(query.data)
     
     # Guardar el cliente_id en el contexto de usuario
     context.user_data['editando_fee_cliente'] = cliente_id
@@ -282,9 +395,9 @@ async def procesar_nuevo_fee(update: Update, context: ContextTypes.DEFAULT_TYPE)
             await update.message.reply_text("❌ El monto debe ser positivo. Intenta de nuevo.")
             return
         
-        supabase = inicializar_supabase()
+        supabase = obtener_supabase(context)
         
-        if actualizar_cliente_campo(supabase, cliente_id, 'fee_mensual', nuevo_fee):
+        if await ejecutar(actualizar_cliente_campo, supabase, cliente_id, 'fee_mensual', nuevo_fee):
             await update.message.reply_text(f"✅ Fee mensual actualizado a: ${nuevo_fee:.2f} USD")
             del context.user_data['editando_fee_cliente']
         else:
@@ -301,19 +414,25 @@ async def handler_toggle_comision(update: Update, context: ContextTypes.DEFAULT_
     query = update.callback_query
     await query.answer()
     
-    cliente_id = query.data.split('_')[-1]
+    cliente_id = extraer_id(query.data)
     
-    supabase = inicializar_supabase()
+    supabase = obtener_supabase(context)
     
     try:
-        # Obtener estado actual
-        response = supabase.table('clientes').select('comisiona_agustin').eq('id', cliente_id).single().execute()
-        comisiona_actual = response.data.get('comisiona_agustin', False)
+        # Estado actual desde Supabase: el directorio puede estar desactualizado
+        # (ediciones desde la webapp u otro proceso) y se invertiría un valor viejo
+        response = await ejecutar(
+            supabase.table('clientes').select(COLUMNAS_CLIENTE).eq('id', cliente_id).execute
+        )
+        if not response.data:
+            raise Exception(f"Cliente con ID {cliente_id} no encontrado")
+        cliente = directorio_clientes.guardar(response.data[0])
+        comisiona_actual = bool(cliente.get('comisiona_agustin', False))
         
         # Invertir el valor
         nuevo_valor = not comisiona_actual
         
-        if actualizar_cliente_campo(supabase, cliente_id, 'comisiona_agustin', nuevo_valor):
+        if await ejecutar(actualizar_cliente_campo, supabase, cliente_id, 'comisiona_agustin', nuevo_valor):
             texto = "✅ Comisión activada" if nuevo_valor else "❌ Comisión desactivada"
             await query.answer(texto, show_alert=True)
         else:
@@ -14,22 +14,35 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from supabase import Client
 
-from utils import limpiar_id, formato_argentino
+from utils import formato_argentino, nombre_periodo, periodo_actual
+from callback_router import (
+    CONFIRMAR_BORRAR_COSTO,
+    EDITAR_MONTO_COSTO,
+    EDITAR_NOMBRE_COSTO,
+    NUEVO_COSTO_TIPO,
+    callback,
+    extraer_extra,
+    extraer_id,
+)
+from cache_pantallas import PANTALLA_COSTOS, Pantalla, cache_pantallas
+from db_async import ejecutar
 from db_manager import get_ultimos_costos, get_resumen_financiero, get_costos_agrupados
+from resumen_mensual import registrar_costo, reemplazar_costo
 
 
 # ============================================================================
 # HANDLERS DE BOTONES - COSTOS
 # ============================================================================
 
-async def handler_gestionar_costos(query, supabase: Client):
-    """
-    Muestra los costos agrupados por tipo (Fijo/Variable).
+async def construir_pantalla_costos(supabase: Client) -> Pantalla:
     """
-    await query.edit_message_text("⏳ Consultando costos...")
+    Arma la pantalla de costos del mes agrupados por tipo (Fijo/Variable).
     
-    # Obtener costos agrupados de Enero 2026
-    costos_agrupados = get_costos_agrupados(supabase)
+    Returns:
+        Pantalla: (mensaje, reply_markup, cacheable)
+    """
+    # Obtener costos agrupados del mes en curso
+    costos_agrupados = await ejecutar(get_costos_agrupados, supabase)
     
     if isinstance(costos_agrupados, dict) and 'error' in costos_agrupados:
         mensaje = f"""
@@ -41,9 +54,7 @@ No se pudieron cargar los costos.
 `{costos_agrupados['error']}`
 """
         keyboard = [[InlineKeyboardButton("🔙 Volver al Menú", callback_data='menu_principal')]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await query.edit_message_text(mensaje, parse_mode='Markdown', reply_markup=reply_markup)
-        return
+        return Pantalla(mensaje, InlineKeyboardMarkup(keyboard), cacheable=False)
     
     total_fijo = costos_agrupados.get('total_fijo', 0)
     total_variable = costos_agrupados.get('total_variable', 0)
@@ -60,12 +71,10 @@ No hay costos registrados todavía.
 Usa el botón "💸 Nuevo Costo" para agregar uno.
 """
         keyboard = [[InlineKeyboardButton("🔙 Volver al Menú", callback_data='menu_principal')]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await query.edit_message_text(mensaje, parse_mode='Markdown', reply_markup=reply_markup)
-        return
+        return Pantalla(mensaje, InlineKeyboardMarkup(keyboard))
     
     # Construir mensaje con costos agrupados
-    mensaje = f"⚙️ **GESTIONAR COSTOS - ENERO 2026**\n\n"
+    mensaje = f"⚙️ **GESTIONAR COSTOS - {nombre_periodo(periodo_actual())}**\n\n"
     mensaje += f"💰 **TOTAL: ${total_general:,.2f} USD**\n\n"
     
     # Costos Fijos
@@ -97,8 +106,20 @@ Usa el botón "💸 Nuevo Costo" para agregar uno.
     
     # Botón de volver
     keyboard = [[InlineKeyboardButton("🔙 Volver al Menú", callback_data='menu_principal')]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    await query.edit_message_text(mensaje, parse_mode='Markdown', reply_markup=reply_markup)
+    return Pantalla(mensaje, InlineKeyboardMarkup(keyboard))
+
+
+async def handler_gestionar_costos(query, supabase: Client):
+    """
+    Muestra los costos agrupados por tipo (desde la caché si no hubo cambios).
+    """
+    # El periodo es parte de la clave: al cambiar de mes se arma de nuevo
+    clave = (PANTALLA_COSTOS, periodo_actual())
+    if not cache_pantallas.contiene(clave):
+        await query.edit_message_text("⏳ Consultando costos...")
+    
+    pantalla = await cache_pantallas.obtener(clave, lambda: construir_pantalla_costos(supabase))
+    await query.edit_message_text(pantalla.mensaje, parse_mode='Markdown', reply_markup=pantalla.reply_markup)
 
 
 async def handler_editar_costo(query, supabase: Client):
@@ -106,11 +127,11 @@ async def handler_editar_costo(query, supabase: Client):
     Muestra opciones para editar un costo (nombre o monto).
     """
     # CRÍTICO: Limpiar el ID usando la función segura
-    costo_id = limpiar_id(query.data)
+    costo_id = extraer_id(query.data)
     print(f"🔍 [EDITAR] ID limpio: '{costo_id}' (longitud: {len(costo_id)})")
     
     try:
-        response = supabase.table('costos').select('id, nombre, monto_usd').eq('id', costo_id).execute()
+        response = await ejecutar(supabase.table('costos').select('id, nombre, monto_usd').eq('id', costo_id).execute)
         
         if response.data and len(response.data) > 0:
             costo = response.data[0]
@@ -126,8 +147,8 @@ async def handler_editar_costo(query, supabase: Client):
 ¿Qué deseas cambiar?
 """
             keyboard = [
-                [InlineKeyboardButton("📝 Cambiar Nombre", callback_data=f'edit_nombre_{costo_id}')],
-                [InlineKeyboardButton("💰 Cambiar Monto", callback_data=f'edit_monto_{costo_id}')],
+                [InlineKeyboardButton("📝 Cambiar Nombre", callback_data=callback(EDITAR_NOMBRE_COSTO, costo_id))],
+                [InlineKeyboardButton("💰 Cambiar Monto", callback_data=callback(EDITAR_MONTO_COSTO, costo_id))],
                 [InlineKeyboardButton("❌ Cancelar", callback_data='gestionar_costos')]
             ]
             reply_markup = InlineKeyboardMarkup(keyboard)
@@ -153,7 +174,7 @@ async def handler_edit_nombre(query, context: ContextTypes.DEFAULT_TYPE):
     Solicita el nuevo nombre para un costo.
     """
     # CRÍTICO: Limpiar el ID
-    costo_id = limpiar_id(query.data)
+    costo_id = extraer_id(query.data)
     print(f"🔍 [EDIT_NOMBRE] ID limpio guardado en context: '{costo_id}'")
     
     context.user_data['costo_id_editar'] = costo_id
@@ -174,7 +195,7 @@ async def handler_edit_monto(query, context: ContextTypes.DEFAULT_TYPE):
     Solicita el nuevo monto para un costo.
     """
     # CRÍTICO: Limpiar el ID
-    costo_id = limpiar_id(query.data)
+    costo_id = extraer_id(query.data)
     print(f"🔍 [EDIT_MONTO] ID limpio guardado en context: '{costo_id}'")
     
     context.user_data['costo_id_editar'] = costo_id
@@ -197,11 +218,11 @@ async def handler_borrar_costo(query, supabase: Client):
     Solicita confirmación para borrar un costo.
     """
     # CRÍTICO: Limpiar el ID
-    costo_id = limpiar_id(query.data)
+    costo_id = extraer_id(query.data)
     print(f"🔍 [BORRAR] ID limpio: '{costo_id}' (longitud: {len(costo_id)})")
     
     try:
-        response = supabase.table('costos').select('id, nombre, monto_usd').eq('id', costo_id).execute()
+        response = await ejecutar(supabase.table('costos').select('id, nombre, monto_usd').eq('id', costo_id).execute)
         
         if response.data and len(response.data) > 0:
             costo = response.data[0]
@@ -219,7 +240,7 @@ async def handler_borrar_costo(query, supabase: Client):
 Esta acción NO se puede deshacer.
 """
             keyboard = [
-                [InlineKeyboardButton("✅ Sí, eliminar", callback_data=f'confirmar_borrar_costo_{costo_id}')],
+                [InlineKeyboardButton("✅ Sí, eliminar", callback_data=callback(CONFIRMAR_BORRAR_COSTO, costo_id))],
                 [InlineKeyboardButton("❌ No, cancelar", callback_data='gestionar_costos')]
             ]
             reply_markup = InlineKeyboardMarkup(keyboard)
@@ -245,16 +266,21 @@ async def handler_confirmar_borrar_costo(query, supabase: Client):
     Elimina el costo confirmado por el usuario.
     """
     # CRÍTICO: Limpiar el ID
-    costo_id = limpiar_id(query.data)
+    costo_id = extraer_id(query.data)
     print(f"🔍 [CONFIRMAR_BORRAR] ID limpio: '{costo_id}' (longitud: {len(costo_id)})")
     
     await query.edit_message_text("⏳ Eliminando costo...")
     
     try:
-        supabase.table('costos').delete().eq('id', costo_id).execute()
+        response = await ejecutar(supabase.table('costos').delete().eq('id', costo_id).execute)
+        
+        # Descontar del rollup mensual la fila efectivamente borrada
+        for costo in response.data or []:
+            await ejecutar(registrar_costo, supabase, costo, signo=-1)
+        cache_pantallas.invalidar_por('costos')
         
         # Recalcular neto
-        resumen = get_resumen_financiero(supabase)
+        resumen = await ejecutar(get_resumen_financiero, supabase)
         
         if 'error' not in resumen:
             total_usd = resumen['total_usd']
@@ -309,8 +335,8 @@ Selecciona el tipo:
 """
     
     keyboard = [
-        [InlineKeyboardButton("📊 Fijo", callback_data='nuevo_costo_tipo_Fijo')],
-        [InlineKeyboardButton("💸 Variable", callback_data='nuevo_costo_tipo_Variable')],
+        [InlineKeyboardButton("📊 Fijo", callback_data=callback(NUEVO_COSTO_TIPO, extra='Fijo'))],
+        [InlineKeyboardButton("💸 Variable", callback_data=callback(NUEVO_COSTO_TIPO, extra='Variable'))],
         [InlineKeyboardButton("❌ Cancelar", callback_data='menu_principal')]
     ]
     reply_markup = InlineKeyboardMarkup(keyboard)
@@ -321,6 +347,20 @@ Selecciona el tipo:
 # PROCESADORES DE TEXTO - COSTOS
 # ============================================================================
 
+def _leer_costo(supabase: Client, costo_id: str) -> dict:
+    """
+    Lee la fila actual de un costo (antes de editarlo, para ajustar el rollup).
+    
+    Returns:
+        dict: Fila del costo o None si no existe
+    """
+    response = supabase.table('costos') \
+        .select('nombre, monto_usd, monto_ars, tipo, es_calculo_dinamico, created_at') \
+        .eq('id', costo_id) \
+        .execute()
+    return response.data[0] if response.data else None
+
+
 async def procesar_nombre_costo(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Procesa el nombre ingresado para un nuevo costo.
@@ -356,7 +396,7 @@ async def handler_nuevo_costo_tipo_seleccionado(query, context: ContextTypes.DEF
     Usuario seleccionó el tipo de costo (Fijo/Variable).
     """
     # Extraer tipo del callback_data
-    tipo = query.data.replace('nuevo_costo_tipo_', '')
+    tipo = extraer_extra(query.data)
     context.user_data['costo_tipo'] = tipo
     context.user_data['esperando_costo_nombre'] = True
     
@@ -455,9 +495,11 @@ async def procesar_observacion_costo(update: Update, context: ContextTypes.DEFAU
             'created_at': datetime.now().isoformat()
         }
         
-        supabase.table('costos').insert(costo_data).execute()
+        response = await ejecutar(supabase.table('costos').insert(costo_data).execute)
+        await ejecutar(registrar_costo, supabase, (response.data or [costo_data])[0])
+        cache_pantallas.invalidar_por('costos')
         
-        resumen = get_resumen_financiero(supabase)
+        resumen = await ejecutar(get_resumen_financiero, supabase)
         
         if 'error' not in resumen:
             total_usd = resumen['total_usd']
@@ -522,7 +564,13 @@ async def procesar_editar_nombre_costo(update: Update, context: ContextTypes.DEF
     print(f"🔍 [PROCESAR_NOMBRE] ID para UPDATE: '{costo_id}'")
     
     try:
-        supabase.table('costos').update({'nombre': texto}).eq('id', costo_id).execute()
+        anterior = await ejecutar(_leer_costo, supabase, costo_id)
+        response = await ejecutar(supabase.table('costos').update({'nombre': texto}).eq('id', costo_id).execute)
+        
+        # El nombre define si el costo es dinámico (Agustín): reajustar el rollup
+        if anterior and response.data:
+            await ejecutar(reemplazar_costo, supabase, anterior, response.data[0])
+        cache_pantallas.invalidar_por('costos')
         
         context.user_data.clear()
         
@@ -572,7 +620,12 @@ async def procesar_editar_monto_costo(update: Update, context: ContextTypes.DEFA
     print(f"🔍 [PROCESAR_MONTO] ID para UPDATE: '{costo_id}'")
     
     try:
-        supabase.table('costos').update({'monto_usd': monto_usd}).eq('id', costo_id).execute()
+        anterior = await ejecutar(_leer_costo, supabase, costo_id)
+        response = await ejecutar(supabase.table('costos').update({'monto_usd': monto_usd}).eq('id', costo_id).execute)
+        
+        if anterior and response.data:
+            await ejecutar(reemplazar_costo, supabase, anterior, response.data[0])
+        cache_pantallas.invalidar_por('costos')
         
         context.user_data.clear()
         
@@ -14,8 +14,20 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from supabase import Client
 
-from utils import limpiar_id, formato_argentino
-from db_manager import get_clientes_activos, get_ultimos_ingresos, get_resumen_financiero, get_dolar_blue
+from utils import formato_argentino
+from callback_router import (
+    BORRAR_INGRESO,
+    CLIENTE_PAGO,
+    CONFIRMAR_BORRAR_INGRESO,
+    callback,
+    extraer_id,
+)
+from cache_pantallas import PANTALLA_MOVIMIENTOS, Pantalla, cache_pantallas
+from cotizacion_dolar import obtener_cotizacion_blue
+from db_async import ejecutar
+from directorio_clientes import directorio_clientes
+from db_manager import get_clientes_activos, get_ultimos_ingresos, get_resumen_financiero
+from resumen_mensual import registrar_ingreso
 
 
 # ============================================================================
@@ -28,7 +40,7 @@ async def handler_nuevo_pago(query, supabase: Client):
     """
     await query.edit_message_text("⏳ Consultando clientes activos...")
     
-    clientes = get_clientes_activos(supabase)
+    clientes = await ejecutar(get_clientes_activos, supabase)
     
     if isinstance(clientes, dict) and 'error' in clientes:
         mensaje = f"""
@@ -66,7 +78,7 @@ Selecciona el cliente que te pagó:
     for cliente in clientes:
         cliente_id = cliente.get('id')
         nombre = cliente.get('nombre', 'Sin nombre')
-        keyboard.append([InlineKeyboardButton(f"👤 {nombre}", callback_data=f'cliente_{cliente_id}')])
+        keyboard.append([InlineKeyboardButton(f"👤 {nombre}", callback_data=callback(CLIENTE_PAGO, cliente_id))])
     
     keyboard.append([InlineKeyboardButton("❌ Cancelar", callback_data='menu_principal')])
     
@@ -79,13 +91,12 @@ async def handler_cliente_seleccionado(query, context: ContextTypes.DEFAULT_TYPE
     Usuario seleccionó un cliente para registrar pago.
     """
     # Extraer cliente_id del callback_data
-    cliente_id = query.data.replace('cliente_', '')
+    cliente_id = extraer_id(query.data)
     
     try:
-        response = supabase.table('clientes').select('id, nombre, honorario_usd').eq('id', cliente_id).execute()
+        cliente = await directorio_clientes.obtener_async(supabase, cliente_id)
         
-        if response.data and len(response.data) > 0:
-            cliente = response.data[0]
+        if cliente:
             nombre_cliente = cliente.get('nombre', 'Cliente')
             honorario_sugerido = cliente.get('honorario_usd', 0)
             
@@ -126,13 +137,14 @@ No se pudo obtener la información del cliente.
         await query.edit_message_text(mensaje, parse_mode='Markdown', reply_markup=reply_markup)
 
 
-async def handler_ver_movimientos(query, supabase: Client):
-    """
-    Muestra los últimos movimientos/ingresos.
+async def construir_pantalla_movimientos(supabase: Client) -> Pantalla:
     """
-    await query.edit_message_text("⏳ Consultando últimos movimientos...")
+    Arma la pantalla de últimos movimientos/ingresos.
     
-    ingresos = get_ultimos_ingresos(supabase, limite=10)
+    Returns:
+        Pantalla: (mensaje, reply_markup, cacheable)
+    """
+    ingresos = await ejecutar(get_ultimos_ingresos, supabase, limite=10)
     
     if isinstance(ingresos, dict) and 'error' in ingresos:
         mensaje = f"""
@@ -144,9 +156,7 @@ No se pudieron cargar los movimientos.
 `{ingresos['error']}`
 """
         keyboard = [[InlineKeyboardButton("🔙 Volver al Menú", callback_data='menu_principal')]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await query.edit_message_text(mensaje, parse_mode='Markdown', reply_markup=reply_markup)
-        return
+        return Pantalla(mensaje, InlineKeyboardMarkup(keyboard), cacheable=False)
     
     if not ingresos:
         mensaje = """
@@ -157,9 +167,7 @@ No hay ingresos registrados todavía.
 Usa el botón "📥 Nuevo Pago" para agregar uno.
 """
         keyboard = [[InlineKeyboardButton("🔙 Volver al Menú", callback_data='menu_principal')]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await query.edit_message_text(mensaje, parse_mode='Markdown', reply_markup=reply_markup)
-        return
+        return Pantalla(mensaje, InlineKeyboardMarkup(keyboard))
     
     # Construir lista de movimientos
     mensaje = "📜 **ÚLTIMOS MOVIMIENTOS**\n\n"
@@ -185,13 +193,24 @@ Usa el botón "📥 Nuevo Pago" para agregar uno.
         mensaje += f"   📅 {fecha_fmt}\n\n"
         
         keyboard.append([
-            InlineKeyboardButton(f"❌ Borrar #{idx} ({cliente_nombre})", callback_data=f'borrar_ingreso_{ingreso_id}')
+            InlineKeyboardButton(f"❌ Borrar #{idx} ({cliente_nombre})", callback_data=callback(BORRAR_INGRESO, ingreso_id))
         ])
     
     keyboard.append([InlineKeyboardButton("🔙 Volver al Menú", callback_data='menu_principal')])
     
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    await query.edit_message_text(mensaje, parse_mode='Markdown', reply_markup=reply_markup)
+    return Pantalla(mensaje, InlineKeyboardMarkup(keyboard))
+
+
+async def handler_ver_movimientos(query, supabase: Client):
+    """
+    Muestra los últimos movimientos/ingresos (desde la caché si no hubo cambios).
+    """
+    clave = (PANTALLA_MOVIMIENTOS,)
+    if not cache_pantallas.contiene(clave):
+        await query.edit_message_text("⏳ Consultando últimos movimientos...")
+    
+    pantalla = await cache_pantallas.obtener(clave, lambda: construir_pantalla_movimientos(supabase))
+    await query.edit_message_text(pantalla.mensaje, parse_mode='Markdown', reply_markup=pantalla.reply_markup)
 
 
 async def handler_borrar_ingreso(query, supabase: Client):
@@ -199,13 +218,13 @@ async def handler_borrar_ingreso(query, supabase: Client):
     Pide confirmación para borrar un ingreso.
     """
     # Extraer ingreso_id
-    ingreso_id = query.data.replace('borrar_ingreso_', '')
+    ingreso_id = extraer_id(query.data)
     
     try:
-        response = supabase.table('ingresos') \
+        consulta = supabase.table('ingresos') \
             .select('id, cliente_id, monto_usd_total, monto_ars, fecha_cobro') \
-            .eq('id', ingreso_id) \
-            .execute()
+            .eq('id', ingreso_id)
+        response = await ejecutar(consulta.execute)
         
         if response.data and len(response.data) > 0:
             ingreso = response.data[0]
@@ -216,12 +235,9 @@ async def handler_borrar_ingreso(query, supabase: Client):
             cliente_nombre = 'Cliente desconocido'
             if cliente_id:
                 try:
-                    cliente_response = supabase.table('clientes') \
-                        .select('nombre') \
-                        .eq('id', cliente_id) \
-                        .execute()
-                    if cliente_response.data and len(cliente_response.data) > 0:
-                        cliente_nombre = cliente_response.data[0].get('nombre', 'Cliente desconocido')
+                    cliente = await directorio_clientes.obtener_async(supabase, cliente_id)
+                    if cliente:
+                        cliente_nombre = cliente.get('nombre', 'Cliente desconocido')
                 except:
                     pass
             
@@ -236,7 +252,7 @@ async def handler_borrar_ingreso(query, supabase: Client):
 Esta acción NO se puede deshacer.
 """
             keyboard = [
-                [InlineKeyboardButton("✅ Sí, eliminar", callback_data=f'confirmar_borrar_{ingreso_id}')],
+                [InlineKeyboardButton("✅ Sí, eliminar", callback_data=callback(CONFIRMAR_BORRAR_INGRESO, ingreso_id))],
                 [InlineKeyboardButton("❌ No, cancelar", callback_data='ver_movimientos')]
             ]
             reply_markup = InlineKeyboardMarkup(keyboard)
@@ -263,15 +279,20 @@ async def handler_confirmar_borrar_ingreso(query, supabase: Client):
     """
     Confirma y elimina un ingreso.
     """
-    ingreso_id = query.data.replace('confirmar_borrar_', '')
+    ingreso_id = extraer_id(query.data)
     
     await query.edit_message_text("⏳ Eliminando registro...")
     
     try:
-        supabase.table('ingresos').delete().eq('id', ingreso_id).execute()
+        response = await ejecutar(supabase.table('ingresos').delete().eq('id', ingreso_id).execute)
+        
+        # Descontar del rollup mensual la fila efectivamente borrada
+        for ingreso in response.data or []:
+            await ejecutar(registrar_ingreso, supabase, ingreso, signo=-1)
+        cache_pantallas.invalidar_por('ingresos')
         
         # Recalcular neto
-        resumen = get_resumen_financiero(supabase)
+        resumen = await ejecutar(get_resumen_financiero, supabase)
         
         if 'error' not in resumen:
             total_usd = resumen['total_usd']
@@ -363,7 +384,7 @@ async def procesar_monto_pago(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     try:
         # Obtener cotización del dólar
-        cotizacion = get_dolar_blue()
+        cotizacion = await obtener_cotizacion_blue()
         if 'error' in cotizacion:
             print(f"⚠️ Error al obtener cotización, usando fallback")
             dolar_venta = 1500.0
@@ -382,10 +403,12 @@ async def procesar_monto_pago(update: Update, context: ContextTypes.DEFAULT_TYPE
             'created_at': datetime.now().isoformat()
         }
         
-        supabase.table('ingresos').insert(ingreso_data).execute()
+        response = await ejecutar(supabase.table('ingresos').insert(ingreso_data).execute)
+        await ejecutar(registrar_ingreso, supabase, (response.data or [ingreso_data])[0])
+        cache_pantallas.invalidar_por('ingresos')
         
         # Obtener resumen actualizado
-        resumen = get_resumen_financiero(supabase)
+        resumen = await ejecutar(get_resumen_financiero, supabase)
         
         if 'error' not in resumen:
             total_usd = resumen['total_usd']
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+BLACK INFRASTRUCTURE - MONITOR DE SALUD
+========================================
+Verifica Supabase y PST.NET cada HEALTH_CHECK_INTERVAL segundos en una
+tarea de fondo y guarda el resultado en memoria. El menú del bot y
+GET /health leen ese estado en lugar de consultar en cada click.
+
+USO:
+    from health_monitor import monitor_salud
+
+    await monitor_salud.iniciar(supabase)   # post_init del bot / startup de la API
+    monitor_salud.ok('supabase')            # True | False | None (sin verificar aún)
+    monitor_salud.estado()                  # snapshot para /health
+    await monitor_salud.detener()
+
+Autor: Senior Backend Developer
+Fecha: 19/10/2026
+Versión: 1.0.0
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+
+from db_async import ejecutar
+from db_manager import verificar_conexion_supabase
+
+
+# Segundos entre verificaciones
+INTERVALO_SALUD = int(os.getenv('HEALTH_CHECK_INTERVAL', '120'))
+
+
+def _sonda_pst_net():
+    """
+    Verifica PST.NET; None si no hay credenciales configuradas.
+    """
+    from pst_net_integration import PST_NET_API_KEY, test_conexion_pst_net
+
+    if not PST_NET_API_KEY:
+        return None
+    return test_conexion_pst_net()
+
+
+class MonitorSalud:
+    """
+    Estado de los servicios externos compartido por todo el proceso.
+    """
+
+    def __init__(self, intervalo: int = INTERVALO_SALUD):
+        self.intervalo = intervalo
+        self._sondas = {}
+        self._estado = {}
+        self._tarea = None
+
+    # ------------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------------
+
+    async def iniciar(self, supabase=None):
+        """
+        Registra las sondas y lanza la tarea de fondo (una sola por proceso).
+
+        Args:
+            supabase: Cliente de Supabase (sin cliente, solo se verifica PST.NET)
+        """
+        if self._tarea is not None and not self._tarea.done():
+            return
+
+        self._sondas = {'pst_net': _sonda_pst_net}
+        if supabase is not None:
+            self._sondas['supabase'] = lambda: verificar_conexion_supabase(supabase)
+        self._estado = {}
+
+        self._tarea = asyncio.get_running_loop().create_task(self._bucle())
+        print(f"🩺 Monitor de salud iniciado (cada {self.intervalo}s): {', '.join(self._sondas)}")
+
+    async def detener(self):
+        """
+        Cancela la tarea de fondo.
+        """
+        if self._tarea is None:
+            return
+
+        tarea, self._tarea = self._tarea, None
+        tarea.cancel()
+        try:
+            await tarea
+        except asyncio.CancelledError:
+            pass
+        print("🩺 Monitor de salud detenido")
+
+    async def _bucle(self):
+        while True:
+            await self.verificar()
+            await asyncio.sleep(self.intervalo)
+
+    # ------------------------------------------------------------------------
+    # Verificación
+    # ------------------------------------------------------------------------
+
+    async def verificar(self):
+        """
+        Corre todas las sondas en paralelo (en el pool de hilos) y actualiza el estado.
+        """
+        nombres = list(self._sondas)
+        resultados = await asyncio.gather(*(self._medir(nombre) for nombre in nombres))
+
+        for nombre, resultado in zip(nombres, resultados):
+            anterior = self._estado.get(nombre, {}).get('ok')
+            if anterior is not None and anterior != resultado['ok']:
+                print(f"🩺 {nombre}: {'recuperado ✅' if resultado['ok'] else 'caído ❌'}")
+            self._estado[nombre] = resultado
+
+    async def _medir(self, nombre: str) -> dict:
+        inicio = time.perf_counter()
+        try:
+            ok = await ejecutar(self._sondas[nombre])
+            error = None
+        except Exception as e:
+            ok, error = False, str(e)
+
+        resultado = {
+            'ok': ok,
+            'latencia_ms': round((time.perf_counter() - inicio) * 1000, 1),
+            'verificado_en': datetime.now().isoformat()
+        }
+        if ok is None:
+            resultado['detalle'] = 'sin configurar'
+        if error:
+            resultado['error'] = error
+        return resultado
+
+    # ------------------------------------------------------------------------
+    # Lectura (sin I/O)
+    # ------------------------------------------------------------------------
+
+    def ok(self, nombre: str):
+        """
+        Returns:
+            bool | None: Último resultado; None si aún no se verificó o no aplica
+        """
+        return self._estado.get(nombre, {}).get('ok')
+
+    def estado(self) -> dict:
+        """
+        Snapshot del estado para /health.
+
+        Returns:
+            dict: {'status': 'healthy' | 'degraded' | 'starting', 'servicios': {...}}
+        """
+        servicios = {nombre: dict(datos) for nombre, datos in self._estado.items()}
+
+        if not servicios:
+            status = 'starting'
+        elif any(datos['ok'] is False for datos in servicios.values()):
+            status = 'degraded'
+        else:
+            status = 'healthy'
+
+        return {'status': status, 'intervalo_segundos': self.intervalo, 'servicios': servicios}
+
+
+# Instancia única del proceso (la comparten bot y API en modo webhook)
+monitor_salud = MonitorSalud()
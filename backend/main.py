@@ -17,12 +17,16 @@ ENDPOINTS:
 - POST /snapshot-mes-anterior - Crear snapshot del mes anterior
 - GET  /snapshot/{periodo} - Obtener snapshot específico
 - GET  /snapshots - Listar todos los snapshots
+- GET  /resumen-mensual - Ingresos, costos y neto mes a mes
+- POST /telegram/webhook - Updates del bot (solo con BOT_MODO=webhook)
+- POST /webhooks/pst - Pagos de PST.NET en tiempo real (requiere PST_NET_SECRET)
 """
 
+import json
 import os
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
@@ -37,6 +41,9 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
 
+# polling: el bot corre aparte (bot_instance.py) | webhook: lo atiende esta API
+BOT_MODO = os.getenv("BOT_MODO", "polling").strip().strip('"').strip("'").lower()
+
 # ============================================================================
 # FASTAPI APP
 # ============================================================================
@@ -60,6 +67,87 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ============================================================================
+# CICLO DE VIDA: MONITOR DE SALUD
+# ============================================================================
+
+@app.on_event("startup")
+async def iniciar_monitor_salud():
+    """Verifica Supabase y PST.NET en segundo plano (lo lee /health)"""
+    from health_monitor import monitor_salud
+    
+    supabase = None
+    if SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY:
+        from supabase import create_client
+        supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    
+    await monitor_salud.iniciar(supabase)
+
+
+@app.on_event("shutdown")
+async def detener_monitor_salud():
+    from health_monitor import monitor_salud
+    await monitor_salud.detener()
+
+# ============================================================================
+# CICLO DE VIDA: COLA DE WEBHOOKS DE PST.NET
+# ============================================================================
+
+@app.on_event("startup")
+async def iniciar_cola_webhooks_pst():
+    """Registra por lotes los pagos que llegan a /webhooks/pst"""
+    from pst_net_integration import PST_NET_SECRET
+    from webhooks_pst import cola_webhooks_pst
+    
+    if not PST_NET_SECRET:
+        print("📬 Webhooks de PST.NET desactivados (sin PST_NET_SECRET)")
+        return
+    if not (SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY):
+        print("⚠️ Webhooks de PST.NET desactivados: faltan credenciales de Supabase")
+        return
+    
+    from supabase import create_client
+    await cola_webhooks_pst.iniciar(create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY))
+
+
+@app.on_event("shutdown")
+async def detener_cola_webhooks_pst():
+    from webhooks_pst import cola_webhooks_pst
+    await cola_webhooks_pst.detener()
+
+# ============================================================================
+# CICLO DE VIDA: BOT EN MODO WEBHOOK
+# ============================================================================
+
+@app.on_event("startup")
+async def iniciar_bot():
+    """Con BOT_MODO=webhook, levanta el bot dentro de este proceso"""
+    if BOT_MODO != "webhook":
+        return
+    
+    if not (SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY):
+        print("❌ No se pudo iniciar el bot en modo webhook: faltan credenciales de Supabase")
+        return
+    
+    from bot_webhook import iniciar_bot_webhook
+    
+    try:
+        from supabase import create_client
+        await iniciar_bot_webhook(create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY))
+    except Exception as e:
+        # La API sigue funcionando aunque el bot no pueda iniciar
+        print(f"❌ No se pudo iniciar el bot en modo webhook: {e}")
+
+
+@app.on_event("shutdown")
+async def detener_bot():
+    """Detiene el bot procesando los updates ya encolados"""
+    if BOT_MODO != "webhook":
+        return
+    
+    from bot_webhook import detener_bot_webhook
+    await detener_bot_webhook()
+
 # ============================================================================
 # ENDPOINT: ROOT
 # ============================================================================
@@ -77,6 +165,9 @@ async def root():
             "/snapshot-mes-anterior": "Crea snapshot del mes anterior",
             "/snapshot/{periodo}": "Obtiene snapshot de un periodo (MM-YYYY)",
             "/snapshots": "Lista todos los snapshots disponibles",
+            "/resumen-mensual": "Ingresos, costos y neto mes a mes (?periodos=MM-YYYY,... o ?meses=N)",
+            "/telegram/webhook": "Updates del bot de Telegram (BOT_MODO=webhook)",
+            "/webhooks/pst": "Pagos de PST.NET en tiempo real (firma HMAC-SHA256)",
         }
     }
 
@@ -86,9 +177,16 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """
+    Health check endpoint.
+    
+    Devuelve el último estado del monitor de salud (no consulta los
+    servicios en cada request).
+    """
+    from health_monitor import monitor_salud
+    
     return {
-        "status": "healthy",
+        **monitor_salud.estado(),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -384,6 +482,160 @@ async def listar_todos_snapshots():
             status_code=500
         )
 
+# ============================================================================
+# ENDPOINT: RESUMEN MENSUAL (MULTI-PERIODO)
+# ============================================================================
+
+@app.get("/resumen-mensual")
+async def resumen_mensual(periodos: Optional[str] = None, meses: int = 6):
+    """
+    Devuelve una tabla mes a mes con ingresos, costos y neto.
+    
+    Todos los meses se calculan en una sola pasada, así el panel no necesita
+    hacer una request por mes.
+    
+    Args:
+        periodos: Periodos MM-YYYY separados por coma (ej: '12-2025,01-2026')
+        meses: Si no se indican periodos, cantidad de meses hasta el actual (1-36)
+    
+    Returns:
+        JSONResponse: Filas por periodo y totales acumulados
+    """
+    try:
+        print(f"\n📊 API REQUEST: /resumen-mensual")
+        
+        from utils import generar_periodos, parsear_periodo
+        
+        try:
+            if periodos:
+                lista_periodos = [p.strip() for p in periodos.split(',') if p.strip()]
+                for periodo in lista_periodos:
+                    parsear_periodo(periodo)
+            else:
+                if not 1 <= meses <= 36:
+                    raise ValueError("El parámetro 'meses' debe estar entre 1 y 36")
+                lista_periodos = generar_periodos(meses)
+        except ValueError as e:
+            return JSONResponse(
+                content={
+                    'success': False,
+                    'error': str(e)
+                },
+                status_code=400
+            )
+        
+        if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
+            return JSONResponse(
+                content={
+                    'success': False,
+                    'error': 'Supabase no configurado'
+                },
+                status_code=500
+            )
+        
+        from supabase import create_client
+        from db_manager import get_resumen_periodos
+        
+        supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+        
+        resumen = get_resumen_periodos(supabase, lista_periodos)
+        
+        if 'error' in resumen:
+            return JSONResponse(
+                content={
+                    'success': False,
+                    'error': resumen['error']
+                },
+                status_code=500
+            )
+        
+        return JSONResponse(
+            content={
+                'success': True,
+                'count': len(resumen['periodos']),
+                **resumen
+            },
+            status_code=200
+        )
+        
+    except Exception as e:
+        print(f"❌ Error en /resumen-mensual: {e}")
+        
+        return JSONResponse(
+            content={
+                'success': False,
+                'error': str(e)
+            },
+            status_code=500
+        )
+
+# ============================================================================
+# ENDPOINT: WEBHOOK DE TELEGRAM
+# ============================================================================
+
+@app.post("/telegram/webhook")
+async def telegram_webhook(
+    request: Request,
+    x_telegram_bot_api_secret_token: Optional[str] = Header(None)
+):
+    """
+    Recibe los updates de Telegram y los encola en el bot.
+    
+    Valida el header X-Telegram-Bot-Api-Secret-Token contra
+    TELEGRAM_WEBHOOK_SECRET. Responde apenas el update queda encolado.
+    """
+    if BOT_MODO != "webhook":
+        raise HTTPException(status_code=404, detail="Bot en modo polling")
+    
+    from bot_webhook import encolar_update, secreto_valido
+    
+    if not secreto_valido(x_telegram_bot_api_secret_token):
+        raise HTTPException(status_code=403, detail="Secret token inválido")
+    
+    try:
+        payload = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="JSON inválido")
+    
+    if not await encolar_update(payload):
+        # Telegram reintenta el update más tarde
+        raise HTTPException(status_code=503, detail="Bot no iniciado")
+    
+    return {"ok": True}
+
+# ============================================================================
+# ENDPOINT: WEBHOOK DE PST.NET
+# ============================================================================
+
+@app.post("/webhooks/pst")
+async def pst_webhook(request: Request):
+    """
+    Recibe los eventos de pago de PST.NET y los encola.
+    
+    Valida el HMAC del cuerpo crudo (header HEADER_FIRMA_PST) con
+    PST_NET_SECRET. Responde apenas el evento queda encolado; el registro
+    en Supabase se hace por lotes en segundo plano.
+    """
+    from pst_net_integration import validar_webhook_pst_net
+    from webhooks_pst import HEADER_FIRMA_PST, cola_webhooks_pst
+    
+    cuerpo = await request.body()
+    if not validar_webhook_pst_net(cuerpo, request.headers.get(HEADER_FIRMA_PST)):
+        raise HTTPException(status_code=403, detail="Firma inválida")
+    
+    try:
+        evento = json.loads(cuerpo)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="JSON inválido")
+    if not isinstance(evento, dict):
+        raise HTTPException(status_code=400, detail="Evento inválido")
+    
+    if not cola_webhooks_pst.encolar(evento):
+        # PST.NET reintenta el evento más tarde
+        raise HTTPException(status_code=503, detail="Cola de webhooks no disponible")
+    
+    return {"ok": True}
+
 # ============================================================================
 # COMANDO DE INICIO
 # ============================================================================
@@ -405,6 +657,10 @@ if __name__ == "__main__":
     print(f"   - POST /snapshot-mes-anterior")
     print(f"   - GET  /snapshot/{{periodo}}")
     print(f"   - GET  /snapshots")
+    print(f"   - GET  /resumen-mensual")
+    if BOT_MODO == "webhook":
+        print(f"   - POST /telegram/webhook")
+    print(f"   - POST /webhooks/pst")
     print("="*70 + "\n")
     
     uvicorn.run(
@@ -0,0 +1,16 @@
+-- ============================================================================
+-- MIGRACIÓN: Listado paginado de clientes en el bot
+-- ============================================================================
+-- Fecha: 19/10/2026
+-- Propósito: El bot lista los clientes de a 10 ordenados por nombre
+-- (ORDER BY nombre LIMIT/OFFSET). El índice evita ordenar toda la tabla
+-- en cada página. Los totales salen de vista_resumen_clientes
+-- (migration_clientes_v2.sql).
+--
+-- EJECUTAR EN SUPABASE SQL EDITOR
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_clientes_nombre ON clientes(nombre);
+
+-- Verificar
+-- EXPLAIN SELECT id, nombre, estado FROM clientes ORDER BY nombre LIMIT 10 OFFSET 20;
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+BLACK INFRASTRUCTURE - PARSEO DE MONTOS
+========================================
+Único lugar donde se interpretan montos escritos como texto
+("$765,000", "1.255,50", "$500.00", "1485,00 ARS").
+
+Expone una API por lotes (parsear_montos) que procesa columnas completas
+con NumPy, y wrappers escalares para casos puntuales.
+
+Autor: Senior Backend Developer
+Fecha: 19/10/2026
+Versión: 1.0.0
+"""
+
+import numpy as np
+
+
+# Tokens que se eliminan antes de parsear (monedas y espacios)
+TOKENS_DESCARTABLES = ('USDT', 'USD', 'ARS', '$', ' ', ' ')
+
+# Formatos soportados
+FORMATO_AUTO = 'auto'   # Planillas mixtas: se deduce el separador decimal
+FORMATO_AR = 'ar'       # '.' miles, ',' decimal  (1.255,50)
+FORMATO_EN = 'en'       # ',' miles, '.' decimal  (1,255.50) - respuestas de APIs
+FORMATOS = (FORMATO_AUTO, FORMATO_AR, FORMATO_EN)
+
+_CP_0, _CP_9 = ord('0'), ord('9')
+_CP_PUNTO, _CP_COMA, _CP_MENOS = ord('.'), ord(','), ord('-')
+_POTENCIAS_10 = 10 ** np.arange(19, dtype=np.int64)
+
+
+# ============================================================================
+# API POR LOTES
+# ============================================================================
+
+def parsear_montos(valores, formato: str = FORMATO_AUTO) -> np.ndarray:
+    """
+    Parsea una columna completa de montos de una sola vez.
+
+    Reglas (estrictas):
+    - Se descartan los espacios de los extremos (tabs, saltos de línea, como
+      str.strip) y se ignoran '$', 'USD', 'USDT', 'ARS' y espacios. Se admite
+      un '-' inicial.
+    - Formato 'auto':
+        * Si aparecen '.' y ',', el último es el decimal y el otro el de miles.
+        * Un único separador seguido de exactamente 3 dígitos es de miles
+          ("$765,000" → 765000, "1.255" → 1255); con otra cantidad, o si la
+          parte entera empieza con 0, es decimal ("1485,00" → 1485.0,
+          "500.5" → 500.5, "0,500" → 0.5).
+        * Un separador repetido es de miles ("1.255.000" → 1255000).
+    - Formatos 'ar' / 'en': el separador decimal es fijo (',' / '.').
+    - Los grupos de miles deben tener 3 dígitos (el primero, de 1 a 3, sin
+      empezar con 0).
+    - La parte entera puede faltar si hay decimales (".5" → 0.5).
+    - No se admite notación científica ("1e5" → NaN).
+    - Hasta 15 dígitos significativos (precisión exacta de float64).
+    - Cualquier otro caracter o un formato que no cumpla las reglas da NaN.
+
+    Args:
+        valores: Iterable (lista, Series, ndarray) de strings, números o None
+        formato: 'auto', 'ar' o 'en'
+
+    Returns:
+        np.ndarray: Array float64 con NaN donde el valor es vacío o inválido
+
+    Ejemplo:
+        >>> parsear_montos(['$765,000', '1.255,50', '$500.00', '—', None])
+        array([765000. ,   1255.5,    500. ,      nan,      nan])
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de monto desconocido: '{formato}' (usar uno de {FORMATOS})")
+
+    if isinstance(valores, np.ndarray):
+        arr = valores.ravel()
+    else:
+        valores = list(valores)
+        # Caso más común (columna de texto): directo al núcleo vectorizado
+        if all(isinstance(v, str) for v in valores):
+            return _parsear_textos(np.array(valores, dtype=str), formato)
+        arr = np.array(valores, dtype=object)
+
+    # Columnas ya numéricas o de solo texto: se procesan sin inspeccionar tipos
+    if arr.dtype.kind in 'iuf':
+        return arr.astype(np.float64)
+    if arr.dtype.kind == 'U':
+        return _parsear_textos(arr, formato)
+
+    n = arr.shape[0]
+    resultado = np.full(n, np.nan)
+
+    if n == 0:
+        return resultado
+
+    es_texto = np.fromiter((isinstance(v, str) for v in arr), dtype=bool, count=n)
+    es_numero = np.fromiter(
+        (isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool) for v in arr),
+        dtype=bool,
+        count=n
+    )
+
+    if es_numero.any():
+        resultado[es_numero] = arr[es_numero].astype(np.float64)
+    if es_texto.any():
+        resultado[es_texto] = _parsear_textos(arr[es_texto].astype(str), formato)
+
+    return resultado
+
+
+def _parsear_textos(textos: np.ndarray, formato: str) -> np.ndarray:
+    """
+    Núcleo vectorizado: trabaja sobre la matriz de code points del array de
+    strings, sin loops por fila en Python.
+
+    La matriz se guarda traspuesta (ancho × N): cada fila es una posición del
+    texto y las reducciones por monto recorren memoria contigua.
+    """
+    n = textos.shape[0]
+    ancho = textos.dtype.itemsize // 4
+
+    if n == 0 or ancho == 0:
+        return np.full(n, np.nan)
+
+    # Espacios de los extremos (tabs, saltos de línea...) con la semántica de str.strip
+    textos = np.char.strip(textos)
+    ancho = textos.dtype.itemsize // 4
+    if ancho == 0:
+        return np.full(n, np.nan)
+
+    cp = np.ascontiguousarray(
+        np.ascontiguousarray(textos).view(np.uint32).reshape(n, ancho).T
+    )
+
+    # 1. Marcar lo que se ignora (símbolos de moneda y espacios)
+    ignorar = (cp == 0)
+    for token in TOKENS_DESCARTABLES:
+        largo_token = len(token)
+        if largo_token > ancho:
+            continue
+        ventanas = ancho - largo_token + 1
+        coincide = cp[:ventanas] == ord(token[0])
+        if not coincide.any():
+            continue
+        for k, caracter in enumerate(token[1:], start=1):
+            coincide &= cp[k:k + ventanas] == ord(caracter)
+        for k in range(largo_token):
+            ignorar[k:k + ventanas] |= coincide
+
+    # Posición de cada caracter dentro del texto ya limpio
+    significativo = ~ignorar
+    pos = np.cumsum(significativo, axis=0, dtype=np.int16) - 1
+    largo = pos[-1] + 1
+
+    es_digito = (cp >= _CP_0) & (cp <= _CP_9)
+    es_punto = cp == _CP_PUNTO
+    es_coma = cp == _CP_COMA
+    es_signo = (cp == _CP_MENOS) & (pos == 0) & significativo
+    negativo = es_signo.any(axis=0)
+    inicio = negativo.astype(np.int16)
+    empieza_con_cero = ((cp == _CP_0) & (pos == inicio) & significativo).any(axis=0)
+
+    # 2. Solo dígitos, separadores y un '-' inicial
+    caracteres_ok = ~(significativo & ~(es_digito | es_punto | es_coma | es_signo)).any(axis=0)
+
+    n_puntos = es_punto.sum(axis=0)
+    n_comas = es_coma.sum(axis=0)
+    ult_punto = np.where(es_punto, pos, -1).max(axis=0)
+    ult_coma = np.where(es_coma, pos, -1).max(axis=0)
+
+    # 3. Posición del separador decimal (-1 si no hay)
+    if formato == FORMATO_AUTO:
+        ult_sep = np.maximum(ult_punto, ult_coma)
+        ambos = (n_puntos > 0) & (n_comas > 0)
+        decimal_unico = ~ambos & (n_puntos + n_comas == 1) & (
+            (largo - 1 - ult_sep != 3) | empieza_con_cero
+        )
+        pos_decimal = np.where(ambos | decimal_unico, ult_sep, -1)
+        decimal_es_coma = (pos_decimal >= 0) & (ult_coma == pos_decimal)
+    else:
+        decimal_es_coma = np.full(n, formato == FORMATO_AR)
+        pos_decimal = np.where(decimal_es_coma, ult_coma, ult_punto)
+
+    n_decimal = np.where(decimal_es_coma, n_comas, n_puntos)
+    decimal_ok = (pos_decimal < 0) | (n_decimal == 1)
+
+    # 4. Agrupación de miles: primer grupo de 1 a 3 dígitos, luego de a 3
+    fin_entero = np.where(pos_decimal >= 0, pos_decimal, largo)
+    es_miles = (es_punto | es_coma) & (pos != pos_decimal)
+    tiene_miles = es_miles.any(axis=0)
+
+    grupos_ok = ~tiene_miles
+    if tiene_miles.any():
+        primer_miles = np.where(es_miles, pos, ancho).min(axis=0)
+        esperado = (
+            significativo
+            & (pos >= primer_miles)
+            & (pos < fin_entero)
+            & ((fin_entero - pos) % 4 == 0)
+        )
+        primer_grupo = primer_miles - inicio
+        grupos_ok |= (
+            (es_miles == esperado).all(axis=0)
+            & (primer_grupo >= 1) & (primer_grupo <= 3)
+            & ~empieza_con_cero
+        )
+
+    # 5. Al menos un dígito entero (o un decimal inicial: ".5") y, si hay
+    #    separador decimal, al menos un decimal
+    digitos_enteros = (es_digito & (pos < fin_entero)).sum(axis=0)
+    digitos_totales = es_digito.sum(axis=0)
+    digitos_decimales = digitos_totales - digitos_enteros
+
+    valido = (
+        caracteres_ok & decimal_ok & grupos_ok
+        & ((digitos_enteros >= 1) | (pos_decimal == inicio))
+        & ((pos_decimal < 0) | (digitos_decimales >= 1))
+        & (digitos_totales <= 15)
+    )
+
+    # 6. Valor: todos los dígitos como entero exacto, dividido por 10^decimales
+    mantisa = np.zeros(n, dtype=np.int64)
+    for fila in range(ancho):
+        digito = es_digito[fila]
+        mantisa = np.where(digito, mantisa * 10 + (cp[fila].astype(np.int64) - _CP_0), mantisa)
+
+    resultado = mantisa / _POTENCIAS_10[np.clip(digitos_decimales, 0, 18)].astype(np.float64)
+    resultado = np.where(negativo, -resultado, resultado)
+
+    return np.where(valido, resultado, np.nan)
+
+
+# ============================================================================
+# WRAPPERS ESCALARES
+# ============================================================================
+
+def parsear_monto(valor, formato: str = FORMATO_AUTO):
+    """
+    Parsea un único monto con las mismas reglas que parsear_montos.
+
+    Args:
+        valor: String, número o None
+        formato: 'auto', 'ar' o 'en'
+
+    Returns:
+        float o None si el valor es vacío o inválido
+
+    Ejemplos:
+        '$765,000' -> 765000.0
+        '1.255,50' -> 1255.5
+        '$1485,00' -> 1485.0
+        '' -> None
+    """
+    resultado = parsear_montos([valor], formato)[0]
+    return None if np.isnan(resultado) else float(resultado)
+
+
+def parsear_monto_api(valor) -> float:
+    """
+    Parsea un monto recibido de una API externa (',' miles, '.' decimal).
+
+    Args:
+        valor: String, número o None
+
+    Returns:
+        float: Monto (0.0 si viene vacío o None)
+
+    Raises:
+        ValueError: Si el valor no es un monto válido
+    """
+    if valor is None or valor == '':
+        return 0.0
+
+    resultado = parsear_monto(valor, FORMATO_EN)
+    if resultado is None:
+        raise ValueError(f"Monto inválido: '{valor}'")
+    return resultado
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    print("\n🧪 BENCHMARK - Parseo de montos\n")
+
+    # Implementaciones por fila previas (copiadas tal cual para comparar)
+    def legacy_resumen(valor):
+        """db_manager.get_resumen_financiero"""
+        try:
+            if isinstance(valor, str):
+                valor = valor.replace('.', '').replace(',', '.')
+            return float(valor)
+        except (ValueError, TypeError):
+            return None
+
+    def legacy_limpiar_monto(valor):
+        """master_migration.limpiar_monto"""
+        try:
+            valor_str = str(valor).strip()
+            valor_str = valor_str.replace('$', '').replace(' ', '').replace('USD', '').replace('ARS', '')
+            valor_str = valor_str.replace('.', '').replace(',', '.')
+            return float(valor_str) if valor_str else None
+        except (ValueError, AttributeError):
+            return None
+
+    def legacy_pst(valor):
+        """pst_sync_balances"""
+        try:
+            return float(str(valor or '0').replace(',', ''))
+        except (ValueError, TypeError):
+            return None
+
+    muestras = ['$765,000', '$377,500', '$500.00', '$1485,00', '1.255,50', '1505', '$1,255', '133']
+    casos = [random.choice(muestras) for _ in range(200_000)]
+
+    def medir(nombre, fn):
+        inicio = time.perf_counter()
+        fn()
+        duracion = time.perf_counter() - inicio
+        print(f"   {nombre:<42} {duracion * 1000:>9.1f} ms")
+        return duracion
+
+    print(f"📄 {len(casos):,} montos\n")
+    t_resumen = medir("Loop por fila (get_resumen_financiero)", lambda: [legacy_resumen(v) for v in casos])
+    t_limpiar = medir("Loop por fila (limpiar_monto)", lambda: [legacy_limpiar_monto(v) for v in casos])
+    t_pst = medir("Loop por fila (PST replace)", lambda: [legacy_pst(v) for v in casos])
+    t_numpy = medir("parsear_montos (NumPy, lote)", lambda: parsear_montos(casos))
+
+    print(f"\n⚡ Speedup: {t_resumen / t_numpy:.1f}x (resumen) | "
+          f"{t_limpiar / t_numpy:.1f}x (limpiar_monto) | {t_pst / t_numpy:.1f}x (PST)")
+
+    # Diferencias de criterio frente a los loops previos
+    print("\n🔍 Comparación de resultados:")
+    print(f"   {'valor':<12} {'resumen':>12} {'limpiar':>12} {'pst':>12} {'nuevo':>12}")
+    for valor, nuevo in zip(muestras, parsear_montos(muestras)):
+        def seguro(fn):
+            resultado = fn(valor)
+            return "inválido" if resultado is None else f"{resultado:,.2f}"
+        print(f"   {valor:<12} {seguro(legacy_resumen):>12} {seguro(legacy_limpiar_monto):>12} "
+              f"{seguro(legacy_pst):>12} {nuevo:>12,.2f}")
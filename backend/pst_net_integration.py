@@ -10,12 +10,19 @@ Fecha: 21/01/2026
 Versión: 1.0.0
 """
 
+import hmac
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 from dotenv import load_dotenv
 
+from cache_pantallas import cache_pantallas
+from cotizacion_dolar import obtener_cotizacion_blue_sync, ventas_por_fecha
+from resumen_mensual import registrar_ingresos
+
 # Cargar variables de entorno
 load_dotenv()
 
@@ -28,6 +35,29 @@ PST_NET_API_URL = os.getenv("PST_NET_API_URL", "https://api.pst.net/v1")
 PST_NET_API_KEY = os.getenv("PST_NET_API_KEY", "")
 PST_NET_SECRET = os.getenv("PST_NET_SECRET", "")
 
+# Pagos por página al listar /pagos (la API admite hasta 100)
+PST_NET_PAGOS_POR_PAGINA = int(os.getenv("PST_NET_PAGOS_POR_PAGINA", "100"))
+
+# Tope de páginas por recorrido (corta si la API nunca devuelve una página corta)
+PST_NET_MAXIMO_PAGINAS = int(os.getenv("PST_NET_MAXIMO_PAGINAS", "1000"))
+
+# Confirmaciones (PATCH) simultáneas contra PST.NET
+PST_NET_ACKS_EN_PARALELO = int(os.getenv("PST_NET_ACKS_EN_PARALELO", "8"))
+
+# Ingresos por insert en Supabase
+LOTE_INGRESOS = 500
+
+# IDs por consulta de pagos ya registrados (el filtro viaja en la URL)
+LOTE_CONSULTA_REGISTRADOS = 100
+
+# Cotización usada si no se puede consultar el dólar blue
+DOLAR_VENTA_DEFAULT = 1500.0
+
+# Sesión HTTP compartida: reutiliza las conexiones TCP/TLS entre pedidos
+_sesion = requests.Session()
+_sesion.mount('https://', HTTPAdapter(pool_maxsize=PST_NET_ACKS_EN_PARALELO))
+_sesion.mount('http://', HTTPAdapter(pool_maxsize=PST_NET_ACKS_EN_PARALELO))
+
 # ============================================================================
 # FUNCIONES DE INTEGRACIÓN
 # ============================================================================
@@ -53,9 +83,103 @@ def get_pst_net_headers() -> Dict[str, str]:
     }
 
 
+def _extraer_pagina(data) -> tuple:
+    """
+    Separa una respuesta de /pagos en (pagos, cursor siguiente).
+
+    Acepta una lista directa o un objeto {'data': [...]} con el cursor en
+    'next_cursor', 'cursor' o 'meta': {'next_cursor': ...}.
+
+    Returns:
+        tuple: (list de pagos, cursor o None)
+    """
+    # TODO: Adaptar según la estructura de respuesta de PST.NET
+    if not isinstance(data, dict):
+        return data or [], None
+
+    pagos = data.get('data', [])
+    meta = data.get('meta') or {}
+    cursor = data.get('next_cursor') or data.get('cursor') or meta.get('next_cursor')
+    return pagos or [], cursor
+
+
+def _pedir_pagina(endpoint: str, params: Dict) -> tuple:
+    response = _sesion.get(
+        endpoint,
+        headers=get_pst_net_headers(),
+        params=params,
+        timeout=30
+    )
+    response.raise_for_status()
+    return _extraer_pagina(response.json())
+
+
+def iterar_pagos_pendientes(por_pagina: int = PST_NET_PAGOS_POR_PAGINA) -> Iterator[Dict]:
+    """
+    Recorre todas las páginas de pagos pendientes de PST.NET.
+
+    Pagina por cursor si la API lo devuelve y, si no, por offset. Mientras
+    se procesan los pagos de una página, la siguiente ya se está
+    descargando en segundo plano. El recorrido se corta si una página no
+    trae ningún pago nuevo (la API ignoró el offset o el cursor) o al
+    llegar a PST_NET_MAXIMO_PAGINAS.
+
+    Args:
+        por_pagina: Pagos por pedido (máximo de la API: 100)
+
+    Yields:
+        dict: Un pago por vez, en el orden de la API
+    """
+    # TODO: Adaptar endpoint según documentación de PST.NET
+    # Ejemplos de endpoints comunes:
+    # - GET /pagos?estado=completado&sincronizado=false
+    # - GET /transacciones/pendientes
+    # - GET /ingresos?desde=YYYY-MM-DD
+    endpoint = f"{PST_NET_API_URL}/pagos"
+    params = {
+        'estado': 'completado',
+        'sincronizado': 'false',
+        'limit': por_pagina
+    }
+
+    print(f"🔍 Consultando pagos pendientes en PST.NET...")
+
+    total = 0
+    offset = 0
+    paginas = 0
+    vistos = set()
+    with ThreadPoolExecutor(max_workers=1) as descarga:
+        siguiente = descarga.submit(_pedir_pagina, endpoint, dict(params))
+        while siguiente is not None:
+            pagos, cursor = siguiente.result()
+            paginas += 1
+
+            # Pagos sin id no se pueden comparar: se consideran nuevos
+            nuevos = [pago for pago in pagos if pago.get('id') is None or pago.get('id') not in vistos]
+            vistos.update(pago.get('id') for pago in nuevos)
+
+            # Pedir la próxima página antes de entregar esta
+            siguiente = None
+            if pagos and not nuevos:
+                print("⚠️ PST.NET repitió una página ya recibida: se corta el recorrido")
+            elif paginas >= PST_NET_MAXIMO_PAGINAS:
+                print(f"⚠️ Se alcanzó el máximo de {PST_NET_MAXIMO_PAGINAS} páginas de PST.NET: se corta el recorrido")
+            elif cursor:
+                siguiente = descarga.submit(_pedir_pagina, endpoint, {**params, 'cursor': cursor})
+            elif len(pagos) >= por_pagina:
+                offset += len(pagos)
+                siguiente = descarga.submit(_pedir_pagina, endpoint, {**params, 'offset': offset})
+
+            total += len(nuevos)
+            print(f"📄 Página de PST.NET: {len(nuevos)} pago(s) ({total} en total)")
+            yield from nuevos
+
+    print(f"✅ {total} pagos pendientes encontrados")
+
+
 def obtener_pagos_pendientes() -> List[Dict]:
     """
-    Consulta los pagos pendientes de sincronizar desde PST.NET
+    Consulta los pagos pendientes de sincronizar desde PST.NET (todas las páginas)
     
     Returns:
         list: Lista de pagos pendientes
@@ -73,37 +197,7 @@ def obtener_pagos_pendientes() -> List[Dict]:
     ]
     """
     try:
-        # TODO: Adaptar endpoint según documentación de PST.NET
-        # Ejemplos de endpoints comunes:
-        # - GET /pagos?estado=completado&sincronizado=false
-        # - GET /transacciones/pendientes
-        # - GET /ingresos?desde=YYYY-MM-DD
-        
-        endpoint = f"{PST_NET_API_URL}/pagos"
-        params = {
-            'estado': 'completado',
-            'sincronizado': 'false',
-            'limit': 100
-        }
-        
-        print(f"🔍 Consultando pagos pendientes en PST.NET...")
-        
-        response = requests.get(
-            endpoint,
-            headers=get_pst_net_headers(),
-            params=params,
-            timeout=30
-        )
-        
-        response.raise_for_status()
-        data = response.json()
-        
-        # TODO: Adaptar según la estructura de respuesta de PST.NET
-        # Algunas APIs devuelven { 'data': [...] }, otras directamente [...]
-        pagos = data.get('data', data) if isinstance(data, dict) else data
-        
-        print(f"✅ {len(pagos)} pagos pendientes encontrados")
-        return pagos
+        return list(iterar_pagos_pendientes())
         
     except requests.exceptions.RequestException as e:
         print(f"❌ Error al consultar PST.NET: {e}")
@@ -136,7 +230,7 @@ def marcar_pago_sincronizado(pago_id: str) -> bool:
             'sincronizado_en': datetime.now().isoformat()
         }
         
-        response = requests.patch(
+        response = _sesion.patch(
             endpoint,
             headers=get_pst_net_headers(),
             json=payload,
@@ -144,7 +238,6 @@ def marcar_pago_sincronizado(pago_id: str) -> bool:
         )
         
         response.raise_for_status()
-        print(f"✅ Pago {pago_id} marcado como sincronizado")
         return True
         
     except Exception as e:
@@ -152,72 +245,252 @@ def marcar_pago_sincronizado(pago_id: str) -> bool:
         return False
 
 
-def procesar_pago_pst_net(pago: Dict, supabase_client) -> Optional[str]:
+def marcar_pagos_sincronizados(pago_ids: List[str]) -> int:
     """
-    Procesa un pago de PST.NET y lo registra en Supabase
+    Marca varios pagos como sincronizados, en paralelo sobre la sesión compartida.
+    
+    PST.NET solo confirma de a un pago (PATCH /pagos/{id}), así que son
+    len(pago_ids) pedidos, hasta PST_NET_ACKS_EN_PARALELO a la vez. Un
+    PATCH fallido no corta el resto: ese pago sigue pendiente en PST.NET y
+    la próxima sincronización lo confirma sin volver a insertarlo.
+    
+    Args:
+        pago_ids (list): IDs de pagos en PST.NET
+        
+    Returns:
+        int: Cantidad de pagos marcados
+    """
+    if not pago_ids:
+        return 0
+    
+    with ThreadPoolExecutor(max_workers=PST_NET_ACKS_EN_PARALELO) as pool:
+        marcados = sum(pool.map(marcar_pago_sincronizado, pago_ids))
+    
+    print(f"✅ {marcados}/{len(pago_ids)} pagos marcados como sincronizados en PST.NET")
+    return marcados
+
+
+def obtener_dolar_venta() -> float:
+    """
+    Cotización de venta actual del dólar blue (para fechas sin cotización guardada).
+    
+    Returns:
+        float: Cotización (DOLAR_VENTA_DEFAULT si no se pudo consultar)
+    """
+    cotizacion = obtener_cotizacion_blue_sync()
+    if 'error' in cotizacion:
+        print(f"⚠️ Sin cotización del dólar, se usa ${DOLAR_VENTA_DEFAULT}")
+        return DOLAR_VENTA_DEFAULT
+    return cotizacion.get('venta', DOLAR_VENTA_DEFAULT)
+
+
+def preparar_ingreso_pst_net(pago: Dict) -> Optional[Dict]:
+    """
+    Convierte un pago de PST.NET en la fila de ingresos a insertar
+    (monto_ars lo completa aplicar_cotizaciones)
     
     Args:
         pago (dict): Datos del pago desde PST.NET
-        supabase_client: Cliente de Supabase
         
     Returns:
-        str: ID del ingreso creado en Supabase, o None si falla
+        dict: Fila para la tabla ingresos, o None si el pago no es válido
     """
+    # TODO: Mapear los campos según la estructura real de PST.NET
+    
+    # Extraer datos del pago (adaptar según respuesta real)
+    pago_id = pago.get('id')
+    cliente_id = pago.get('cliente_id')  # Debe coincidir con UUID en Supabase
     try:
-        # TODO: Mapear los campos según la estructura real de PST.NET
-        
-        # Extraer datos del pago (adaptar según respuesta real)
-        pago_id = pago.get('id')
-        cliente_id = pago.get('cliente_id')  # Debe coincidir con UUID en Supabase
         monto_usd = float(pago.get('monto', 0))
-        fecha_pago = pago.get('fecha', datetime.now().isoformat())
+    except (TypeError, ValueError):
+        monto_usd = 0.0
+    fecha_pago = pago.get('fecha') or datetime.now().isoformat()
+    
+    # Validaciones
+    if not cliente_id:
+        print(f"⚠️ Pago {pago_id} sin cliente_id, omitiendo...")
+        return None
         
-        # Validaciones
-        if not cliente_id:
-            print(f"⚠️ Pago {pago_id} sin cliente_id, omitiendo...")
-            return None
-            
-        if monto_usd <= 0:
-            print(f"⚠️ Pago {pago_id} con monto inválido, omitiendo...")
-            return None
+    if monto_usd <= 0:
+        print(f"⚠️ Pago {pago_id} con monto inválido, omitiendo...")
+        return None
+    
+    return {
+        'cliente_id': str(cliente_id),
+        'monto_usd_total': monto_usd,
+        'fecha_cobro': fecha_pago.split('T')[0],  # Solo la fecha
+        'created_at': datetime.now().isoformat(),
+        # Campo opcional para rastrear origen
+        'metadata': {
+            'fuente': 'PST.NET',
+            'pago_id_pst': pago_id
+        }
+    }
+
+
+def aplicar_cotizaciones(supabase_client, ingresos: List[Dict]):
+    """
+    Completa monto_ars con la cotización guardada de la fecha de cada cobro
+    
+    Una consulta a 'cotizaciones' para todo el lote; las fechas sin
+    cotización cercana usan la cotización actual (una sola vez).
+    
+    Args:
+        supabase_client: Cliente de Supabase
+        ingresos (list): Filas de preparar_ingreso_pst_net()
+    """
+    ventas = ventas_por_fecha(supabase_client, [ingreso['fecha_cobro'] for ingreso in ingresos])
+    
+    actual = None
+    for ingreso in ingresos:
+        dolar_venta = ventas.get(ingreso['fecha_cobro'])
+        if dolar_venta is None:
+            if actual is None:
+                actual = obtener_dolar_venta()
+            dolar_venta = actual
+        ingreso['monto_ars'] = ingreso['monto_usd_total'] * dolar_venta
+    
+    if actual is not None:
+        print(f"💱 {sum(1 for ingreso in ingresos if ingreso['fecha_cobro'] not in ventas)} "
+              f"pago(s) sin cotización guardada: se usa la actual (${actual})")
+
+
+def pagos_ya_registrados(supabase_client, pago_ids: List) -> set:
+    """
+    IDs de PST.NET que ya tienen su ingreso en Supabase (metadata.pago_id_pst)
+    
+    Args:
+        supabase_client: Cliente de Supabase
+        pago_ids (list): IDs de pagos en PST.NET
         
-        # Obtener cotización del dólar (importar desde bot_main.py)
-        from bot_main import get_dolar_blue
+    Returns:
+        set: IDs (como texto) ya registrados
+    """
+    registrados = set()
+    pago_ids = [str(pago_id) for pago_id in pago_ids if pago_id is not None]
+    for inicio in range(0, len(pago_ids), LOTE_CONSULTA_REGISTRADOS):
+        response = supabase_client.table('ingresos').select('metadata').in_(
+            'metadata->>pago_id_pst', pago_ids[inicio:inicio + LOTE_CONSULTA_REGISTRADOS]
+        ).execute()
+        registrados.update(
+            str((fila.get('metadata') or {}).get('pago_id_pst')) for fila in response.data or []
+        )
+    return registrados
+
+
+def _separar_registrados(supabase_client, ingresos: List[Dict]) -> tuple:
+    """
+    Separa los ingresos cuyo pago ya está en Supabase (un insert anterior
+    que no llegó a confirmarse en PST.NET) o se repite en el lote, para no
+    duplicarlos.
+    
+    Returns:
+        tuple: (ingresos nuevos, IDs de pagos ya registrados)
+    """
+    try:
+        registrados = pagos_ya_registrados(
+            supabase_client, [ingreso['metadata']['pago_id_pst'] for ingreso in ingresos]
+        )
+    except Exception as e:
+        print(f"⚠️ No se pudieron consultar los pagos ya registrados: {e}")
+        return ingresos, []
+    
+    nuevos = []
+    repetidos = []
+    for ingreso in ingresos:
+        pago_id = ingreso['metadata']['pago_id_pst']
+        if str(pago_id) in registrados:
+            repetidos.append(pago_id)
+            continue
+        nuevos.append(ingreso)
+        # El mismo pago dos veces en el lote se inserta una sola vez
+        registrados.add(str(pago_id))
+    if repetidos:
+        print(f"♻️ {len(repetidos)} pago(s) ya registrados en Supabase, no se vuelven a insertar")
+    return nuevos, repetidos
+
+
+def _insertar_filas(supabase_client, filas: List[Dict]) -> List[Dict]:
+    """
+    Inserta un lote de ingresos; si el lote falla, reintenta fila por fila
+    para no perder los pagos válidos por uno rechazado.
+    
+    Las filas devueltas se asocian a las enviadas por metadata.pago_id_pst
+    (no por posición).
+    
+    Returns:
+        list: Filas insertadas (None en la posición de las rechazadas)
+    """
+    try:
+        response = supabase_client.table('ingresos').insert(filas).execute()
+        devueltas = {
+            str((fila.get('metadata') or {}).get('pago_id_pst')): fila for fila in response.data or []
+        }
+        insertadas = [devueltas.get(str(fila['metadata']['pago_id_pst'])) for fila in filas]
+        if None in insertadas:
+            print(f"⚠️ El insert masivo devolvió {len(insertadas) - insertadas.count(None)}/{len(filas)} filas")
+        return insertadas
+    except Exception as e:
+        if len(filas) == 1:
+            print(f"❌ Error al insertar ingreso del pago {filas[0]['metadata']['pago_id_pst']}: {e}")
+            return [None]
+        print(f"⚠️ Falló el insert de {len(filas)} ingresos, reintentando uno por uno: {e}")
+    
+    return [_insertar_filas(supabase_client, [fila])[0] for fila in filas]
+
+
+def insertar_ingresos_pst_net(supabase_client, ingresos: List[Dict]) -> List[Dict]:
+    """
+    Inserta los ingresos de PST.NET en lotes (con su cotización) y ajusta el rollup una vez
+    
+    Args:
+        supabase_client: Cliente de Supabase
+        ingresos (list): Filas de preparar_ingreso_pst_net()
         
-        cotizacion = get_dolar_blue()
-        dolar_venta = cotizacion.get('venta', 1500.0) if 'error' not in cotizacion else 1500.0
+    Returns:
+        list: Filas insertadas (None en la posición de las rechazadas)
+    """
+    insertados = []
+    for inicio in range(0, len(ingresos), LOTE_INGRESOS):
+        lote = ingresos[inicio:inicio + LOTE_INGRESOS]
+        aplicar_cotizaciones(supabase_client, lote)
+        insertados.extend(_insertar_filas(supabase_client, lote))
+    
+    guardados = [fila for fila in insertados if fila]
+    if guardados:
+        print(f"✅ {len(guardados)} ingreso(s) creados en Supabase")
+        registrar_ingresos(supabase_client, guardados)
+        cache_pantallas.invalidar_por('ingresos')
+    
+    return insertados
+
+
+def procesar_pago_pst_net(pago: Dict, supabase_client, marcar: bool = True) -> Optional[str]:
+    """
+    Procesa un pago de PST.NET y lo registra en Supabase
+    
+    Args:
+        pago (dict): Datos del pago desde PST.NET
+        supabase_client: Cliente de Supabase
+        marcar (bool): Marcarlo como sincronizado en PST.NET al terminar
         
-        # Calcular equivalente en ARS
-        monto_ars = monto_usd * dolar_venta
+    Returns:
+        str: ID del ingreso creado en Supabase, o None si falla
+    """
+    try:
+        ingreso_data = preparar_ingreso_pst_net(pago)
+        if ingreso_data is None:
+            return None
         
-        # Crear registro en Supabase
-        ingreso_data = {
-            'cliente_id': str(cliente_id),
-            'monto_usd_total': monto_usd,
-            'monto_ars': monto_ars,
-            'fecha_cobro': fecha_pago.split('T')[0],  # Solo la fecha
-            'created_at': datetime.now().isoformat(),
-            # Campo opcional para rastrear origen
-            'metadata': {
-                'fuente': 'PST.NET',
-                'pago_id_pst': pago_id
-            }
-        }
+        fila = insertar_ingresos_pst_net(supabase_client, [ingreso_data])[0]
+        if not fila:
+            return None
         
-        # Insertar en Supabase
-        response = supabase_client.table('ingresos').insert(ingreso_data).execute()
+        # Marcar como sincronizado en PST.NET
+        if marcar:
+            marcar_pago_sincronizado(pago.get('id'))
         
-        if response.data and len(response.data) > 0:
-            ingreso_id = response.data[0].get('id')
-            print(f"✅ Ingreso creado en Supabase: {ingreso_id}")
-            
-            # Marcar como sincronizado en PST.NET
-            marcar_pago_sincronizado(pago_id)
-            
-            return ingreso_id
-        else:
-            print(f"❌ Error al insertar ingreso en Supabase")
-            return None
+        return fila.get('id')
         
     except Exception as e:
         print(f"❌ Error al procesar pago: {e}")
@@ -228,6 +501,12 @@ def sincronizar_pagos_pst_net(supabase_client) -> Dict[str, int]:
     """
     Sincroniza todos los pagos pendientes de PST.NET a Supabase
     
+    Los pagos válidos se insertan en lotes de LOTE_INGRESOS con la
+    cotización guardada de su fecha, el rollup se ajusta una vez por
+    período y las confirmaciones a PST.NET se envían en paralelo al final.
+    Los pagos que ya tienen ingreso (una corrida anterior cortada antes de
+    confirmar) no se insertan de nuevo, solo se confirman.
+    
     Args:
         supabase_client: Cliente de Supabase
         
@@ -238,43 +517,70 @@ def sincronizar_pagos_pst_net(supabase_client) -> Dict[str, int]:
     print("🔄 SINCRONIZACIÓN PST.NET → SUPABASE")
     print("="*60 + "\n")
     
-    # Obtener pagos pendientes
-    pagos = obtener_pagos_pendientes()
+    total = 0
+    fallidos = 0
+    pendientes = []
+    sincronizados = []
+    repetidos = []
+    
+    def volcar():
+        nuevos, ya_registrados = _separar_registrados(supabase_client, pendientes)
+        repetidos.extend(ya_registrados)
+        filas = insertar_ingresos_pst_net(supabase_client, nuevos)
+        sincronizados.extend(
+            ingreso['metadata']['pago_id_pst'] for ingreso, fila in zip(nuevos, filas) if fila
+        )
+        pendientes.clear()
+        return filas.count(None)
     
-    if not pagos:
+    # Preparar los pagos a medida que llegan las páginas
+    try:
+        for pago in iterar_pagos_pendientes():
+            total += 1
+            ingreso_data = preparar_ingreso_pst_net(pago)
+            if ingreso_data is None:
+                fallidos += 1
+                continue
+            
+            pendientes.append(ingreso_data)
+            if len(pendientes) >= LOTE_INGRESOS:
+                fallidos += volcar()
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error al consultar PST.NET: {e}")
+    
+    if pendientes:
+        fallidos += volcar()
+    
+    if total == 0:
         print("ℹ️ No hay pagos pendientes de sincronizar")
         return {
             'total': 0,
             'exitosos': 0,
-            'fallidos': 0
+            'fallidos': 0,
+            'repetidos': 0
         }
     
-    # Procesar cada pago
-    exitosos = 0
-    fallidos = 0
+    # Se marca al final: con paginación por offset, marcar durante el
+    # recorrido correría los pagos pendientes y se saltearían páginas.
+    # Si el proceso muere antes, la próxima corrida descarta lo ya insertado.
+    marcar_pagos_sincronizados(sincronizados + repetidos)
     
-    for idx, pago in enumerate(pagos, 1):
-        print(f"\n[{idx}/{len(pagos)}] Procesando pago {pago.get('id')}...")
-        
-        ingreso_id = procesar_pago_pst_net(pago, supabase_client)
-        
-        if ingreso_id:
-            exitosos += 1
-        else:
-            fallidos += 1
+    exitosos = len(sincronizados)
     
     # Resumen
     print("\n" + "="*60)
     print(f"✅ Sincronización completada:")
-    print(f"   Total: {len(pagos)}")
+    print(f"   Total: {total}")
     print(f"   Exitosos: {exitosos}")
     print(f"   Fallidos: {fallidos}")
+    print(f"   Ya registrados: {len(repetidos)}")
     print("="*60 + "\n")
     
     return {
-        'total': len(pagos),
+        'total': total,
         'exitosos': exitosos,
-        'fallidos': fallidos
+        'fallidos': fallidos,
+        'repetidos': len(repetidos)
     }
 
 
@@ -282,31 +588,84 @@ def sincronizar_pagos_pst_net(supabase_client) -> Dict[str, int]:
 # WEBHOOK HANDLER (Opcional - para sincronización automática)
 # ============================================================================
 
-def validar_webhook_pst_net(payload: Dict, signature: str) -> bool:
+# Esquema de firma de los webhooks: header HEADER_FIRMA_PST_NET con el
+# HMAC del cuerpo crudo (clave PST_NET_SECRET, algoritmo
+# ALGORITMO_FIRMA_PST_NET) en hexadecimal, opcionalmente con el prefijo
+# 'sha256='. Si PST.NET cambia el esquema, se ajusta solo aquí.
+HEADER_FIRMA_PST_NET = 'X-PST-Signature'
+ALGORITMO_FIRMA_PST_NET = 'sha256'
+
+
+def validar_webhook_pst_net(cuerpo: bytes, signature: str) -> bool:
     """
     Valida que un webhook provenga realmente de PST.NET
     
+    Compara la firma recibida con el HMAC de ALGORITMO_FIRMA_PST_NET del
+    cuerpo crudo. Sin PST_NET_SECRET configurado se rechaza todo.
+    
     Args:
-        payload (dict): Datos del webhook
+        cuerpo (bytes): Cuerpo del POST tal como llegó
         signature (str): Firma del webhook
         
     Returns:
         bool: True si la firma es válida
     """
-    # TODO: Implementar validación según documentación de PST.NET
-    # Ejemplo común:
-    # import hmac
-    # import hashlib
-    # 
-    # expected_signature = hmac.new(
-    #     PST_NET_SECRET.encode(),
-    #     json.dumps(payload).encode(),
-    #     hashlib.sha256
-    # ).hexdigest()
-    # 
-    # return hmac.compare_digest(signature, expected_signature)
+    if not PST_NET_SECRET or not signature:
+        return False
+    
+    esperada = hmac.new(PST_NET_SECRET.encode(), cuerpo, ALGORITMO_FIRMA_PST_NET).hexdigest()
+    recibida = signature.strip().lower()
+    prefijo = f"{ALGORITMO_FIRMA_PST_NET}="
+    if recibida.startswith(prefijo):
+        recibida = recibida[len(prefijo):]
+    # Starlette decodifica los headers como latin-1: se comparan bytes para
+    # que una firma con caracteres no ASCII sea inválida y no un TypeError
+    return hmac.compare_digest(esperada.encode(), recibida.encode('latin-1', errors='replace'))
+
+
+def procesar_webhooks_pst_net(payloads: List[Dict], supabase_client) -> Dict[str, int]:
+    """
+    Procesa un lote de webhooks de PST.NET: un insert masivo y confirmaciones en paralelo
+    
+    Args:
+        payloads (list): Eventos recibidos
+        supabase_client: Cliente de Supabase
+        
+    Los pagos que ya tienen ingreso (un reenvío de PST.NET) no se insertan
+    de nuevo, solo se confirman.
+    
+    Returns:
+        dict: {'total', 'exitosos', 'fallidos', 'ignorados', 'repetidos'}
+    """
+    ingresos = []
+    ignorados = 0
+    
+    # TODO: Adaptar según estructura de webhook de PST.NET
+    for payload in payloads:
+        if payload.get('event', 'pago.completado') != 'pago.completado':
+            ignorados += 1
+            continue
+        ingreso_data = preparar_ingreso_pst_net(payload.get('data') or {})
+        if ingreso_data is not None:
+            ingresos.append(ingreso_data)
+    
+    sincronizados = []
+    repetidos = []
+    if ingresos:
+        ingresos, repetidos = _separar_registrados(supabase_client, ingresos)
+        filas = insertar_ingresos_pst_net(supabase_client, ingresos)
+        sincronizados = [
+            ingreso['metadata']['pago_id_pst'] for ingreso, fila in zip(ingresos, filas) if fila
+        ]
+        marcar_pagos_sincronizados(sincronizados + repetidos)
     
-    return True  # Placeholder
+    return {
+        'total': len(payloads),
+        'exitosos': len(sincronizados),
+        'fallidos': len(payloads) - ignorados - len(sincronizados) - len(repetidos),
+        'ignorados': ignorados,
+        'repetidos': len(repetidos)
+    }
 
 
 def procesar_webhook_pst_net(payload: Dict, supabase_client) -> bool:
@@ -321,15 +680,7 @@ def procesar_webhook_pst_net(payload: Dict, supabase_client) -> bool:
         bool: True si se procesó exitosamente
     """
     try:
-        # TODO: Adaptar según estructura de webhook de PST.NET
-        evento = payload.get('event', 'pago.completado')
-        
-        if evento == 'pago.completado':
-            pago = payload.get('data', {})
-            ingreso_id = procesar_pago_pst_net(pago, supabase_client)
-            return ingreso_id is not None
-        
-        return False
+        return procesar_webhooks_pst_net([payload], supabase_client)['exitosos'] == 1
         
     except Exception as e:
         print(f"❌ Error al procesar webhook: {e}")
@@ -370,7 +721,7 @@ def test_conexion_pst_net() -> bool:
         # TODO: Adaptar endpoint de health check según PST.NET
         endpoint = f"{PST_NET_API_URL}/health"
         
-        response = requests.get(
+        response = _sesion.get(
             endpoint,
             headers=get_pst_net_headers(),
             timeout=10
@@ -112,6 +112,8 @@ from datetime import datetime
 from typing import Dict, Optional
 from dotenv import load_dotenv
 
+from montos import parsear_monto_api
+
 # Cargar variables de entorno
 load_dotenv()
 
@@ -755,7 +757,7 @@ def sincronizar_balance_pst() -> Dict:
                     if 'data' in cashback_data and isinstance(cashback_data['data'], dict):
                         try:
                             approved_raw = cashback_data['data'].get('approved_cashback', '0')
-                            cashback_aprobado = float(str(approved_raw or '0').replace(',', ''))
+                            cashback_aprobado = parsear_monto_api(approved_raw)
                             print(f"   ✅ data.approved_cashback: ${cashback_aprobado:,.2f}")
                             cashback_encontrado = True
                             break  # Ya encontramos el approved, salir del loop
@@ -765,7 +767,7 @@ def sincronizar_balance_pst() -> Dict:
                     # Fallback: Buscar en nivel raíz
                     elif 'approved_cashback' in cashback_data:
                         try:
-                            cashback_aprobado = float(str(cashback_data['approved_cashback'] or '0').replace(',', ''))
+                            cashback_aprobado = parsear_monto_api(cashback_data['approved_cashback'])
                             print(f"   ✅ approved_cashback (raíz): ${cashback_aprobado:,.2f}")
                             cashback_encontrado = True
                             break
@@ -855,7 +857,7 @@ def sincronizar_balance_pst() -> Dict:
                             val = summary_data['data']['summary']['cashback_sum']
                             rutas_intentadas.append(f"data.summary.cashback_sum = {val}")
                             try:
-                                cashback_sum_total = float(str(val or '0').replace(',', ''))
+                                cashback_sum_total = parsear_monto_api(val)
                                 print(f"   ✅ Encontrado en data.summary.cashback_sum: ${cashback_sum_total:,.2f}")
                             except (ValueError, TypeError):
                                 pass
@@ -865,7 +867,7 @@ def sincronizar_balance_pst() -> Dict:
                         val = summary_data['data']['cashback_sum']
                         rutas_intentadas.append(f"data.cashback_sum = {val}")
                         try:
-                            cashback_sum_total = float(str(val or '0').replace(',', ''))
+                            cashback_sum_total = parsear_monto_api(val)
                             print(f"   ✅ Encontrado en data.cashback_sum: ${cashback_sum_total:,.2f}")
                         except (ValueError, TypeError):
                             pass
@@ -876,7 +878,7 @@ def sincronizar_balance_pst() -> Dict:
                         val = summary_data['summary']['cashback_sum']
                         rutas_intentadas.append(f"summary.cashback_sum = {val}")
                         try:
-                            cashback_sum_total = float(str(val or '0').replace(',', ''))
+                            cashback_sum_total = parsear_monto_api(val)
                             print(f"   ✅ Encontrado en summary.cashback_sum: ${cashback_sum_total:,.2f}")
                         except (ValueError, TypeError):
                             pass
@@ -886,7 +888,7 @@ def sincronizar_balance_pst() -> Dict:
                     val = summary_data['cashback_sum']
                     rutas_intentadas.append(f"cashback_sum (raíz) = {val}")
                     try:
-                        cashback_sum_total = float(str(val or '0').replace(',', ''))
+                        cashback_sum_total = parsear_monto_api(val)
                         print(f"   ✅ Encontrado en cashback_sum (raíz): ${cashback_sum_total:,.2f}")
                     except (ValueError, TypeError):
                         pass
@@ -914,7 +916,7 @@ def sincronizar_balance_pst() -> Dict:
                         val, ruta = resultado_busqueda
                         rutas_intentadas.append(f"{ruta} = {val}")
                         try:
-                            cashback_sum_total = float(str(val or '0').replace(',', ''))
+                            cashback_sum_total = parsear_monto_api(val)
                             print(f"   ✅ Encontrado en {ruta}: ${cashback_sum_total:,.2f}")
                         except (ValueError, TypeError):
                             pass
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+BLACK INFRASTRUCTURE - RECORDATORIOS DE COBRO
+==============================================
+Una vez por día (RECORDATORIOS_HORA) calcula los cobros de la semana con
+la función obtener_detalle_cobros_semana() de migration_dia_cobro.sql y
+envía el aviso a los chats de RECORDATORIOS_CHAT_IDS.
+
+- El detalle se guarda en memoria por fecha: /cobros y el envío diario
+  leen ese resultado en lugar de consultar la base en cada pedido.
+- Cada chat recibe un solo mensaje con todos los vencimientos; los envíos
+  se espacian (RECORDATORIOS_POR_SEGUNDO) y respetan el RetryAfter de
+  Telegram.
+
+USO:
+    from recordatorios import servicio_recordatorios
+
+    await servicio_recordatorios.iniciar(application.bot, supabase)   # post_init del bot
+    cobros = await servicio_recordatorios.cobros_semana(supabase)     # cacheado por día
+    await servicio_recordatorios.detener()
+
+Autor: Senior Backend Developer
+Fecha: 19/10/2026
+Versión: 1.0.0
+"""
+
+import asyncio
+import os
+from datetime import datetime, time as hora_del_dia, timedelta
+from zoneinfo import ZoneInfo
+
+from supabase import Client
+from telegram.error import Forbidden, RetryAfter, TelegramError
+
+from db_async import ejecutar
+from montos import FORMATO_EN, parsear_monto
+from utils import formato_argentino
+
+
+# Hora local del envío diario (HH:MM) y zona horaria
+HORA_RECORDATORIOS = os.getenv('RECORDATORIOS_HORA', '09:00')
+ZONA_RECORDATORIOS = ZoneInfo(os.getenv('RECORDATORIOS_TZ', 'America/Argentina/Buenos_Aires'))
+
+# Envíos por segundo (Telegram admite ~30 por segundo entre todos los chats)
+ENVIOS_POR_SEGUNDO = float(os.getenv('RECORDATORIOS_POR_SEGUNDO', '20'))
+
+# Telegram corta los mensajes en 4096 caracteres
+LIMITE_MENSAJE = 4000
+
+EMOJI_URGENCIA = {
+    'ATRASADO': '🔴',
+    'HOY': '🔴',
+    'URGENTE': '🟠',
+    'ESTA_SEMANA': '🟡',
+}
+
+
+def chats_destino() -> list:
+    """
+    Chats que reciben el aviso diario (RECORDATORIOS_CHAT_IDS, separados por coma).
+
+    Returns:
+        list: Ids de chat (int)
+    """
+    chats = []
+    for valor in os.getenv('RECORDATORIOS_CHAT_IDS', '').split(','):
+        valor = valor.strip()
+        if not valor:
+            continue
+        try:
+            chats.append(int(valor))
+        except ValueError:
+            print(f"⚠️ RECORDATORIOS_CHAT_IDS: id de chat inválido '{valor}'")
+    return chats
+
+
+def segundos_hasta_proximo_envio(ahora: datetime = None) -> float:
+    """
+    Segundos hasta la próxima RECORDATORIOS_HORA (hoy o mañana).
+    """
+    ahora = ahora or datetime.now(ZONA_RECORDATORIOS)
+    horas, minutos = (int(parte) for parte in HORA_RECORDATORIOS.split(':'))
+
+    proximo = datetime.combine(ahora.date(), hora_del_dia(horas, minutos), tzinfo=ahora.tzinfo)
+    if proximo <= ahora:
+        proximo += timedelta(days=1)
+    return (proximo - ahora).total_seconds()
+
+
+# ============================================================================
+# CONSULTA Y MENSAJE
+# ============================================================================
+
+def consultar_cobros_semana(supabase: Client) -> dict:
+    """
+    Clientes activos con vencimiento en los próximos 7 días (una sola llamada RPC).
+
+    Args:
+        supabase: Cliente de Supabase
+
+    Returns:
+        dict: {'cobros': [...], 'total_semana': float} o {'error': str}
+    """
+    try:
+        response = supabase.rpc('obtener_detalle_cobros_semana', {}).execute()
+    except Exception as e:
+        print(f"❌ Error al consultar cobros de la semana: {e}")
+        return {'error': str(e)}
+
+    cobros = []
+    total_semana = 0.0
+    for fila in response.data or []:
+        cobros.append({
+            'cliente_id': fila.get('cliente_id'),
+            'nombre': fila.get('nombre') or 'Sin nombre',
+            'fee_mensual': parsear_monto(fila.get('fee_mensual'), FORMATO_EN) or 0.0,
+            'proximo_vencimiento': fila.get('proximo_vencimiento'),
+            'dias_hasta_vencimiento': int(fila.get('dias_hasta_vencimiento') or 0),
+            'estado_urgencia': fila.get('estado_urgencia') or 'NORMAL',
+        })
+        total_semana = parsear_monto(fila.get('total_semana'), FORMATO_EN) or 0.0
+
+    return {'cobros': cobros, 'total_semana': total_semana}
+
+
+def construir_mensaje_cobros(datos: dict) -> str:
+    """
+    Arma el aviso de cobros de la semana.
+
+    Args:
+        datos: Resultado de consultar_cobros_semana()
+
+    Returns:
+        str: Mensaje en Markdown
+    """
+    if 'error' in datos:
+        return f"❌ **ERROR**\n\nNo se pudieron consultar los cobros:\n`{datos['error']}`"
+
+    if not datos['cobros']:
+        return "📅 **COBROS DE LA SEMANA**\n\nNo hay vencimientos en los próximos 7 días."
+
+    lineas = [
+        "📅 **COBROS DE LA SEMANA**",
+        "",
+        f"💰 Total a cobrar: **${formato_argentino(datos['total_semana'])} USD**",
+        "",
+    ]
+    for cobro in datos['cobros']:
+        dias = cobro['dias_hasta_vencimiento']
+        cuando = 'hoy' if dias == 0 else ('mañana' if dias == 1 else f"en {dias} días")
+        try:
+            fecha = datetime.strptime(cobro['proximo_vencimiento'], '%Y-%m-%d').strftime('%d/%m')
+        except (TypeError, ValueError):
+            fecha = '--/--'
+        emoji = EMOJI_URGENCIA.get(cobro['estado_urgencia'], '⚪')
+        lineas.append(
+            f"{emoji} *{cobro['nombre']}* - ${formato_argentino(cobro['fee_mensual'])} ({fecha}, {cuando})"
+        )
+
+    return "\n".join(lineas)
+
+
+def _partir_mensaje(mensaje: str) -> list:
+    """
+    Divide el mensaje por líneas para no superar el límite de Telegram.
+    """
+    partes, actual = [], ''
+    for linea in mensaje.split('\n'):
+        if actual and len(actual) + len(linea) + 1 > LIMITE_MENSAJE:
+            partes.append(actual)
+            actual = ''
+        actual = f"{actual}\n{linea}" if actual else linea
+    if actual:
+        partes.append(actual)
+    return partes
+
+
+# ============================================================================
+# SERVICIO
+# ============================================================================
+
+class ServicioRecordatorios:
+    """
+    Cobros de la semana cacheados por día y envío programado de avisos.
+    """
+
+    def __init__(self, envios_por_segundo: float = ENVIOS_POR_SEGUNDO):
+        self.intervalo_envio = 1.0 / envios_por_segundo if envios_por_segundo > 0 else 0.0
+        self._cache = None               # (date, datos)
+        self._lock = asyncio.Lock()
+        self._tarea = None
+
+    # ------------------------------------------------------------------------
+    # Datos
+    # ------------------------------------------------------------------------
+
+    async def cobros_semana(self, supabase: Client) -> dict:
+        """
+        Cobros de la semana; se consulta una vez por día (o tras invalidar()).
+
+        Returns:
+            dict: {'cobros': [...], 'total_semana': float} o {'error': str}
+        """
+        hoy = datetime.now(ZONA_RECORDATORIOS).date()
+        if self._cache is not None and self._cache[0] == hoy:
+            return self._cache[1]
+
+        # Un solo cálculo aunque lleguen varios /cobros a la vez
+        async with self._lock:
+            if self._cache is not None and self._cache[0] == hoy:
+                return self._cache[1]
+
+            datos = await ejecutar(consultar_cobros_semana, supabase)
+            if 'error' not in datos:
+                self._cache = (hoy, datos)
+                print(f"📅 Cobros de la semana calculados: {len(datos['cobros'])} vencimiento(s)")
+            return datos
+
+    def invalidar(self):
+        """
+        Descarta el cálculo del día (ej: tras cambiar el fee o el estado de un cliente).
+        """
+        self._cache = None
+
+    # ------------------------------------------------------------------------
+    # Envío
+    # ------------------------------------------------------------------------
+
+    async def enviar(self, bot, supabase: Client, chats: list = None) -> dict:
+        """
+        Envía el aviso de cobros a cada chat, espaciando los envíos.
+
+        Args:
+            bot: telegram.Bot
+            supabase: Cliente de Supabase
+            chats: Chats destino (default: RECORDATORIOS_CHAT_IDS)
+
+        Returns:
+            dict: {'enviados': int, 'fallidos': int} o {'error': str}
+        """
+        chats = chats_destino() if chats is None else chats
+        if not chats:
+            return {'enviados': 0, 'fallidos': 0}
+
+        datos = await self.cobros_semana(supabase)
+        if 'error' in datos:
+            return {'error': datos['error']}
+        if not datos['cobros']:
+            print("📅 Sin vencimientos esta semana: no se envían recordatorios")
+            return {'enviados': 0, 'fallidos': 0}
+
+        # El mensaje se arma una sola vez para todos los chats
+        partes = _partir_mensaje(construir_mensaje_cobros(datos))
+
+        enviados = fallidos = 0
+        for chat_id in chats:
+            ok = True
+            for parte in partes:
+                ok = await self._enviar_uno(bot, chat_id, parte) and ok
+                await asyncio.sleep(self.intervalo_envio)
+            if ok:
+                enviados += 1
+            else:
+                fallidos += 1
+
+        print(f"📨 Recordatorios de cobro: {enviados} enviado(s), {fallidos} fallido(s)")
+        return {'enviados': enviados, 'fallidos': fallidos}
+
+    async def _enviar_uno(self, bot, chat_id: int, texto: str) -> bool:
+        for intento in range(2):
+            try:
+                await bot.send_message(chat_id=chat_id, text=texto, parse_mode='Markdown')
+                return True
+            except RetryAfter as e:
+                # Telegram indica cuánto esperar; se reintenta una vez
+                espera = e.retry_after.total_seconds() if isinstance(e.retry_after, timedelta) else e.retry_after
+                print(f"⏳ Límite de Telegram, reintentando en {espera}s (chat {chat_id})")
+                await asyncio.sleep(espera)
+            except Forbidden:
+                print(f"⚠️ El chat {chat_id} bloqueó al bot o no lo inició")
+                return False
+            except TelegramError as e:
+                print(f"❌ Error al enviar recordatorio a {chat_id}: {e}")
+                return False
+        return False
+
+    # ------------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------------
+
+    async def iniciar(self, bot, supabase: Client):
+        """
+        Lanza la tarea diaria (una sola por proceso). Sin chats configurados no hace nada.
+        """
+        if self._tarea is not None and not self._tarea.done():
+            return
+
+        chats = chats_destino()
+        if not chats:
+            print("📅 Recordatorios de cobro desactivados (sin RECORDATORIOS_CHAT_IDS)")
+            return
+
+        self._tarea = asyncio.get_running_loop().create_task(self._bucle(bot, supabase))
+        print(f"📅 Recordatorios de cobro programados a las {HORA_RECORDATORIOS} para {len(chats)} chat(s)")
+
+    async def detener(self):
+        """
+        Cancela la tarea diaria.
+        """
+        if self._tarea is None:
+            return
+
+        tarea, self._tarea = self._tarea, None
+        tarea.cancel()
+        try:
+            await tarea
+        except asyncio.CancelledError:
+            pass
+        print("📅 Recordatorios de cobro detenidos")
+
+    async def _bucle(self, bot, supabase: Client):
+        while True:
+            await asyncio.sleep(segundos_hasta_proximo_envio())
+            try:
+                await self.enviar(bot, supabase)
+            except Exception as e:
+                # Un fallo puntual no debe frenar los envíos de los días siguientes
+                print(f"❌ Error en recordatorios de cobro: {e}")
+
+
+# Instancia única del proceso
+servicio_recordatorios = ServicioRecordatorios()
+
+
+if __name__ == "__main__":
+    from db_manager import inicializar_supabase
+
+    print("\n🧪 TEST - Cobros de la semana\n")
+    print(construir_mensaje_cobros(consultar_cobros_semana(inicializar_supabase())))
+    print(f"\n⏰ Próximo envío en {segundos_hasta_proximo_envio() / 3600:.1f} horas")
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+BLACK INFRASTRUCTURE - RESUMEN MENSUAL (ROLLUP)
+================================================
+Mantiene la tabla resumen_mensual: una fila por (periodo, tipo) con los
+totales de ingresos y costos, ajustada en cada alta/baja/edición del bot.
+
+Los resúmenes leen una fila por mes en lugar de recorrer transacciones.
+Ver migration_resumen_mensual.sql.
+
+USO:
+- Hooks: registrar_ingreso / registrar_ingresos / registrar_costo / reemplazar_costo
+- Lectura: leer_resumen_mensual(supabase, periodos)
+- Reconstrucción: python resumen_mensual.py --rebuild
+
+Autor: Senior Backend Developer
+Fecha: 19/10/2026
+Versión: 1.0.0
+"""
+
+import argparse
+import os
+
+from dotenv import load_dotenv
+from supabase import create_client, Client
+
+from montos import FORMATO_EN, parsear_monto
+from utils import periodo_de_fecha
+
+
+# Tipos de fila del rollup
+TIPO_INGRESOS = 'ingresos'
+TIPO_COSTOS_FIJOS = 'costos_fijos'
+TIPO_COSTOS_VARIABLES = 'costos_variables'
+
+
+# ============================================================================
+# DELTAS
+# ============================================================================
+
+def _monto_db(valor) -> float:
+    """Montos leídos de columnas numeric (número o texto canónico '1234.50')."""
+    return parsear_monto(valor, FORMATO_EN) or 0.0
+
+
+def _tipo_costo(costo: dict) -> str:
+    return TIPO_COSTOS_FIJOS if costo.get('tipo') == 'Fijo' else TIPO_COSTOS_VARIABLES
+
+
+def es_costo_dinamico(costo: dict) -> bool:
+    """
+    Indica si el monto del costo se calcula al momento (ej: Agustín).
+    """
+    return costo.get('nombre') == 'Agustin' or bool(costo.get('es_calculo_dinamico', False))
+
+
+def delta_ingreso(ingreso: dict, signo: int = 1) -> dict:
+    """
+    Calcula el ajuste del rollup para un ingreso.
+
+    Args:
+        ingreso: Fila de la tabla ingresos (monto_usd_total, monto_ars, fecha_cobro)
+        signo: 1 para un alta, -1 para una baja
+
+    Returns:
+        dict: Parámetros para la RPC ajustar_resumen_mensual
+    """
+    usd = _monto_db(ingreso.get('monto_usd_total'))
+    ars = _monto_db(ingreso.get('monto_ars'))
+    con_cotizacion = ars > 0 and usd > 0
+
+    return {
+        'periodo_param': periodo_de_fecha(ingreso.get('fecha_cobro') or ''),
+        'tipo_param': TIPO_INGRESOS,
+        'delta_usd': signo * usd,
+        'delta_ars': signo * ars,
+        'delta_cantidad': signo,
+        'delta_dinamicos': 0,
+        'delta_suma_cotizaciones': signo * (ars / usd) if con_cotizacion else 0.0,
+        'delta_cantidad_cotizaciones': signo if con_cotizacion else 0
+    }
+
+
+def delta_costo(costo: dict, signo: int = 1) -> dict:
+    """
+    Calcula el ajuste del rollup para un costo.
+
+    Mismo criterio que db_manager._monto_costo_usd: los dinámicos solo se
+    cuentan, los que tienen monto_ars suman en ARS y el resto en USD.
+
+    Args:
+        costo: Fila de la tabla costos
+        signo: 1 para un alta, -1 para una baja
+
+    Returns:
+        dict: Parámetros para la RPC ajustar_resumen_mensual
+    """
+    dinamico = es_costo_dinamico(costo)
+    ars = 0.0 if dinamico else _monto_db(costo.get('monto_ars'))
+    usd = 0.0 if dinamico or ars else _monto_db(costo.get('monto_usd'))
+
+    return {
+        'periodo_param': periodo_de_fecha(costo.get('created_at') or ''),
+        'tipo_param': _tipo_costo(costo),
+        'delta_usd': signo * usd,
+        'delta_ars': signo * ars,
+        'delta_cantidad': signo,
+        'delta_dinamicos': signo if dinamico else 0,
+        'delta_suma_cotizaciones': 0.0,
+        'delta_cantidad_cotizaciones': 0
+    }
+
+
+def _aplicar_delta(supabase: Client, delta: dict) -> bool:
+    """
+    Aplica un delta con la RPC ajustar_resumen_mensual.
+
+    Nunca lanza: la transacción original ya está guardada, y un rollup
+    desfasado se corrige con --rebuild.
+
+    Returns:
+        bool: True si se aplicó
+    """
+    if not delta['periodo_param']:
+        print(f"⚠️ Rollup: registro sin fecha, no se ajusta resumen_mensual")
+        return False
+
+    try:
+        supabase.rpc('ajustar_resumen_mensual', delta).execute()
+        print(f"📊 Rollup {delta['periodo_param']}/{delta['tipo_param']}: "
+              f"{delta['delta_cantidad']:+d} registro(s), ${delta['delta_usd']:+,.2f} USD")
+        return True
+    except Exception as e:
+        print(f"⚠️ No se pudo ajustar resumen_mensual (ejecutar --rebuild): {e}")
+        return False
+
+
+# ============================================================================
+# HOOKS DE ESCRITURA
+# ============================================================================
+
+def registrar_ingreso(supabase: Client, ingreso: dict, signo: int = 1) -> bool:
+    """
+    Ajusta el rollup tras insertar (signo=1) o borrar (signo=-1) un ingreso.
+    """
+    return _aplicar_delta(supabase, delta_ingreso(ingreso, signo))
+
+
+def registrar_ingresos(supabase: Client, ingresos: list) -> bool:
+    """
+    Ajusta el rollup tras un insert masivo: una RPC por período en lugar de una por ingreso.
+    """
+    deltas = {}
+    for ingreso in ingresos:
+        delta = delta_ingreso(ingreso)
+        acumulado = deltas.get(delta['periodo_param'])
+        if acumulado is None:
+            deltas[delta['periodo_param']] = delta
+        else:
+            for campo, valor in delta.items():
+                if campo.startswith('delta_'):
+                    acumulado[campo] += valor
+
+    return all([_aplicar_delta(supabase, delta) for delta in deltas.values()])
+
+
+def registrar_costo(supabase: Client, costo: dict, signo: int = 1) -> bool:
+    """
+    Ajusta el rollup tras insertar (signo=1) o borrar (signo=-1) un costo.
+    """
+    return _aplicar_delta(supabase, delta_costo(costo, signo))
+
+
+def reemplazar_costo(supabase: Client, anterior: dict, nuevo: dict) -> bool:
+    """
+    Ajusta el rollup tras editar un costo (resta la versión anterior y suma la nueva).
+    """
+    return registrar_costo(supabase, anterior, -1) and registrar_costo(supabase, nuevo, 1)
+
+
+# ============================================================================
+# LECTURA Y RECONSTRUCCIÓN
+# ============================================================================
+
+def leer_resumen_mensual(supabase: Client, periodos: list) -> dict:
+    """
+    Lee las filas del rollup de varios periodos en una sola consulta.
+
+    Args:
+        supabase: Cliente de Supabase
+        periodos: Lista de periodos MM-YYYY
+
+    Returns:
+        dict: {periodo: {tipo: fila}} (tipos sin movimientos no aparecen)
+
+    Raises:
+        Exception: Si la tabla no existe o la consulta falla
+    """
+    response = supabase.table('resumen_mensual') \
+        .select('periodo, tipo, total_usd, total_ars, cantidad, cantidad_dinamicos, '
+                'suma_cotizaciones, cantidad_cotizaciones') \
+        .in_('periodo', periodos) \
+        .execute()
+
+    if not hasattr(response, 'data') or response.data is None:
+        raise Exception("Respuesta inválida de la tabla resumen_mensual")
+
+    resultado = {p: {} for p in periodos}
+    for fila in response.data:
+        if fila.get('periodo') in resultado:
+            resultado[fila['periodo']][fila['tipo']] = fila
+
+    return resultado
+
+
+def reconstruir_resumen_mensual(supabase: Client) -> dict:
+    """
+    Recalcula todo el rollup desde ingresos y costos (RPC reconstruir_resumen_mensual).
+
+    Returns:
+        dict: {'filas': int} o {'error': str}
+    """
+    try:
+        print("🔄 Reconstruyendo resumen_mensual...")
+        response = supabase.rpc('reconstruir_resumen_mensual', {}).execute()
+        filas = response.data if isinstance(response.data, int) else 0
+        print(f"✅ resumen_mensual reconstruido: {filas} fila(s)")
+        return {'filas': filas}
+    except Exception as e:
+        print(f"❌ Error al reconstruir resumen_mensual: {e}")
+        return {'error': str(e)}
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+if __name__ == "__main__":
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Rollup mensual de ingresos y costos")
+    parser.add_argument('--rebuild', action='store_true', help="Reconstruir la tabla desde cero")
+    parser.add_argument('--periodos', help="Periodos a mostrar, separados por coma (MM-YYYY)")
+    args = parser.parse_args()
+
+    url = os.getenv("SUPABASE_URL", "").strip().strip('"').strip("'")
+    key = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "").strip().strip('"').strip("'")
+
+    if not url or not key:
+        print("❌ Faltan SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY en .env")
+        raise SystemExit(1)
+
+    supabase = create_client(url, key)
+
+    if args.rebuild:
+        resultado = reconstruir_resumen_mensual(supabase)
+        if 'error' in resultado:
+            raise SystemExit(1)
+
+    if args.periodos:
+        periodos = [p.strip() for p in args.periodos.split(',') if p.strip()]
+        print(f"\n🧪 TEST - resumen_mensual ({', '.join(periodos)})\n")
+        for periodo, tipos in leer_resumen_mensual(supabase, periodos).items():
+            print(f"📅 {periodo}")
+            for tipo, fila in sorted(tipos.items()):
+                print(f"   {tipo:<18} USD ${float(fila['total_usd']):>12,.2f} | "
+                      f"ARS ${float(fila['total_ars']):>14,.2f} | {fila['cantidad']} registro(s)")
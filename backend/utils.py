@@ -9,7 +9,9 @@ Fecha: 21/01/2026
 Versión: 2.0.0
 """
 
+import calendar
 import re
+from datetime import date
 
 
 def limpiar_id(callback_data: str) -> str:
@@ -68,3 +70,110 @@ def formato_argentino(numero: float) -> str:
     decimal_str = f"{decimal:.2f}".split('.')[1]
     
     return f"{entero_str},{decimal_str}"
+
+
+# ============================================================================
+# PERIODOS (formato MM-YYYY)
+# ============================================================================
+
+MESES_ES = [
+    'ENERO', 'FEBRERO', 'MARZO', 'ABRIL', 'MAYO', 'JUNIO',
+    'JULIO', 'AGOSTO', 'SEPTIEMBRE', 'OCTUBRE', 'NOVIEMBRE', 'DICIEMBRE'
+]
+
+
+def periodo_actual() -> str:
+    """
+    Devuelve el periodo del mes en curso.
+    
+    Returns:
+        str: Periodo en formato MM-YYYY (ej: "01-2026")
+    """
+    return date.today().strftime('%m-%Y')
+
+
+def parsear_periodo(periodo: str) -> tuple:
+    """
+    Valida un periodo MM-YYYY y devuelve (anio, mes).
+    
+    Args:
+        periodo: Periodo en formato MM-YYYY
+    
+    Returns:
+        tuple: (anio, mes) como enteros
+    
+    Raises:
+        ValueError: Si el periodo no tiene formato MM-YYYY válido
+    """
+    match = re.fullmatch(r'(\d{2})-(\d{4})', str(periodo).strip())
+    if not match or not 1 <= int(match.group(1)) <= 12:
+        raise ValueError(f"Periodo inválido: '{periodo}' (formato esperado MM-YYYY)")
+    return int(match.group(2)), int(match.group(1))
+
+
+def rango_periodo(periodo: str) -> tuple:
+    """
+    Devuelve el primer y último día de un periodo.
+    
+    Args:
+        periodo: Periodo en formato MM-YYYY
+    
+    Returns:
+        tuple: (inicio, fin) como strings YYYY-MM-DD
+    
+    Ejemplo:
+        >>> rango_periodo('02-2026')
+        ('2026-02-01', '2026-02-28')
+    """
+    anio, mes = parsear_periodo(periodo)
+    ultimo_dia = calendar.monthrange(anio, mes)[1]
+    return date(anio, mes, 1).isoformat(), date(anio, mes, ultimo_dia).isoformat()
+
+
+def periodo_de_fecha(fecha) -> str:
+    """
+    Convierte una fecha (date o string ISO) a su periodo MM-YYYY.
+    
+    Ejemplo:
+        >>> periodo_de_fecha('2026-01-15T10:30:00')
+        '01-2026'
+    """
+    fecha_str = fecha.isoformat() if isinstance(fecha, date) else str(fecha)
+    return f"{fecha_str[5:7]}-{fecha_str[0:4]}"
+
+
+def generar_periodos(meses: int, hasta: str = None) -> list:
+    """
+    Genera los últimos N periodos, del más antiguo al más reciente.
+    
+    Args:
+        meses: Cantidad de periodos
+        hasta: Último periodo incluido (default: periodo actual)
+    
+    Returns:
+        list: Periodos en formato MM-YYYY
+    
+    Ejemplo:
+        >>> generar_periodos(3, hasta='02-2026')
+        ['12-2025', '01-2026', '02-2026']
+    """
+    anio, mes = parsear_periodo(hasta or periodo_actual())
+    periodos = []
+    for _ in range(max(meses, 0)):
+        periodos.append(f"{mes:02d}-{anio}")
+        mes -= 1
+        if mes == 0:
+            mes, anio = 12, anio - 1
+    return list(reversed(periodos))
+
+
+def nombre_periodo(periodo: str) -> str:
+    """
+    Nombre legible de un periodo para mostrar en mensajes.
+    
+    Ejemplo:
+        >>> nombre_periodo('01-2026')
+        'ENERO 2026'
+    """
+    anio, mes = parsear_periodo(periodo)
+    return f"{MESES_ES[mes - 1]} {anio}"
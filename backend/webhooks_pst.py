@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+BLACK INFRASTRUCTURE - COLA DE WEBHOOKS DE PST.NET
+===================================================
+POST /webhooks/pst (main.py) verifica la firma HMAC, deja el evento en
+una cola en memoria y responde 200 al instante. Una tarea de fondo junta
+los eventos en lotes (hasta PST_WEBHOOK_LOTE, o lo que llegue en
+PST_WEBHOOK_ESPERA segundos) y los registra con un insert masivo
+(procesar_webhooks_pst_net).
+
+- Cola llena o sin iniciar → la ruta responde 503 y PST.NET reintenta.
+- Los reenvíos de un pago encolado o ya registrado se descartan; si su
+  lote falla, el pago se olvida y el próximo reenvío se vuelve a procesar.
+- La cola es en memoria: lo encolado y no procesado se pierde si el
+  proceso muere; la sincronización por polling (/pagos) lo recupera.
+
+VARIABLES:
+- PST_NET_SECRET       → obligatorio; sin él la ruta rechaza todo
+- PST_WEBHOOK_LOTE     → eventos por lote (default 100)
+- PST_WEBHOOK_ESPERA   → segundos que se espera para completar un lote (default 1)
+- PST_WEBHOOK_COLA_MAX → eventos pendientes como máximo (default 1000)
+
+USO:
+    from webhooks_pst import cola_webhooks_pst
+
+    await cola_webhooks_pst.iniciar(supabase)   # startup de la API
+    cola_webhooks_pst.encolar(evento)           # en la ruta, tras validar la firma
+    await cola_webhooks_pst.detener()           # procesa lo pendiente
+
+Autor: Senior Backend Developer
+Fecha: 19/10/2026
+Versión: 1.0.0
+"""
+
+import asyncio
+import os
+from collections import OrderedDict
+
+from db_async import ejecutar
+from pst_net_integration import HEADER_FIRMA_PST_NET, procesar_webhooks_pst_net
+
+
+RUTA_WEBHOOK_PST = '/webhooks/pst'
+HEADER_FIRMA_PST = HEADER_FIRMA_PST_NET
+
+LOTE_WEBHOOKS = int(os.getenv('PST_WEBHOOK_LOTE', '100'))
+ESPERA_LOTE = float(os.getenv('PST_WEBHOOK_ESPERA', '1'))
+MAXIMO_COLA = int(os.getenv('PST_WEBHOOK_COLA_MAX', '1000'))
+
+# Pagos registrados que se recuerdan para descartar reenvíos
+MAXIMO_VISTOS = 10_000
+
+
+def _id_pago(evento: dict):
+    datos = evento.get('data')
+    return datos.get('id') if isinstance(datos, dict) else None
+
+
+class ColaWebhooksPst:
+    """
+    Eventos de PST.NET pendientes y la tarea que los registra por lotes.
+    """
+
+    def __init__(self, lote: int = LOTE_WEBHOOKS, espera: float = ESPERA_LOTE, maximo: int = MAXIMO_COLA):
+        self.lote = lote
+        self.espera = espera
+        self.maximo = maximo
+        self._cola = None
+        self._encolados = set()          # pagos en la cola o en el lote en curso
+        self._vistos = OrderedDict()     # pagos de lotes ya registrados
+        self._tarea = None
+        self._supabase = None
+
+    # ------------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------------
+
+    async def iniciar(self, supabase):
+        """
+        Crea la cola y lanza la tarea de fondo (una sola por proceso).
+        """
+        if self._tarea is not None and not self._tarea.done():
+            return
+
+        self._supabase = supabase
+        self._cola = asyncio.Queue(maxsize=self.maximo)
+        self._tarea = asyncio.get_running_loop().create_task(self._bucle())
+        print(f"📬 Cola de webhooks PST.NET iniciada (lotes de {self.lote}, espera {self.espera}s)")
+
+    async def detener(self):
+        """
+        Cancela la tarea de fondo y registra los eventos que quedaron en la cola.
+        """
+        if self._tarea is None:
+            return
+
+        tarea, self._tarea = self._tarea, None
+        tarea.cancel()
+        try:
+            await tarea
+        except asyncio.CancelledError:
+            pass
+
+        pendientes = []
+        while not self._cola.empty():
+            pendientes.append(self._cola.get_nowait())
+        if pendientes:
+            await self._procesar(pendientes)
+        print("📬 Cola de webhooks PST.NET detenida")
+
+    # ------------------------------------------------------------------------
+    # Recepción
+    # ------------------------------------------------------------------------
+
+    def encolar(self, evento: dict) -> bool:
+        """
+        Deja un evento en la cola sin esperar su procesamiento.
+
+        Args:
+            evento: Cuerpo del webhook ya validado
+
+        Returns:
+            bool: False si la cola no está iniciada o está llena
+        """
+        if self._tarea is None or self._tarea.done():
+            return False
+
+        pago_id = _id_pago(evento)
+        if pago_id is not None and (pago_id in self._encolados or pago_id in self._vistos):
+            print(f"♻️ Webhook repetido del pago {pago_id}, se descarta")
+            return True
+
+        try:
+            self._cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            print(f"⚠️ Cola de webhooks PST.NET llena ({self.maximo} eventos)")
+            return False
+
+        if pago_id is not None:
+            self._encolados.add(pago_id)
+        return True
+
+    def pendientes(self) -> int:
+        """
+        Eventos encolados y todavía sin procesar.
+        """
+        return self._cola.qsize() if self._cola is not None else 0
+
+    # ------------------------------------------------------------------------
+    # Procesamiento
+    # ------------------------------------------------------------------------
+
+    async def _bucle(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            eventos = [await self._cola.get()]
+
+            # Completar el lote con lo que llegue dentro de la ventana de espera
+            limite = loop.time() + self.espera
+            while len(eventos) < self.lote:
+                restante = limite - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    eventos.append(await asyncio.wait_for(self._cola.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._procesar(eventos)
+
+    async def _procesar(self, eventos: list):
+        pago_ids = [pago_id for pago_id in map(_id_pago, eventos) if pago_id is not None]
+        registrado = False
+        try:
+            resultado = await ejecutar(procesar_webhooks_pst_net, eventos, self._supabase)
+            print(f"📬 Webhooks PST.NET: {resultado['exitosos']}/{resultado['total']} pago(s) registrados")
+            registrado = resultado['fallidos'] == 0
+        except Exception as e:
+            # Un lote fallido no frena la cola; el reenvío o el polling recuperan esos pagos
+            print(f"❌ Error al procesar {len(eventos)} webhook(s) de PST.NET: {e}")
+        finally:
+            self._encolados.difference_update(pago_ids)
+
+        # Solo un lote completo se recuerda; si no, el reenvío vuelve a entrar
+        # (procesar_webhooks_pst_net no duplica los que sí se insertaron)
+        if registrado:
+            for pago_id in pago_ids:
+                self._vistos[pago_id] = True
+            while len(self._vistos) > MAXIMO_VISTOS:
+                self._vistos.popitem(last=False)
+
+
+# Instancia única del proceso
+cola_webhooks_pst = ColaWebhooksPst()
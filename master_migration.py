@@ -10,13 +10,24 @@ Fecha: 21/01/2026
 Versión: 1.0.0
 """
 
+import argparse
+import hashlib
+import json
 import os
 import sys
+import threading
+import numpy as np
 import pandas as pd
 from supabase import create_client, Client
 from dotenv import load_dotenv
 from datetime import datetime
+import time
 import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+from montos import parsear_montos
+from resumen_mensual import reconstruir_resumen_mensual
 
 # ============================================================================
 # CONFIGURACIÓN GLOBAL
@@ -48,127 +59,877 @@ CSV_FILES = {
     'cotizaciones': 'Contabilidad - BLACK - Cotizaciones.csv',
 }
 
+# Registros por request de insert/upsert (--chunk-size)
+TAMANO_LOTE = 500
+
+# Filas del CSV que se leen por bloque en modo --stream
+FILAS_POR_BLOQUE = 5000
+
+# Filas por página al leer una tabla completa (máximo por defecto de PostgREST)
+FILAS_POR_PAGINA = 1000
+
+# Migraciones en paralelo (--workers): tablas independientes a la vez
+HILOS_MIGRACION = 3
+
+# Tablas que necesita cada migración (ingresos mapea nombre de cliente → id).
+# Las dependencias se declaran antes que las tablas que dependen de ellas.
+DEPENDENCIAS_MIGRACION = {
+    'clientes': (),
+    'ingresos': ('clientes',),
+    'costos': (),
+    'cotizaciones': (),
+}
+
+# Clave natural de cada tabla: identifica si un registro del CSV ya existe
+CLAVES_NATURALES = {
+    'clientes': ('nombre',),
+    'ingresos': ('cliente_id', 'fecha_cobro'),
+    'costos': ('nombre',),
+    'cotizaciones': ('fecha',),
+}
+
+# Tablas donde una clave repetida en la base son registros distintos (el bot
+# carga varios pagos del mismo cliente en un día): el CSV actualiza solo la
+# primera fila de la clave. En el resto se actualizan todas sus filas.
+TABLAS_SOLO_PRIMERA_FILA = {'ingresos'}
+
+# Filas leídas de cada CSV (para informar filas/s)
+filas_leidas = {'clientes': 0, 'ingresos': 0, 'costos': 0, 'cotizaciones': 0}
+
 # Estadísticas de migración
 stats = {
-    'clientes': {'insertados': 0, 'actualizados': 0, 'errores': 0},
-    'ingresos': {'insertados': 0, 'actualizados': 0, 'errores': 0},
-    'costos': {'insertados': 0, 'actualizados': 0, 'errores': 0},
-    'cotizaciones': {'insertados': 0, 'actualizados': 0, 'errores': 0},
+    'clientes': {'insertados': 0, 'actualizados': 0, 'sin_cambios': 0, 'errores': 0},
+    'ingresos': {'insertados': 0, 'actualizados': 0, 'sin_cambios': 0, 'errores': 0},
+    'costos': {'insertados': 0, 'actualizados': 0, 'sin_cambios': 0, 'errores': 0},
+    'cotizaciones': {'insertados': 0, 'actualizados': 0, 'sin_cambios': 0, 'errores': 0},
 }
 
 # ============================================================================
-# FUNCIONES DE LIMPIEZA Y TRANSFORMACIÓN
+# FUNCIONES DE LIMPIEZA Y TRANSFORMACIÓN (COLUMNAS COMPLETAS)
 # ============================================================================
+#
+# Cada función recibe una columna entera del CSV (pd.Series) y devuelve otra
+# ya limpia, con operaciones vectorizadas de pandas/NumPy: no hay loops por
+# fila en Python. Los valores vacíos o inválidos quedan en None.
+
+# Celdas que se consideran vacías
+VALORES_VACIOS = ['', '—', '-']
+
+# Textos que se interpretan como True
+VALORES_VERDADEROS = ['sí', 'si', 'yes', 'true', '1', 'activo']
+
+# Formatos de fecha que se prueban en orden (el resto se deduce con pandas)
+FORMATOS_FECHA = ('%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d')
+
+HORA_POR_DEFECTO = '00:00:00'
 
-def limpiar_monto(valor):
+
+def columna(df: pd.DataFrame, nombre: str) -> pd.Series:
+    """
+    Columna del CSV; si no existe, una columna vacía (como row.get()).
     """
-    Limpia montos: elimina $, puntos de miles y convierte coma a punto decimal.
+    if nombre in df.columns:
+        return df[nombre]
+    return pd.Series(None, index=df.index, dtype=object)
+
+
+def _a_texto(serie: pd.Series) -> pd.Series:
+    return serie.astype('string').str.strip()
+
+
+def _con_none(serie: pd.Series) -> pd.Series:
+    return serie.astype(object).where(serie.notna(), None)
+
+
+def limpiar_montos(serie: pd.Series, por_defecto: float = 0.0) -> pd.Series:
+    """
+    Limpia montos: elimina $ y monedas, y deduce el separador decimal.
+    
+    Delegado en backend/montos.py (mismas reglas que el bot y la API).
     
     Args:
-        valor: Valor a limpiar (puede ser string, int, float o None)
+        serie: Columna con strings, números o vacíos
+        por_defecto: Valor para montos vacíos o inválidos
     
     Returns:
-        float o None si el valor es inválido
+        pd.Series: Montos float
     
     Ejemplos:
         '$1,255.50' -> 1255.5
         '$765,000' -> 765000.0
-        '500' -> 500.0
-        '' -> None
+        '1.255,50' -> 1255.5
+        '' -> por_defecto
     """
-    if pd.isna(valor) or valor == '' or valor == '—' or valor == '-':
-        return None
+    montos = parsear_montos(serie.to_numpy(dtype=object))
+    return pd.Series(np.where(np.isnan(montos), por_defecto, montos), index=serie.index)
+
+
+def limpiar_strings(serie: pd.Series) -> pd.Series:
+    """
+    Limpia strings: trim de espacios; vacíos y guiones pasan a None.
+    """
+    texto = _a_texto(serie)
+    return _con_none(texto.mask(texto.isin(VALORES_VACIOS)))
+
+
+def parsear_fechas(serie: pd.Series) -> pd.Series:
+    """
+    Convierte fechas (DD/MM/YYYY, DD-MM-YYYY, YYYY-MM-DD u otras que
+    entienda pandas, día primero) a ISO YYYY-MM-DD.
     
-    try:
-        # Convertir a string y limpiar
-        valor_str = str(valor).strip()
-        
-        # Eliminar símbolos y espacios
-        valor_str = valor_str.replace('$', '').replace(' ', '').replace('USD', '').replace('ARS', '')
-        
-        # Eliminar puntos de miles
-        valor_str = valor_str.replace('.', '')
-        
-        # Convertir coma a punto decimal
-        valor_str = valor_str.replace(',', '.')
-        
-        # Convertir a float
-        return float(valor_str) if valor_str else None
-    except (ValueError, AttributeError):
-        return None
+    Returns:
+        pd.Series: Fechas ISO o None si no se pudieron interpretar
+    """
+    texto = _a_texto(serie)
+    fechas = pd.Series(pd.NaT, index=serie.index, dtype='datetime64[ns]')
+    
+    # Cada formato se aplica solo a las celdas que los anteriores no resolvieron
+    for formato in FORMATOS_FECHA:
+        pendientes = fechas.isna() & texto.notna()
+        if not pendientes.any():
+            break
+        fechas[pendientes] = pd.to_datetime(texto[pendientes], format=formato, errors='coerce')
+    
+    pendientes = fechas.isna() & texto.notna()
+    if pendientes.any():
+        fechas[pendientes] = pd.to_datetime(texto[pendientes], format='mixed', dayfirst=True, errors='coerce')
+    
+    return _con_none(fechas.dt.strftime('%Y-%m-%d'))
 
 
-def limpiar_string(valor):
+def limpiar_horas(serie: pd.Series) -> pd.Series:
     """
-    Limpia strings: trim de espacios, normalización.
+    Extrae la hora HH:MM:SS (algunas celdas traen fecha y hora juntas).
     
-    Args:
-        valor: String a limpiar
+    Returns:
+        pd.Series: Horas HH:MM:SS ('00:00:00' si no hay una hora válida)
+    """
+    texto = _a_texto(serie)
+    horas = pd.Series(HORA_POR_DEFECTO, index=serie.index, dtype=object)
+    
+    # Fecha con hora ('21/01/2026 14:30'): se interpreta completa
+    con_fecha = texto.str.contains('/', regex=False, na=False)
+    resueltas = pd.Series(False, index=serie.index)
+    if con_fecha.any():
+        fechas = pd.to_datetime(texto[con_fecha], format='mixed', errors='coerce')
+        validas = fechas.notna()
+        horas[validas[validas].index] = fechas[validas].dt.strftime('%H:%M:%S')
+        resueltas[validas[validas].index] = True
+    
+    # Hora suelta ('9:5' o '14:30:00'): se completa con ceros
+    partes = texto.str.split(':', expand=True)
+    if partes.shape[1] >= 2:
+        con_hora = ~resueltas & partes[1].notna()
+        segundos = partes[2].fillna('00') if partes.shape[1] > 2 else '00'
+        armadas = partes[0].str.zfill(2) + ':' + partes[1].str.zfill(2) + ':' + pd.Series(segundos, index=serie.index).str.zfill(2)
+        horas[con_hora] = armadas[con_hora]
+    
+    return horas
+
+
+def parsear_booleanos(serie: pd.Series) -> pd.Series:
+    """
+    Convierte strings a booleanos ('Sí', 'true', '1', 'Activo' → True).
+    """
+    return _a_texto(serie).str.lower().isin(VALORES_VERDADEROS).fillna(False).astype(bool)
+
+
+def _avisar_filas(mascara: pd.Series, motivo: str):
+    """
+    Informa las filas del CSV descartadas (número de fila de la planilla;
+    el índice sigue corriendo entre bloques en modo --stream).
+    """
+    for indice in mascara.index[mascara.to_numpy()]:
+        print(f"   ⚠️  Fila {indice + 2}: {motivo}")
+
+
+def _registros(tabla: pd.DataFrame) -> list:
+    """
+    DataFrame ya normalizado → lista de dicts lista para enviar.
+    """
+    return tabla.to_dict('records')
+
+
+def leer_csv(tabla: str):
+    """
+    Lee el CSV de una tabla: entero, o por bloques de filas_por_bloque filas
+    en modo --stream (la memoria queda acotada al tamaño del bloque).
+    
+    Yields:
+        pd.DataFrame: Bloques del CSV con los nombres de columna limpios
+    """
+    inicio = time.perf_counter()
+    bloques = [pd.read_csv(CSV_FILES[tabla])] if not filas_por_bloque else \
+        pd.read_csv(CSV_FILES[tabla], chunksize=filas_por_bloque)
+    
+    for numero, bloque in enumerate(bloques, start=1):
+        bloque.columns = bloque.columns.str.strip()
+        filas_leidas[tabla] += len(bloque)
+        if filas_por_bloque:
+            segundos = time.perf_counter() - inicio
+            print(f"   🌊 {tabla} bloque {numero}: {len(bloque)} filas "
+                  f"({filas_leidas[tabla] / max(segundos, 1e-9):,.0f} filas/s acumulado)")
+        yield bloque
+
+
+# ============================================================================
+# NORMALIZACIÓN POR TABLA
+# ============================================================================
+
+def normalizar_clientes(df: pd.DataFrame) -> list:
+    """
+    Clientes del CSV (SOLO: Cliente, Honorario USD, Estado, Activo?).
     
     Returns:
-        String limpio o None si es vacío
+        list: Registros para la tabla clientes
     """
-    if pd.isna(valor) or valor == '' or valor == '—' or valor == '-':
-        return None
-    return str(valor).strip()
+    nombres = limpiar_strings(columna(df, 'Cliente'))
+    sin_nombre = nombres.isna()
+    _avisar_filas(sin_nombre, "Cliente sin nombre, omitido")
+    
+    tabla = pd.DataFrame({
+        'nombre': nombres,
+        'honorario_usd': limpiar_montos(columna(df, 'Honorario USD')),
+        'estado': limpiar_strings(columna(df, 'Estado')).fillna('Desconocido'),
+        'activo': parsear_booleanos(columna(df, 'Activo?')),
+    })
+    return _registros(tabla[~sin_nombre])
 
 
-def parsear_fecha(fecha_str):
+def normalizar_ingresos(df: pd.DataFrame, clientes_map: dict) -> tuple:
     """
-    Convierte fechas de formato DD/MM/YYYY a ISO YYYY-MM-DD.
+    Ingresos del CSV con el cliente resuelto a su id.
     
     Args:
-        fecha_str: String con la fecha
+        df: CSV de ingresos
+        clientes_map: nombre del cliente → id
     
     Returns:
-        String en formato ISO o None si falla
+        tuple: (registros para la tabla ingresos, filas con error)
     """
-    if pd.isna(fecha_str) or fecha_str == '' or fecha_str == '—':
-        return None
+    nombres = limpiar_strings(columna(df, 'Cliente'))
+    cliente_ids = nombres.map(clientes_map)
+    fechas = parsear_fechas(columna(df, 'Fecha de cobro'))
     
-    try:
-        fecha_str = str(fecha_str).strip()
-        
-        # Intentar varios formatos
-        for fmt in ['%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d']:
-            try:
-                fecha_obj = datetime.strptime(fecha_str, fmt)
-                return fecha_obj.strftime('%Y-%m-%d')
-            except ValueError:
-                continue
-        
-        # Intentar con pandas (más flexible)
-        fecha_obj = pd.to_datetime(fecha_str, dayfirst=True, errors='coerce')
-        if pd.notna(fecha_obj):
-            return fecha_obj.strftime('%Y-%m-%d')
-        
-        return None
-    except Exception:
+    sin_cliente = nombres.isna()
+    no_encontrado = ~sin_cliente & cliente_ids.isna()
+    # Sin fecha no hay clave (cliente_id + fecha_cobro) - NO DUPLICAR
+    sin_fecha = ~sin_cliente & ~no_encontrado & fechas.isna()
+    
+    _avisar_filas(sin_cliente, "Ingreso sin cliente, omitido")
+    for indice in no_encontrado.index[no_encontrado.to_numpy()]:
+        print(f"   ⚠️  Fila {indice + 2}: Cliente '{nombres[indice]}' no encontrado en BD")
+    _avisar_filas(sin_fecha, "Ingreso sin fecha, omitido para evitar duplicados")
+    
+    # MAPEO CORRECTO a nombres cortos de BD
+    tabla = pd.DataFrame({
+        'fecha_cobro': fechas,
+        'cliente_id': cliente_ids,
+        'honorario_usd': limpiar_montos(columna(df, 'Honorario USD')),
+        'medio_pago': limpiar_strings(columna(df, 'Medio de pago')).fillna('No especificado'),
+        'cotizacion_aplicada': limpiar_montos(columna(df, 'Cotización Aplicada')),
+        'monto_ars': limpiar_montos(columna(df, 'Monto cobrado ARS')),
+        'monto_usdt': limpiar_montos(columna(df, 'Monto cobrado USDT')),
+        'monto_usd_total': limpiar_montos(columna(df, 'Montro cobrado USD')),  # Typo del CSV
+        'estado': limpiar_strings(columna(df, 'Estado')).fillna('Pendiente'),
+    })
+    validas = ~(sin_cliente | no_encontrado | sin_fecha)
+    return _registros(tabla[validas]), int(no_encontrado.sum() + sin_fecha.sum())
+
+
+def normalizar_costos(df: pd.DataFrame) -> list:
+    """
+    Costos del CSV (SOLO: Nombre, Tipo, Monto USD, Observación).
+    
+    Returns:
+        list: Registros para la tabla costos
+    """
+    nombres = limpiar_strings(columna(df, 'Nombre'))
+    sin_nombre = nombres.isna()
+    _avisar_filas(sin_nombre, "Costo sin nombre, omitido")
+    
+    tabla = pd.DataFrame({
+        'nombre': nombres,
+        'tipo': limpiar_strings(columna(df, 'Tipo')).fillna('Variable'),
+        'monto_usd': limpiar_montos(columna(df, 'Monto USD')),
+        'observacion': limpiar_strings(columna(df, 'Observación')),
+    })
+    return _registros(tabla[~sin_nombre])
+
+
+def filas_despues_del_header(df: pd.DataFrame):
+    """
+    El CSV de cotizaciones trae filas vacías antes del header real
+    ('Fecha', 'Hora', ...): devuelve las filas que siguen al header.
+    
+    Returns:
+        pd.DataFrame o None si el header no está en este bloque
+    """
+    es_header = (df.iloc[:, 0] == 'Fecha') & (df.iloc[:, 1] == 'Hora')
+    if not es_header.any():
         return None
+    return df.iloc[np.flatnonzero(es_header.to_numpy())[0] + 1:]
 
 
-def parsear_booleano(valor):
+def normalizar_cotizaciones(df: pd.DataFrame) -> list:
     """
-    Convierte strings a booleanos.
+    Cotizaciones del CSV (SOLO: Fecha, Hora, Blue Venta).
     
     Args:
-        valor: Valor a convertir
+        df: Filas de datos (las que siguen al header, ver filas_despues_del_header)
     
     Returns:
-        bool
+        list: Registros para la tabla cotizaciones
     """
-    if pd.isna(valor):
-        return False
+    df_cotizaciones = df.iloc[:, :3].copy()
+    df_cotizaciones.columns = ['fecha', 'hora', 'blue_venta']
     
-    valor_str = str(valor).strip().lower()
-    return valor_str in ['sí', 'si', 'yes', 'true', '1', 'activo']
+    # Algunas celdas tienen fecha + hora juntas: se resuelven en el último paso de parsear_fechas
+    fechas = parsear_fechas(df_cotizaciones['fecha'])
+    
+    tabla = pd.DataFrame({
+        'fecha': fechas,
+        'hora': limpiar_horas(df_cotizaciones['hora']),
+        'blue_venta': limpiar_montos(df_cotizaciones['blue_venta']),
+    })
+    return _registros(tabla[fechas.notna()])
+
+
+# ============================================================================
+# MANIFIESTO DE MIGRACIÓN (HUELLAS Y CHECKPOINTS)
+# ============================================================================
+#
+# Por cada tabla se guarda la huella (sha256) de cada registro ya migrado,
+# indexada por su clave natural, y un checkpoint con la huella del CSV.
+# - Un registro cuya huella no cambió no se vuelve a enviar.
+# - Las huellas se confirman lote a lote: si la migración se corta, la
+#   próxima corrida retoma desde el último lote guardado.
+# - Una tabla terminada sin errores con el mismo CSV se saltea entera.
+# Se guarda en MANIFIESTO_LOCAL y, al terminar cada tabla, en las tablas
+# migraciones / migraciones_checkpoint (ver migration_manifiesto_migraciones.sql).
+
+MANIFIESTO_LOCAL = '.migracion_manifest.json'
+
+
+def huella_registro(registro: dict) -> str:
+    """
+    sha256 del contenido normalizado de un registro (sin id).
+    """
+    contenido = {k: v for k, v in registro.items() if k != 'id'}
+    return hashlib.sha256(json.dumps(contenido, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def huella_archivo(ruta: str) -> str:
+    """
+    sha256 del archivo CSV completo.
+    """
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(1 << 20), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+class ManifiestoMigracion:
+    """
+    Huellas por registro y checkpoint por tabla, compartidos por los hilos de migración.
+    """
+
+    def __init__(self, ruta: str = MANIFIESTO_LOCAL, forzar: bool = False):
+        self.ruta = ruta
+        self.forzar = forzar
+        self._lock = threading.Lock()
+        self._tablas = {}
+        self._remoto_disponible = True
+        self._pendientes_remoto = {}         # tabla → {clave: huella} aún no subidas
+
+        if os.path.exists(ruta):
+            with open(ruta, encoding='utf-8') as archivo:
+                self._tablas = json.load(archivo).get('tablas', {})
+            print(f"🧾 Manifiesto local cargado: {ruta}")
+
+    # ------------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------------
+
+    def _tabla(self, tabla: str) -> dict:
+        with self._lock:
+            if tabla in self._tablas:
+                return self._tablas[tabla]
+
+        # Sin manifiesto local (otra máquina): se toma el de Supabase
+        datos = {'huellas': self._leer_huellas_remotas(tabla), 'checkpoint': self._leer_checkpoint_remoto(tabla)}
+        with self._lock:
+            return self._tablas.setdefault(tabla, datos)
+
+    def _leer_huellas_remotas(self, tabla: str) -> dict:
+        if not self._remoto_disponible:
+            return {}
+        try:
+            filas = leer_tabla('migraciones', 'clave, huella', orden='clave', filtros={'tabla': tabla})
+            return {fila['clave']: fila['huella'] for fila in filas}
+        except Exception as e:
+            self._sin_remoto(e)
+            return {}
+
+    def _leer_checkpoint_remoto(self, tabla: str) -> dict:
+        if not self._remoto_disponible:
+            return {}
+        try:
+            response = supabase.table('migraciones_checkpoint').select('*').eq('tabla', tabla).execute()
+            return (response.data or [{}])[0]
+        except Exception as e:
+            self._sin_remoto(e)
+            return {}
+
+    def _sin_remoto(self, error):
+        if self._remoto_disponible:
+            print(f"⚠️  Manifiesto remoto no disponible (correr migration_manifiesto_migraciones.sql): {error}")
+        self._remoto_disponible = False
+
+    def tabla_al_dia(self, tabla: str, huella_csv: str) -> bool:
+        """
+        True si la tabla ya se migró completa, sin errores, desde el mismo CSV.
+        """
+        if self.forzar:
+            return False
+        checkpoint = self._tabla(tabla)['checkpoint']
+        return bool(checkpoint.get('completada')) and checkpoint.get('huella_archivo') == huella_csv
+
+    def filtrar_sin_cambios(self, tabla: str, registros: list, columnas: tuple) -> tuple:
+        """
+        Separa los registros que cambiaron desde la última migración.
+
+        Returns:
+            tuple: (registros a enviar, {clave: huella} de esos registros, cantidad sin cambios)
+        """
+        huellas_previas = {} if self.forzar else self._tabla(tabla)['huellas']
+
+        pendientes, huellas = [], {}
+        for registro in registros:
+            clave = '|'.join(clave_natural(registro, columnas))
+            huella = huella_registro(registro)
+            if huellas_previas.get(clave) != huella:
+                pendientes.append(registro)
+                huellas[clave] = huella
+
+        return pendientes, huellas, len(registros) - len(pendientes)
+
+    # ------------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------------
+
+    def iniciar_tabla(self, tabla: str, huella_csv: str):
+        """
+        Checkpoint al arrancar una tabla; si la corrida anterior con el mismo CSV
+        quedó a mitad, se informa desde dónde se retoma.
+        """
+        checkpoint = self._tabla(tabla)['checkpoint']
+        confirmados = 0
+        if checkpoint.get('huella_archivo') == huella_csv and not self.forzar:
+            confirmados = int(checkpoint.get('registros_confirmados') or 0)
+            if confirmados:
+                print(f"🧾 {tabla}: reanudando ({confirmados} registro(s) confirmados en la corrida anterior)")
+        self._checkpoint(tabla, huella_archivo=huella_csv, completada=False, registros_confirmados=confirmados)
+
+    def confirmar(self, tabla: str, huellas: dict):
+        """
+        Registra huellas de registros ya guardados en Supabase (checkpoint por lote).
+        """
+        if not huellas:
+            return
+        self._tabla(tabla)
+        with self._lock:
+            datos = self._tablas[tabla]
+            datos['huellas'].update(huellas)
+            datos['checkpoint']['registros_confirmados'] = int(datos['checkpoint'].get('registros_confirmados') or 0) + len(huellas)
+            self._pendientes_remoto.setdefault(tabla, {}).update(huellas)
+            self._guardar_local()
+
+    def finalizar_tabla(self, tabla: str, completada: bool, tamano_lote: int = TAMANO_LOTE):
+        """
+        Cierra el checkpoint de la tabla y lo sube a Supabase junto con las huellas nuevas.
+        """
+        self._checkpoint(tabla, completada=completada)
+        self.sincronizar(tabla, tamano_lote)
+
+    def _checkpoint(self, tabla: str, **datos):
+        self._tabla(tabla)
+        with self._lock:
+            self._tablas[tabla]['checkpoint'].update(datos, tabla=tabla, actualizado_en=datetime.now().isoformat())
+            self._guardar_local()
+
+    def _guardar_local(self):
+        # Escritura atómica: un corte a mitad no deja el JSON truncado
+        temporal = f"{self.ruta}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump({'version': 1, 'tablas': self._tablas}, archivo)
+        os.replace(temporal, self.ruta)
+
+    def sincronizar(self, tabla: str, tamano_lote: int = TAMANO_LOTE):
+        """
+        Sube a Supabase las huellas nuevas y el checkpoint de la tabla (en lotes).
+        """
+        if not self._remoto_disponible:
+            return
+
+        with self._lock:
+            huellas = self._pendientes_remoto.pop(tabla, {})
+            checkpoint = dict(self._tablas.get(tabla, {}).get('checkpoint', {}))
+
+        filas = [{'tabla': tabla, 'clave': clave, 'huella': huella} for clave, huella in huellas.items()]
+        try:
+            for desde in range(0, len(filas), tamano_lote):
+                supabase.table('migraciones').upsert(filas[desde:desde + tamano_lote], on_conflict='tabla,clave').execute()
+            if checkpoint:
+                supabase.table('migraciones_checkpoint').upsert(checkpoint, on_conflict='tabla').execute()
+        except Exception as e:
+            # Las huellas quedan igual en el manifiesto local
+            self._sin_remoto(e)
+
+
+# Manifiesto de la corrida actual (lo crea main(); None = sin huellas ni checkpoints)
+manifiesto = None
+
+# --dry-run: se calcula el diff contra la base sin escribir nada
+simulacion = False
+
+# --stream: filas por bloque al leer los CSV (None = cada CSV entero)
+filas_por_bloque = None
+
+
+# ============================================================================
+# CARGA MASIVA POR LOTES
+# ============================================================================
+#
+# Las claves naturales no son UNIQUE en la base (el bot puede cargar dos
+# pagos del mismo cliente en un día o repetir el nombre de un costo), así
+# que no se usa ON CONFLICT sobre ellas: se leen todas las claves existentes
+# en una sola pasada, cada registro del CSV se resuelve a sus ids y se envían:
+#   - los nuevos con insert() por lotes
+#   - los existentes con upsert(on_conflict='id') por lotes; si la clave está
+#     repetida en la base se actualizan todas sus filas (como el
+#     update().eq(clave) anterior), salvo en TABLAS_SOLO_PRIMERA_FILA, donde
+#     se actualiza solo la primera (como el update().eq('id', ...) de ingresos)
+# La cantidad de requests depende de los lotes, no de las filas.
+
+def clave_natural(registro: dict, columnas: tuple) -> tuple:
+    """
+    Valor de la clave natural de un registro (en el mismo formato que devuelve la BD).
+    """
+    return tuple(str(registro.get(columna)) for columna in columnas)
+
+
+def leer_tabla(tabla: str, columnas: str, orden: str = 'id', filtros: dict = None) -> list:
+    """
+    Lee todas las filas de una tabla paginando con range().
+
+    Args:
+        tabla: Nombre de la tabla
+        columnas: Columnas a traer (ej: 'id, nombre')
+        orden: Columna única para paginar de forma estable
+        filtros: Igualdades columna → valor (opcional)
+
+    Returns:
+        list: Filas de la tabla
+    """
+    filas = []
+    desde = 0
+    while True:
+        query = supabase.table(tabla).select(columnas)
+        for columna_filtro, valor in (filtros or {}).items():
+            query = query.eq(columna_filtro, valor)
+        response = query.order(orden) \
+            .range(desde, desde + FILAS_POR_PAGINA - 1) \
+            .execute()
+        pagina = response.data or []
+        filas.extend(pagina)
+        if len(pagina) < FILAS_POR_PAGINA:
+            return filas
+        desde += FILAS_POR_PAGINA
+
+
+# Índice clave natural → filas existentes, por tabla. Se lee una vez por
+# corrida y se completa con lo que se inserta, así los bloques siguientes
+# (--stream) ven como existentes los registros de bloques anteriores.
+_indices = {}
+
+
+def indice_tabla(tabla: str, columnas_bd: str = None) -> dict:
+    """
+    Mapa clave natural → filas existentes (una sola lectura por corrida).
+
+    Las claves no son UNIQUE en la base: una clave repetida lista todas sus filas.
+
+    Args:
+        tabla: Tabla con entrada en CLAVES_NATURALES
+        columnas_bd: Columnas a traer (default: id y la clave natural)
+    """
+    if tabla not in _indices:
+        columnas = CLAVES_NATURALES[tabla]
+        indice = {}
+        for fila in leer_tabla(tabla, columnas_bd or ', '.join(('id',) + columnas)):
+            indice.setdefault(clave_natural(fila, columnas), []).append(fila)
+        _indices[tabla] = indice
+    return _indices[tabla]
+
+
+def filas_a_actualizar(tabla: str, filas: list) -> list:
+    """
+    Filas existentes de una clave que actualiza el registro del CSV.
+    """
+    return filas[:1] if tabla in TABLAS_SOLO_PRIMERA_FILA else filas
+
+
+def deduplicar(registros: list, columnas: tuple) -> tuple:
+    """
+    Deja un registro por clave natural (gana la última fila del CSV, igual
+    que cuando cada fila actualizaba a la anterior).
+
+    Returns:
+        tuple: (registros únicos en orden de aparición, cantidad descartada)
+    """
+    unicos = {}
+    for registro in registros:
+        unicos[clave_natural(registro, columnas)] = registro
+    return list(unicos.values()), len(registros) - len(unicos)
+
+
+def _enviar_lote(tabla: str, lote: list, operacion: str) -> list:
+    query = supabase.table(tabla)
+    if operacion == 'insert':
+        response = query.insert(lote).execute()
+    else:
+        response = query.upsert(lote, on_conflict='id').execute()
+    return response.data or []
+
+
+def _enviar_por_lotes(tabla: str, registros: list, operacion: str, tamano_lote: int,
+                      al_guardar=None) -> tuple:
+    """
+    Envía los registros en lotes; si un lote falla se reintenta fila por
+    fila para aislar los registros con error.
+
+    Args:
+        al_guardar: Función opcional al_guardar(registros, filas_devueltas)
+                    por cada grupo ya guardado
+
+    Returns:
+        tuple: (registros guardados, registros con error)
+    """
+    guardados = errores = 0
+    total_lotes = (len(registros) + tamano_lote - 1) // tamano_lote
+
+    for numero, desde in enumerate(range(0, len(registros), tamano_lote), start=1):
+        lote = registros[desde:desde + tamano_lote]
+        try:
+            filas = _enviar_lote(tabla, lote, operacion)
+        except Exception as e:
+            print(f"   ⚠️  {operacion} lote {numero}/{total_lotes} falló ({e}), reintentando fila por fila...")
+            for registro in lote:
+                try:
+                    filas = _enviar_lote(tabla, [registro], operacion)
+                except Exception as e_fila:
+                    errores += 1
+                    print(f"   ❌ Error en {clave_natural(registro, CLAVES_NATURALES[tabla])}: {e_fila}")
+                    continue
+                guardados += 1
+                if al_guardar:
+                    al_guardar([registro], filas)
+            continue
+        
+        guardados += len(lote)
+        if al_guardar:
+            al_guardar(lote, filas)
+        print(f"   📦 {operacion} lote {numero}/{total_lotes}: {len(lote)} registros")
+
+    return guardados, errores
+
+
+def upsert_por_lotes(tabla: str, registros: list, tamano_lote: int = TAMANO_LOTE):
+    """
+    Inserta o actualiza registros por su clave natural en lotes y actualiza stats.
+
+    Args:
+        tabla: Tabla destino (con entrada en CLAVES_NATURALES)
+        registros: Registros ya normalizados
+        tamano_lote: Registros por request
+    """
+    columnas = CLAVES_NATURALES[tabla]
+    registros, repetidos = deduplicar(registros, columnas)
+    if repetidos:
+        print(f"   ⚠️  {repetidos} fila(s) repetida(s) en el CSV: se conserva la última")
+
+    if simulacion:
+        simular_upsert(tabla, registros)
+        return
+
+    # Solo se envían los registros cuya huella cambió desde la última migración
+    huellas = {}
+    if manifiesto is not None:
+        registros, huellas, sin_cambios = manifiesto.filtrar_sin_cambios(tabla, registros, columnas)
+        stats[tabla]['sin_cambios'] += sin_cambios
+        if sin_cambios:
+            print(f"   🧾 {sin_cambios} registro(s) sin cambios desde la última migración: se omiten")
+        if not registros:
+            return
+
+    existentes = indice_tabla(tabla)
+
+    nuevos, actualizaciones = [], []
+    pendientes = {}                  # clave → filas que faltan guardar
+    repetidas = 0
+    for registro in registros:
+        clave = clave_natural(registro, columnas)
+        filas_existentes = existentes.get(clave)
+        if not filas_existentes:
+            nuevos.append(registro)
+            pendientes[clave] = 1
+            continue
+        filas_existentes = filas_a_actualizar(tabla, filas_existentes)
+        for existente in filas_existentes:
+            actualizaciones.append({'id': existente['id'], **registro})
+        pendientes[clave] = len(filas_existentes)
+        repetidas += len(filas_existentes) - 1
+
+    def al_guardar(lote, filas):
+        # Una clave repetida en la base se confirma en el manifiesto recién
+        # cuando se guardaron todas sus filas
+        completas = {}
+        for registro in lote:
+            clave = clave_natural(registro, columnas)
+            pendientes[clave] -= 1
+            if pendientes[clave] == 0 and manifiesto is not None:
+                completas['|'.join(clave)] = huellas['|'.join(clave)]
+        if completas:
+            manifiesto.confirmar(tabla, completas)
+        # Lo insertado pasa a existir para los bloques siguientes
+        for fila in filas:
+            existentes.setdefault(clave_natural(fila, columnas), []).append(fila)
+
+    print(f"   🔎 {len(nuevos)} nuevo(s), {len(actualizaciones)} fila(s) existente(s) - lotes de {tamano_lote}")
+    if repetidas:
+        print(f"   ⚠️  Claves repetidas en la base: se actualizan {repetidas} fila(s) adicionales")
+
+    insertados, errores_insert = _enviar_por_lotes(tabla, nuevos, 'insert', tamano_lote, al_guardar)
+    actualizados, errores_update = _enviar_por_lotes(tabla, actualizaciones, 'upsert', tamano_lote, al_guardar)
+
+    stats[tabla]['insertados'] += insertados
+    stats[tabla]['actualizados'] += actualizados
+    stats[tabla]['errores'] += errores_insert + errores_update
+
+
+# ============================================================================
+# SIMULACIÓN (--dry-run)
+# ============================================================================
+#
+# Lee cada tabla destino una sola vez, cruza por clave natural en memoria y
+# clasifica cada registro del CSV en insert / update / sin cambios. No se
+# escribe nada (ni en Supabase ni en el manifiesto).
+
+# Cambios que se detallan por tabla en el reporte
+LIMITE_DIFF = 20
+
+
+def _valores_iguales(actual, nuevo) -> bool:
+    """
+    Compara un valor de la BD con el del CSV (numéricos con tolerancia: la BD
+    devuelve NUMERIC como número o texto).
+    """
+    if actual == nuevo:
+        return True
+    if actual is None or nuevo is None or isinstance(actual, bool) or isinstance(nuevo, bool):
+        return False
+    try:
+        return abs(float(actual) - float(nuevo)) < 1e-9
+    except (TypeError, ValueError):
+        return str(actual) == str(nuevo)
+
+
+def calcular_diff(registros: list, actuales: dict, columnas: tuple, solo_primera: bool = False) -> dict:
+    """
+    Diff entre los registros del CSV y las filas actuales de la tabla.
+
+    Args:
+        registros: Registros normalizados (sin repetidos)
+        actuales: Clave natural → filas actuales (ver indice_tabla)
+        columnas: Clave natural
+        solo_primera: Comparar solo la primera fila de una clave repetida
+                      (ver TABLAS_SOLO_PRIMERA_FILA)
+
+    Returns:
+        dict: {'insertar': [registro], 'actualizar': [(clave, {campo: (actual, nuevo)})], 'sin_cambios': int}
+    """
+    diff = {'insertar': [], 'actualizar': [], 'sin_cambios': 0}
+    for registro in registros:
+        clave = clave_natural(registro, columnas)
+        filas_actuales = actuales.get(clave)
+        if not filas_actuales:
+            diff['insertar'].append(registro)
+            continue
+
+        # Una clave repetida en la base se compara contra las filas que se actualizarían
+        for actual in (filas_actuales[:1] if solo_primera else filas_actuales):
+            cambios = {
+                campo: (actual.get(campo), valor)
+                for campo, valor in registro.items()
+                if not _valores_iguales(actual.get(campo), valor)
+            }
+            if cambios:
+                diff['actualizar'].append(('|'.join(clave), cambios))
+            else:
+                diff['sin_cambios'] += 1
+
+    return diff
+
+
+def imprimir_diff(tabla: str, diff: dict):
+    """
+    Reporte del diff de una tabla (con hasta LIMITE_DIFF ejemplos por tipo).
+    """
+    print(f"\n   🔍 DIFF {tabla.upper()} (sin escribir):")
+    print(f"   ➕ Insertaría: {len(diff['insertar'])}")
+    for registro in diff['insertar'][:LIMITE_DIFF]:
+        print(f"      + {'|'.join(clave_natural(registro, CLAVES_NATURALES[tabla]))}")
+    if len(diff['insertar']) > LIMITE_DIFF:
+        print(f"      ... y {len(diff['insertar']) - LIMITE_DIFF} más")
+
+    print(f"   ✏️  Actualizaría: {len(diff['actualizar'])}")
+    for clave, cambios in diff['actualizar'][:LIMITE_DIFF]:
+        detalle = ', '.join(f"{campo}: {actual!r} → {nuevo!r}" for campo, (actual, nuevo) in cambios.items())
+        print(f"      ~ {clave}: {detalle}")
+    if len(diff['actualizar']) > LIMITE_DIFF:
+        print(f"      ... y {len(diff['actualizar']) - LIMITE_DIFF} más")
+
+    print(f"   ⏸️  Sin cambios: {diff['sin_cambios']}")
+
+
+def simular_upsert(tabla: str, registros: list):
+    """
+    Variante de upsert_por_lotes para --dry-run: una lectura de la tabla y diff local.
+    """
+    columnas = CLAVES_NATURALES[tabla]
+    if tabla not in _indices:
+        print(f"   📥 {tabla}: {len(indice_tabla(tabla, '*'))} clave(s) leídas en una sola pasada")
+    actuales = indice_tabla(tabla, '*')
+
+    diff = calcular_diff(registros, actuales, columnas, tabla in TABLAS_SOLO_PRIMERA_FILA)
+    imprimir_diff(tabla, diff)
+
+    # Los bloques siguientes (--stream) comparan contra lo que ya se insertaría
+    for registro in diff['insertar']:
+        actuales[clave_natural(registro, columnas)] = [registro]
+
+    stats[tabla]['insertados'] += len(diff['insertar'])
+    stats[tabla]['actualizados'] += len(diff['actualizar'])
+    stats[tabla]['sin_cambios'] += diff['sin_cambios']
 
 
 # ============================================================================
 # FUNCIONES DE MIGRACIÓN POR TABLA
 # ============================================================================
 
-def migrate_clientes():
+def migrate_clientes(tamano_lote: int = TAMANO_LOTE):
     """Migra la tabla de clientes (SOLO: Cliente, Honorario USD, Estado, Activo?)."""
     print("\n" + "="*70)
     print("📊 MIGRANDO CLIENTES")
@@ -180,47 +941,11 @@ def migrate_clientes():
             print(f"❌ ERROR: Archivo no encontrado: {CSV_FILES['clientes']}")
             return False
         
-        # Leer CSV
-        df = pd.read_csv(CSV_FILES['clientes'])
-        df.columns = df.columns.str.strip()
+        # Leer CSV (entero o por bloques), normalizar columnas y upsert por nombre
+        for df in leer_csv('clientes'):
+            upsert_por_lotes('clientes', normalizar_clientes(df), tamano_lote)
         
-        print(f"📄 Archivo cargado: {len(df)} registros")
-        
-        # Procesar cada cliente
-        for idx, row in df.iterrows():
-            try:
-                nombre = limpiar_string(row.get('Cliente'))
-                
-                if not nombre:
-                    print(f"   ⚠️  Fila {idx+2}: Cliente sin nombre, omitido")
-                    continue
-                
-                # Preparar datos (SOLO campos especificados)
-                cliente = {
-                    'nombre': nombre,
-                    'honorario_usd': limpiar_monto(row.get('Honorario USD')) or 0,
-                    'estado': limpiar_string(row.get('Estado')) or 'Desconocido',
-                    'activo': parsear_booleano(row.get('Activo?')),
-                }
-                
-                # Verificar si existe (upsert por nombre)
-                existing = supabase.table('clientes').select('id').eq('nombre', nombre).execute()
-                
-                if existing.data:
-                    # Actualizar
-                    supabase.table('clientes').update(cliente).eq('nombre', nombre).execute()
-                    stats['clientes']['actualizados'] += 1
-                    print(f"   ✅ Actualizado: {nombre}")
-                else:
-                    # Insertar
-                    supabase.table('clientes').insert(cliente).execute()
-                    stats['clientes']['insertados'] += 1
-                    print(f"   ➕ Insertado: {nombre}")
-                    
-            except Exception as e:
-                stats['clientes']['errores'] += 1
-                print(f"   ❌ Error en fila {idx+2}: {e}")
-                continue
+        print(f"📄 Archivo procesado: {filas_leidas['clientes']} registros")
         
         print(f"\n✅ Clientes procesados:")
         print(f"   • Insertados: {stats['clientes']['insertados']}")
@@ -235,7 +960,7 @@ def migrate_clientes():
         return False
 
 
-def migrate_ingresos():
+def migrate_ingresos(tamano_lote: int = TAMANO_LOTE):
     """Migra la tabla de ingresos (requiere clientes previamente cargados)."""
     print("\n" + "="*70)
     print("💸 MIGRANDO INGRESOS")
@@ -248,80 +973,18 @@ def migrate_ingresos():
             return False
         
         # Cargar mapeo de clientes (nombre -> id)
-        clientes_response = supabase.table('clientes').select('id, nombre').execute()
-        clientes_map = {
-            limpiar_string(c['nombre']): c['id'] 
-            for c in clientes_response.data
-        }
+        clientes = pd.DataFrame(leer_tabla('clientes', 'id, nombre'), columns=['id', 'nombre'])
+        clientes_map = dict(zip(limpiar_strings(clientes['nombre']), clientes['id']))
         
         print(f"📋 Clientes disponibles para mapeo: {len(clientes_map)}")
         
-        # Leer CSV
-        df = pd.read_csv(CSV_FILES['ingresos'])
-        df.columns = df.columns.str.strip()
-        
-        print(f"📄 Archivo cargado: {len(df)} registros")
+        # Leer CSV (entero o por bloques), normalizar columnas y upsert por cliente_id + fecha_cobro
+        for df in leer_csv('ingresos'):
+            registros, errores = normalizar_ingresos(df, clientes_map)
+            stats['ingresos']['errores'] += errores
+            upsert_por_lotes('ingresos', registros, tamano_lote)
         
-        # Procesar cada ingreso
-        for idx, row in df.iterrows():
-            try:
-                nombre_cliente = limpiar_string(row.get('Cliente'))
-                
-                if not nombre_cliente:
-                    print(f"   ⚠️  Fila {idx+2}: Ingreso sin cliente, omitido")
-                    continue
-                
-                # Mapear cliente
-                cliente_id = clientes_map.get(nombre_cliente)
-                
-                if not cliente_id:
-                    print(f"   ⚠️  Fila {idx+2}: Cliente '{nombre_cliente}' no encontrado en BD")
-                    stats['ingresos']['errores'] += 1
-                    continue
-                
-                # Parsear fecha (DD/MM/YYYY -> YYYY-MM-DD)
-                fecha_cobro = parsear_fecha(row.get('Fecha de cobro'))
-                
-                # Preparar datos (MAPEO CORRECTO a nombres cortos de BD)
-                ingreso = {
-                    'fecha_cobro': fecha_cobro,
-                    'cliente_id': cliente_id,
-                    'honorario_usd': limpiar_monto(row.get('Honorario USD')) or 0,
-                    'medio_pago': limpiar_string(row.get('Medio de pago')) or 'No especificado',
-                    'cotizacion_aplicada': limpiar_monto(row.get('Cotización Aplicada')) or 0,
-                    'monto_ars': limpiar_monto(row.get('Monto cobrado ARS')) or 0,
-                    'monto_usdt': limpiar_monto(row.get('Monto cobrado USDT')) or 0,
-                    'monto_usd_total': limpiar_monto(row.get('Montro cobrado USD')) or 0,  # Typo del CSV
-                    'estado': limpiar_string(row.get('Estado')) or 'Pendiente',
-                }
-                
-                # Verificar duplicado (por cliente_id + fecha_cobro) - NO DUPLICAR
-                if fecha_cobro:
-                    existing = supabase.table('ingresos').select('id') \
-                        .eq('cliente_id', cliente_id) \
-                        .eq('fecha_cobro', fecha_cobro) \
-                        .execute()
-                else:
-                    # Si no hay fecha, no insertar para evitar duplicados sin identificador único
-                    print(f"   ⚠️  Ingreso sin fecha para {nombre_cliente}, omitido para evitar duplicados")
-                    stats['ingresos']['errores'] += 1
-                    continue
-                
-                if existing.data:
-                    # Actualizar
-                    supabase.table('ingresos').update(ingreso).eq('id', existing.data[0]['id']).execute()
-                    stats['ingresos']['actualizados'] += 1
-                    print(f"   ✅ Actualizado: {nombre_cliente} - {fecha_cobro}")
-                else:
-                    # Insertar
-                    supabase.table('ingresos').insert(ingreso).execute()
-                    stats['ingresos']['insertados'] += 1
-                    print(f"   ➕ Insertado: {nombre_cliente} - {fecha_cobro}")
-                    
-            except Exception as e:
-                stats['ingresos']['errores'] += 1
-                print(f"   ❌ Error en fila {idx+2}: {e}")
-                continue
+        print(f"📄 Archivo procesado: {filas_leidas['ingresos']} registros")
         
         print(f"\n✅ Ingresos procesados:")
         print(f"   • Insertados: {stats['ingresos']['insertados']}")
@@ -336,7 +999,7 @@ def migrate_ingresos():
         return False
 
 
-def migrate_costos():
+def migrate_costos(tamano_lote: int = TAMANO_LOTE):
     """Migra la tabla de costos (SOLO: Nombre, Tipo, Monto USD, Observación)."""
     print("\n" + "="*70)
     print("💰 MIGRANDO COSTOS")
@@ -348,47 +1011,11 @@ def migrate_costos():
             print(f"❌ ERROR: Archivo no encontrado: {CSV_FILES['costos']}")
             return False
         
-        # Leer CSV
-        df = pd.read_csv(CSV_FILES['costos'])
-        df.columns = df.columns.str.strip()
+        # Leer CSV (entero o por bloques), normalizar columnas y upsert por nombre
+        for df in leer_csv('costos'):
+            upsert_por_lotes('costos', normalizar_costos(df), tamano_lote)
         
-        print(f"📄 Archivo cargado: {len(df)} registros")
-        
-        # Procesar cada costo
-        for idx, row in df.iterrows():
-            try:
-                nombre = limpiar_string(row.get('Nombre'))
-                
-                if not nombre:
-                    print(f"   ⚠️  Fila {idx+2}: Costo sin nombre, omitido")
-                    continue
-                
-                # Preparar datos (SOLO campos especificados)
-                costo = {
-                    'nombre': nombre,
-                    'tipo': limpiar_string(row.get('Tipo')) or 'Variable',
-                    'monto_usd': limpiar_monto(row.get('Monto USD')) or 0,
-                    'observacion': limpiar_string(row.get('Observación')),
-                }
-                
-                # Verificar si existe (upsert por nombre)
-                existing = supabase.table('costos').select('id').eq('nombre', nombre).execute()
-                
-                if existing.data:
-                    # Actualizar
-                    supabase.table('costos').update(costo).eq('nombre', nombre).execute()
-                    stats['costos']['actualizados'] += 1
-                    print(f"   ✅ Actualizado: {nombre}")
-                else:
-                    # Insertar
-                    supabase.table('costos').insert(costo).execute()
-                    stats['costos']['insertados'] += 1
-                    print(f"   ➕ Insertado: {nombre}")
-                    
-            except Exception as e:
-                stats['costos']['errores'] += 1
-                print(f"   ❌ Error en fila {idx+2}: {e}")
-                continue
+        print(f"📄 Archivo procesado: {filas_leidas['costos']} registros")
         
         print(f"\n✅ Costos procesados:")
         print(f"   • Insertados: {stats['costos']['insertados']}")
@@ -403,7 +1030,7 @@ def migrate_costos():
         return False
 
 
-def migrate_cotizaciones():
+def migrate_cotizaciones(tamano_lote: int = TAMANO_LOTE):
     """Migra la tabla de cotizaciones (SOLO: Fecha, Hora, Blue Venta)."""
     print("\n" + "="*70)
     print("💵 MIGRANDO COTIZACIONES")
@@ -415,87 +1042,23 @@ def migrate_cotizaciones():
             print(f"❌ ERROR: Archivo no encontrado: {CSV_FILES['cotizaciones']}")
             return False
         
-        # Leer CSV
-        df = pd.read_csv(CSV_FILES['cotizaciones'])
-        
-        # Buscar header real (después de filas vacías)
-        start_idx = None
-        for idx, row in df.iterrows():
-            if row.iloc[0] == 'Fecha' and row.iloc[1] == 'Hora':
-                start_idx = idx + 1
-                break
+        # Leer CSV (entero o por bloques); los datos empiezan después del header real
+        header_encontrado = False
+        for df in leer_csv('cotizaciones'):
+            if not header_encontrado:
+                df = filas_despues_del_header(df)
+                if df is None:
+                    continue
+                header_encontrado = True
+            
+            # Upsert por fecha, en lotes - NO DUPLICAR
+            upsert_por_lotes('cotizaciones', normalizar_cotizaciones(df), tamano_lote)
         
-        if start_idx is None:
+        if not header_encontrado:
             print("❌ ERROR: No se encontró el header de cotizaciones")
             return False
         
-        # Crear dataframe limpio
-        df_cotizaciones = df.iloc[start_idx:].copy()
-        df_cotizaciones.columns = ['fecha', 'hora', 'blue_venta']
-        
-        print(f"📄 Archivo cargado: {len(df_cotizaciones)} registros")
-        
-        # LIMPIEZA AVANZADA DE FECHAS Y HORAS con pandas
-        # Algunas celdas tienen fecha + hora juntas, necesitamos separarlas
-        df_cotizaciones['fecha'] = pd.to_datetime(df_cotizaciones['fecha'], dayfirst=True, errors='coerce').dt.strftime('%Y-%m-%d')
-        
-        # Limpiar hora (extraer solo HH:MM:SS)
-        def limpiar_hora(valor):
-            if pd.isna(valor) or valor == '' or valor == 'nan':
-                return '00:00:00'
-            try:
-                # Si es datetime, extraer hora
-                if isinstance(valor, str) and '/' in valor:
-                    # Es una fecha con hora, extraer la parte de hora
-                    hora_obj = pd.to_datetime(valor, errors='coerce')
-                    if pd.notna(hora_obj):
-                        return hora_obj.strftime('%H:%M:%S')
-                # Si ya es hora en formato correcto
-                hora_str = str(valor).strip()
-                # Intentar parsear como hora
-                if ':' in hora_str:
-                    partes = hora_str.split(':')
-                    if len(partes) >= 2:
-                        return f"{partes[0].zfill(2)}:{partes[1].zfill(2)}:{partes[2].zfill(2) if len(partes) > 2 else '00'}"
-                return '00:00:00'
-            except:
-                return '00:00:00'
-        
-        df_cotizaciones['hora'] = df_cotizaciones['hora'].apply(limpiar_hora)
-        
-        # Procesar cada cotización
-        for idx, row in df_cotizaciones.iterrows():
-            try:
-                fecha_iso = row['fecha']
-                
-                if pd.isna(fecha_iso) or fecha_iso == 'NaT' or fecha_iso == 'nan':
-                    continue
-                
-                # Preparar datos (SOLO campos especificados)
-                cotizacion = {
-                    'fecha': fecha_iso,
-                    'hora': row['hora'],
-                    'blue_venta': limpiar_monto(row['blue_venta']) or 0,
-                }
-                
-                # Verificar si existe (upsert por fecha) - NO DUPLICAR
-                existing = supabase.table('cotizaciones').select('id').eq('fecha', fecha_iso).execute()
-                
-                if existing.data:
-                    # Actualizar solo si cambió algo
-                    supabase.table('cotizaciones').update(cotizacion).eq('fecha', fecha_iso).execute()
-                    stats['cotizaciones']['actualizados'] += 1
-                    print(f"   ✅ Actualizado: {fecha_iso} - ${cotizacion['blue_venta']}")
-                else:
-                    # Insertar nuevo registro
-                    supabase.table('cotizaciones').insert(cotizacion).execute()
-                    stats['cotizaciones']['insertados'] += 1
-                    print(f"   ➕ Insertado: {fecha_iso} - ${cotizacion['blue_venta']}")
-                    
-            except Exception as e:
-                stats['cotizaciones']['errores'] += 1
-                print(f"   ❌ Error en fecha {fecha_iso}: {e}")
-                continue
+        print(f"📄 Archivo procesado: {filas_leidas['cotizaciones']} registros")
         
         print(f"\n✅ Cotizaciones procesadas:")
         print(f"   • Insertadas: {stats['cotizaciones']['insertados']}")
@@ -510,12 +1073,143 @@ def migrate_cotizaciones():
         return False
 
 
+# ============================================================================
+# PLANIFICADOR DE MIGRACIONES
+# ============================================================================
+
+MIGRACIONES = {
+    'clientes': migrate_clientes,
+    'ingresos': migrate_ingresos,
+    'costos': migrate_costos,
+    'cotizaciones': migrate_cotizaciones,
+}
+
+
+def _migrar_tabla(tabla: str, tamano_lote: int) -> tuple:
+    inicio = time.perf_counter()
+    try:
+        if manifiesto is not None:
+            huella_csv = huella_archivo(CSV_FILES[tabla])
+            if manifiesto.tabla_al_dia(tabla, huella_csv):
+                print(f"\n🧾 {tabla}: CSV sin cambios desde la última migración completa, se omite")
+                return True, time.perf_counter() - inicio
+            manifiesto.iniciar_tabla(tabla, huella_csv)
+        
+        ok = bool(MIGRACIONES[tabla](tamano_lote))
+        
+        if manifiesto is not None:
+            manifiesto.finalizar_tabla(tabla, ok and stats[tabla]['errores'] == 0, tamano_lote)
+    except Exception as e:
+        print(f"❌ ERROR CRÍTICO en migración de {tabla}: {e}")
+        traceback.print_exc()
+        ok = False
+    return ok, time.perf_counter() - inicio
+
+
+def ejecutar_migraciones(tamano_lote: int = TAMANO_LOTE, hilos: int = HILOS_MIGRACION,
+                         dependencias: dict = None) -> dict:
+    """
+    Corre las migraciones en un pool de hilos respetando las dependencias:
+    cada tabla arranca apenas terminan bien las que necesita, y las que no
+    dependen de nada corren en paralelo.
+    
+    Args:
+        tamano_lote: Registros por request de insert/upsert
+        hilos: Migraciones simultáneas
+        dependencias: tabla → tablas requeridas (default: DEPENDENCIAS_MIGRACION)
+    
+    Returns:
+        dict: tabla → True (ok), False (falló) o None (omitida por una dependencia fallida)
+    
+    Raises:
+        ValueError: Si hay dependencias circulares o a tablas inexistentes
+    """
+    dependencias = DEPENDENCIAS_MIGRACION if dependencias is None else dependencias
+    pendientes = dict(dependencias)
+    resultados = {}
+    
+    with ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='migracion') as pool:
+        en_curso = {}
+        
+        while pendientes or en_curso:
+            # Lanzar todo lo que ya tiene sus dependencias resueltas
+            for tabla, requeridas in list(pendientes.items()):
+                if any(requerida in resultados and not resultados[requerida] for requerida in requeridas):
+                    print(f"\n⏭️  {tabla}: omitida (falló {', '.join(requeridas)})")
+                    resultados[tabla] = None
+                    del pendientes[tabla]
+                elif all(resultados.get(requerida) for requerida in requeridas):
+                    print(f"\n▶️  {tabla}: iniciando")
+                    en_curso[pool.submit(_migrar_tabla, tabla, tamano_lote)] = tabla
+                    del pendientes[tabla]
+            
+            if not en_curso:
+                if pendientes:
+                    raise ValueError(f"Dependencias circulares o inexistentes: {pendientes}")
+                break
+            
+            terminadas, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in terminadas:
+                tabla = en_curso.pop(futuro)
+                ok, segundos = futuro.result()
+                resultados[tabla] = ok
+                if ok:
+                    print(f"\n⏱️  {tabla}: terminada en {segundos:.2f}s "
+                          f"({filas_leidas[tabla] / max(segundos, 1e-9):,.0f} filas/s)")
+                else:
+                    print(f"\n⚠️  Migración de {tabla} tuvo problemas ({segundos:.2f}s)")
+    
+    return resultados
+
+
 # ============================================================================
 # FUNCIÓN PRINCIPAL
 # ============================================================================
 
-def main():
+def parsear_argumentos(argv=None):
+    """
+    Opciones de línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Migración de CSV locales a Supabase")
+    parser.add_argument(
+        '--chunk-size', type=int, default=TAMANO_LOTE,
+        help=f"Registros por request de insert/upsert (default: {TAMANO_LOTE})"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=HILOS_MIGRACION,
+        help=f"Tablas migradas en paralelo (default: {HILOS_MIGRACION}, 1 = secuencial)"
+    )
+    parser.add_argument(
+        '--stream', nargs='?', type=int, const=FILAS_POR_BLOQUE, default=None, metavar='FILAS',
+        help=f"Lee los CSV por bloques de FILAS filas (default: {FILAS_POR_BLOQUE}) con memoria acotada"
+    )
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help="Calcula y muestra el diff contra Supabase sin escribir nada"
+    )
+    parser.add_argument(
+        '--forzar', action='store_true',
+        help="Reenvía todos los registros aunque su huella no haya cambiado"
+    )
+    parser.add_argument(
+        '--manifiesto', default=MANIFIESTO_LOCAL,
+        help=f"Archivo local de huellas y checkpoints (default: {MANIFIESTO_LOCAL})"
+    )
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("--chunk-size debe ser mayor a 0")
+    if args.workers < 1:
+        parser.error("--workers debe ser mayor a 0")
+    if args.stream is not None and args.stream < 1:
+        parser.error("--stream debe ser mayor a 0")
+    return args
+
+
+def main(argv=None):
     """Función principal que orquesta toda la migración."""
+    global manifiesto, simulacion, filas_por_bloque
+    args = parsear_argumentos(argv)
+    filas_por_bloque = args.stream
     
     print("\n" + "█"*70)
     print("█" + " "*68 + "█")
@@ -526,6 +1220,9 @@ def main():
     print(f"\n📅 Fecha de ejecución: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"🔗 Supabase URL: {SUPABASE_URL}")
     print(f"🔑 API Key: {SUPABASE_KEY[:20]}...{SUPABASE_KEY[-10:]}")
+    print(f"📦 Tamaño de lote: {args.chunk_size} | 🧵 Tablas en paralelo: {args.workers}")
+    if filas_por_bloque:
+        print(f"🌊 Lectura por bloques de {filas_por_bloque} filas (--stream)")
     
     # Verificar archivos
     print("\n📁 Verificando archivos CSV...")
@@ -541,26 +1238,31 @@ def main():
         print(f"\n❌ ERROR: Faltan {len(missing_files)} archivo(s). Abortando migración.")
         sys.exit(1)
     
-    # Ejecutar migraciones en orden
+    if args.dry_run:
+        # Sin manifiesto: el diff se calcula contra lo que hay realmente en la base
+        simulacion = True
+        print("\n🔍 MODO SIMULACIÓN (--dry-run): no se escribe nada en Supabase")
+        print("   ⚠️  Los ingresos de clientes que aún no existen aparecen como errores")
+    else:
+        # Huellas y checkpoints de corridas anteriores
+        manifiesto = ManifiestoMigracion(args.manifiesto, forzar=args.forzar)
+        if args.forzar:
+            print("⚠️  --forzar: se reenvían todos los registros")
+    
+    # Ejecutar migraciones según dependencias
     inicio = datetime.now()
     
     try:
-        # 1. Clientes (independiente)
-        if not migrate_clientes():
+        # Clientes, costos y cotizaciones en paralelo; ingresos cuando termina clientes
+        resultados = ejecutar_migraciones(args.chunk_size, args.workers)
+        
+        if not resultados['clientes']:
             print("\n❌ Migración de clientes falló. Abortando.")
             sys.exit(1)
         
-        # 2. Ingresos (depende de clientes)
-        if not migrate_ingresos():
-            print("\n⚠️  Migración de ingresos tuvo problemas, continuando...")
-        
-        # 3. Costos (independiente)
-        if not migrate_costos():
-            print("\n⚠️  Migración de costos tuvo problemas, continuando...")
-        
-        # 4. Cotizaciones (independiente)
-        if not migrate_cotizaciones():
-            print("\n⚠️  Migración de cotizaciones tuvo problemas, continuando...")
+        # Rollup mensual (la carga masiva no pasa por los hooks del bot)
+        if not simulacion and 'error' in reconstruir_resumen_mensual(supabase):
+            print("\n⚠️  No se pudo reconstruir resumen_mensual (correr migration_resumen_mensual.sql)")
         
         # Resumen final
         fin = datetime.now()
@@ -568,7 +1270,10 @@ def main():
         
         print("\n" + "█"*70)
         print("█" + " "*68 + "█")
-        print("█" + "  ✅ MIGRACIÓN COMPLETADA EXITOSAMENTE  ✅".center(68) + "█")
+        if simulacion:
+            print("█" + "  🔍 SIMULACIÓN COMPLETADA - NO SE ESCRIBIÓ NADA  🔍".center(68) + "█")
+        else:
+            print("█" + "  ✅ MIGRACIÓN COMPLETADA EXITOSAMENTE  ✅".center(68) + "█")
         print("█" + " "*68 + "█")
         print("█"*70)
         
@@ -578,17 +1283,20 @@ def main():
         
         total_insertados = sum(s['insertados'] for s in stats.values())
         total_actualizados = sum(s['actualizados'] for s in stats.values())
+        total_sin_cambios = sum(s['sin_cambios'] for s in stats.values())
         total_errores = sum(s['errores'] for s in stats.values())
         
         for tabla, stat in stats.items():
             print(f"\n{tabla.upper()}:")
             print(f"   • Insertados: {stat['insertados']}")
             print(f"   • Actualizados: {stat['actualizados']}")
+            print(f"   • Sin cambios: {stat['sin_cambios']}")
             print(f"   • Errores: {stat['errores']}")
         
         print(f"\nTOTAL GENERAL:")
         print(f"   • Insertados: {total_insertados}")
         print(f"   • Actualizados: {total_actualizados}")
+        print(f"   • Sin cambios: {total_sin_cambios}")
         print(f"   • Errores: {total_errores}")
         
         print("\n" + "="*70)
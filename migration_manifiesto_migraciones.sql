@@ -0,0 +1,53 @@
+-- ============================================================================
+-- MIGRACIÓN: Manifiesto de master_migration.py (huellas y checkpoints)
+-- ============================================================================
+-- Fecha: 19/10/2026
+-- Autor: Senior Backend Developer
+--
+-- PROPÓSITO:
+-- master_migration.py guarda la huella (sha256) de cada registro migrado y
+-- un checkpoint por tabla. En la próxima corrida solo se envían los
+-- registros que cambiaron en la planilla, y una migración cortada a mitad
+-- retoma desde el último lote confirmado.
+--
+-- El manifiesto vive también en el archivo local .migracion_manifest.json;
+-- estas tablas permiten correr la migración desde otra máquina sin volver
+-- a enviar todo. Si no existen, la migración sigue usando solo el archivo
+-- local. Para reenviar todo: python master_migration.py --forzar
+-- ============================================================================
+
+-- Huella por registro: (tabla, clave natural) → sha256 del registro normalizado
+CREATE TABLE IF NOT EXISTS migraciones (
+    tabla VARCHAR(50) NOT NULL,
+    clave TEXT NOT NULL,                                     -- Ej: 'ACME' o '<cliente_id>|2026-01-21'
+    huella CHAR(64) NOT NULL,
+    migrado_en TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (tabla, clave)
+);
+
+-- Checkpoint por tabla
+CREATE TABLE IF NOT EXISTS migraciones_checkpoint (
+    tabla VARCHAR(50) PRIMARY KEY,
+    huella_archivo CHAR(64),                                 -- sha256 del CSV migrado
+    registros_confirmados INTEGER NOT NULL DEFAULT 0,
+    completada BOOLEAN NOT NULL DEFAULT FALSE,               -- TRUE = terminó sin errores
+    actualizado_en TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+COMMENT ON TABLE migraciones IS 'Huellas de los registros cargados por master_migration.py';
+COMMENT ON TABLE migraciones_checkpoint IS 'Estado por tabla de la última corrida de master_migration.py';
+
+-- ============================================================================
+-- QUERIES DE VERIFICACIÓN
+-- ============================================================================
+
+-- Estado de la última migración
+-- SELECT * FROM migraciones_checkpoint ORDER BY tabla;
+
+-- Registros migrados por tabla
+-- SELECT tabla, COUNT(*) FROM migraciones GROUP BY tabla;
+
+-- Forzar que la próxima corrida reenvíe una tabla completa (borrar también
+-- .migracion_manifest.json, o directamente usar --forzar)
+-- DELETE FROM migraciones WHERE tabla = 'costos';
+-- DELETE FROM migraciones_checkpoint WHERE tabla = 'costos';
@@ -0,0 +1,78 @@
+-- ============================================================================
+-- MIGRACIÓN: Agregación de ingresos en Postgres (RPC para resúmenes)
+-- ============================================================================
+-- Fecha: 19/10/2026
+-- Autor: Senior Backend Developer
+-- Descripción: El resumen financiero descargaba todas las filas de ingresos
+-- del rango y las sumaba en Python. Esta función agrupa por mes del lado del
+-- servidor y devuelve una fila por periodo (sumas, cantidad y cotización
+-- promedio aplicada), sin importar el volumen de datos.
+--
+-- Requiere: migration_periodo.sql y migration_atribucion_temporal.sql
+-- (índices idx_ingresos_fecha_cobro e idx_ingresos_mes_aplicado)
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION obtener_resumen_ingresos(
+    fecha_desde DATE,
+    fecha_hasta DATE,
+    periodos_param VARCHAR(7)[] DEFAULT NULL,
+    tipo_vista VARCHAR(20) DEFAULT 'liquidez'
+)
+RETURNS TABLE (
+    periodo VARCHAR(7),
+    total_usd NUMERIC,
+    total_ars NUMERIC,
+    cantidad_registros BIGINT,
+    cotizacion_promedio NUMERIC
+) AS $$
+BEGIN
+    IF tipo_vista = 'performance' THEN
+        -- Performance: agrupado por mes al que corresponde el servicio
+        RETURN QUERY
+        SELECT 
+            i.mes_aplicado::VARCHAR(7) AS periodo,
+            COALESCE(SUM(i.monto_usd_total), 0)::NUMERIC AS total_usd,
+            COALESCE(SUM(i.monto_ars), 0)::NUMERIC AS total_ars,
+            COUNT(*)::BIGINT AS cantidad_registros,
+            COALESCE(
+                AVG(i.monto_ars / i.monto_usd_total) FILTER (WHERE i.monto_ars > 0 AND i.monto_usd_total > 0),
+                0
+            )::NUMERIC AS cotizacion_promedio
+        FROM ingresos i
+        WHERE i.mes_aplicado = ANY(periodos_param)
+        GROUP BY i.mes_aplicado;
+    ELSE
+        -- Liquidez: agrupado por mes de la fecha real de cobro
+        RETURN QUERY
+        SELECT 
+            TO_CHAR(i.fecha_cobro, 'MM-YYYY')::VARCHAR(7) AS periodo,
+            COALESCE(SUM(i.monto_usd_total), 0)::NUMERIC AS total_usd,
+            COALESCE(SUM(i.monto_ars), 0)::NUMERIC AS total_ars,
+            COUNT(*)::BIGINT AS cantidad_registros,
+            COALESCE(
+                AVG(i.monto_ars / i.monto_usd_total) FILTER (WHERE i.monto_ars > 0 AND i.monto_usd_total > 0),
+                0
+            )::NUMERIC AS cotizacion_promedio
+        FROM ingresos i
+        WHERE i.fecha_cobro >= fecha_desde
+            AND i.fecha_cobro <= fecha_hasta
+        GROUP BY TO_CHAR(i.fecha_cobro, 'MM-YYYY');
+    END IF;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- ============================================================================
+-- EJEMPLOS DE USO
+-- ============================================================================
+
+-- Liquidez de diciembre a febrero (una fila por mes)
+-- SELECT * FROM obtener_resumen_ingresos('2025-12-01', '2026-02-28');
+
+-- Performance de enero y febrero (por mes_aplicado)
+-- SELECT * FROM obtener_resumen_ingresos(NULL, NULL, ARRAY['01-2026', '02-2026'], 'performance');
+
+-- Desde Python (supabase-py):
+-- supabase.rpc('obtener_resumen_ingresos', {
+--     'fecha_desde': '2025-12-01',
+--     'fecha_hasta': '2026-02-28'
+-- }).execute()
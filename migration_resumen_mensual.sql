@@ -0,0 +1,176 @@
+-- ============================================================================
+-- MIGRACIÓN: Tabla resumen_mensual (rollup incremental de ingresos y costos)
+-- ============================================================================
+-- Fecha: 19/10/2026
+-- Autor: Senior Backend Developer
+--
+-- PROPÓSITO:
+-- Los resúmenes mensuales recalculaban los totales recorriendo las filas de
+-- ingresos y costos. Esta tabla guarda una fila por (periodo, tipo) que el
+-- bot ajusta en cada alta, baja o edición (ver backend/resumen_mensual.py),
+-- así un resumen lee una fila por mes en lugar de escanear transacciones.
+--
+-- TIPOS:
+-- - 'ingresos'          → ingresos por mes de fecha_cobro (vista liquidez)
+-- - 'costos_fijos'      → costos tipo Fijo por mes de created_at
+-- - 'costos_variables'  → el resto de los costos por mes de created_at
+--
+-- Los costos en ARS y los dinámicos (Agustín) dependen del dólar y de los
+-- clientes activos del momento: se guardan aparte (total_ars y
+-- cantidad_dinamicos) y se convierten al leer.
+--
+-- IMPORTANTE: Las cargas masivas que no pasan por el bot (master_migration.py,
+-- scripts manuales) deben terminar con:
+--   SELECT reconstruir_resumen_mensual();
+-- o bien: python backend/resumen_mensual.py --rebuild
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS resumen_mensual (
+    periodo VARCHAR(7) NOT NULL,                             -- Formato: MM-YYYY
+    tipo VARCHAR(20) NOT NULL,                               -- ingresos | costos_fijos | costos_variables
+
+    total_usd DECIMAL(14, 2) NOT NULL DEFAULT 0,             -- Suma en USD (costos: solo los fijados en USD)
+    total_ars DECIMAL(16, 2) NOT NULL DEFAULT 0,             -- Suma en ARS (costos: a convertir al leer)
+    cantidad INTEGER NOT NULL DEFAULT 0,                     -- Cantidad de registros
+    cantidad_dinamicos INTEGER NOT NULL DEFAULT 0,           -- Costos con cálculo dinámico
+
+    -- Para la cotización promedio de ingresos (AVG = suma / cantidad)
+    suma_cotizaciones DECIMAL(16, 4) NOT NULL DEFAULT 0,
+    cantidad_cotizaciones INTEGER NOT NULL DEFAULT 0,
+
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+    PRIMARY KEY (periodo, tipo),
+    CONSTRAINT chk_resumen_mensual_periodo CHECK (periodo ~ '^\d{2}-\d{4}$')
+);
+
+COMMENT ON TABLE resumen_mensual IS 'Totales mensuales de ingresos y costos mantenidos incrementalmente por el bot';
+
+
+-- ============================================================================
+-- FUNCIÓN: Ajustar una fila del rollup (delta atómico)
+-- ============================================================================
+-- Suma los deltas sobre la fila (periodo, tipo), creándola si no existe.
+-- El UPDATE es atómico: dos altas simultáneas no se pisan.
+--
+-- Uso (baja de un ingreso de 500 USD / 765.000 ARS):
+--   SELECT ajustar_resumen_mensual('01-2026', 'ingresos', -500, -765000, -1, 0, -1530, -1);
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION ajustar_resumen_mensual(
+    periodo_param VARCHAR(7),
+    tipo_param VARCHAR(20),
+    delta_usd NUMERIC DEFAULT 0,
+    delta_ars NUMERIC DEFAULT 0,
+    delta_cantidad INTEGER DEFAULT 0,
+    delta_dinamicos INTEGER DEFAULT 0,
+    delta_suma_cotizaciones NUMERIC DEFAULT 0,
+    delta_cantidad_cotizaciones INTEGER DEFAULT 0
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO resumen_mensual AS r (
+        periodo, tipo, total_usd, total_ars, cantidad, cantidad_dinamicos,
+        suma_cotizaciones, cantidad_cotizaciones, updated_at
+    )
+    VALUES (
+        periodo_param, tipo_param, delta_usd, delta_ars, delta_cantidad, delta_dinamicos,
+        delta_suma_cotizaciones, delta_cantidad_cotizaciones, NOW()
+    )
+    ON CONFLICT (periodo, tipo) DO UPDATE SET
+        total_usd = r.total_usd + EXCLUDED.total_usd,
+        total_ars = r.total_ars + EXCLUDED.total_ars,
+        cantidad = r.cantidad + EXCLUDED.cantidad,
+        cantidad_dinamicos = r.cantidad_dinamicos + EXCLUDED.cantidad_dinamicos,
+        suma_cotizaciones = r.suma_cotizaciones + EXCLUDED.suma_cotizaciones,
+        cantidad_cotizaciones = r.cantidad_cotizaciones + EXCLUDED.cantidad_cotizaciones,
+        updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- ============================================================================
+-- FUNCIÓN: Reconstruir el rollup completo desde ingresos y costos
+-- ============================================================================
+-- Recalcula todas las filas con las mismas reglas que el bot. Usar después
+-- de cargas masivas o si se sospecha que el rollup quedó desfasado.
+--
+-- Uso:
+--   SELECT reconstruir_resumen_mensual();
+--
+-- Retorna: Cantidad de filas (periodo, tipo) generadas
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION reconstruir_resumen_mensual()
+RETURNS INTEGER AS $$
+DECLARE
+    filas INTEGER;
+BEGIN
+    DELETE FROM resumen_mensual;
+
+    -- Ingresos: por mes de cobro
+    INSERT INTO resumen_mensual (
+        periodo, tipo, total_usd, total_ars, cantidad,
+        suma_cotizaciones, cantidad_cotizaciones
+    )
+    SELECT
+        TO_CHAR(i.fecha_cobro, 'MM-YYYY'),
+        'ingresos',
+        COALESCE(SUM(i.monto_usd_total), 0),
+        COALESCE(SUM(i.monto_ars), 0),
+        COUNT(*),
+        COALESCE(SUM(i.monto_ars / i.monto_usd_total) FILTER (WHERE i.monto_ars > 0 AND i.monto_usd_total > 0), 0),
+        COUNT(*) FILTER (WHERE i.monto_ars > 0 AND i.monto_usd_total > 0)
+    FROM ingresos i
+    WHERE i.fecha_cobro IS NOT NULL
+    GROUP BY TO_CHAR(i.fecha_cobro, 'MM-YYYY');
+
+    -- Costos: por mes de carga. Dinámicos y en ARS se resuelven al leer.
+    INSERT INTO resumen_mensual (
+        periodo, tipo, total_usd, total_ars, cantidad, cantidad_dinamicos
+    )
+    SELECT
+        TO_CHAR(c.created_at, 'MM-YYYY'),
+        CASE WHEN c.tipo = 'Fijo' THEN 'costos_fijos' ELSE 'costos_variables' END,
+        COALESCE(SUM(c.monto_usd) FILTER (WHERE NOT c.dinamico AND NOT c.en_ars), 0),
+        COALESCE(SUM(c.monto_ars) FILTER (WHERE NOT c.dinamico AND c.en_ars), 0),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE c.dinamico)
+    FROM (
+        SELECT
+            created_at,
+            tipo,
+            monto_usd,
+            monto_ars,
+            (nombre = 'Agustin' OR COALESCE(es_calculo_dinamico, FALSE)) AS dinamico,
+            COALESCE(monto_ars, 0) <> 0 AS en_ars
+        FROM costos
+        WHERE created_at IS NOT NULL
+    ) c
+    GROUP BY 1, 2;
+
+    SELECT COUNT(*) INTO filas FROM resumen_mensual;
+    RETURN filas;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Carga inicial con los datos existentes
+SELECT reconstruir_resumen_mensual();
+
+
+-- ============================================================================
+-- EJEMPLOS DE USO
+-- ============================================================================
+
+-- Totales de los últimos meses (una fila por periodo y tipo)
+-- SELECT * FROM resumen_mensual WHERE periodo IN ('12-2025', '01-2026') ORDER BY periodo, tipo;
+
+-- Desde Python (supabase-py):
+-- supabase.rpc('ajustar_resumen_mensual', {
+--     'periodo_param': '01-2026',
+--     'tipo_param': 'ingresos',
+--     'delta_usd': 500,
+--     'delta_ars': 765000,
+--     'delta_cantidad': 1
+-- }).execute()
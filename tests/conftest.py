@@ -0,0 +1,14 @@
+"""
+Configuración común de los tests: los módulos del bot/API viven en
+backend/ y se importan como top-level (igual que al correr uvicorn o el
+bot desde esa carpeta); master_migration.py vive en la raíz.
+"""
+
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for ruta in (RAIZ, os.path.join(RAIZ, 'backend'), os.path.dirname(os.path.abspath(__file__))):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
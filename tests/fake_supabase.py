@@ -0,0 +1,184 @@
+"""
+Cliente de Supabase en memoria para los tests.
+
+Implementa el subconjunto de la API encadenable que usa el proyecto
+(select/insert/upsert/update/delete, eq/in_/gte/lt/lte, order, range,
+single, rpc) y registra cada execute() en `llamadas` como (tabla, operación).
+Los filtros aceptan columnas JSON con la sintaxis de PostgREST ('metadata->>clave').
+"""
+
+import itertools
+
+
+class Respuesta:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _valor(fila, columna):
+    if '->>' not in columna:
+        return fila.get(columna)
+    columna, clave = columna.split('->>', 1)
+    valor = (fila.get(columna) or {}).get(clave)
+    return None if valor is None else str(valor)
+
+
+class Consulta:
+    def __init__(self, cliente, tabla):
+        self.cliente = cliente
+        self.tabla = tabla
+        self.filtros = []
+        self.operacion = 'select'
+        self.payload = None
+        self.conflicto = None
+        self.rango = None
+        self.orden = None
+        self.unico = False
+        self.contar = None
+
+    # Construcción (sin I/O) -------------------------------------------------
+
+    def select(self, columnas='*', count=None):
+        self.contar = count
+        return self
+
+    def _filtro(self, funcion):
+        self.filtros.append(funcion)
+        return self
+
+    def eq(self, columna, valor):
+        return self._filtro(lambda fila: str(_valor(fila, columna)) == str(valor))
+
+    def in_(self, columna, valores):
+        valores = {str(valor) for valor in valores}
+        return self._filtro(lambda fila: str(_valor(fila, columna)) in valores)
+
+    def gte(self, columna, valor):
+        return self._filtro(lambda fila: fila.get(columna) is not None and str(fila[columna]) >= str(valor))
+
+    def lt(self, columna, valor):
+        return self._filtro(lambda fila: fila.get(columna) is not None and str(fila[columna]) < str(valor))
+
+    def lte(self, columna, valor):
+        return self._filtro(lambda fila: fila.get(columna) is not None and str(fila[columna]) <= str(valor))
+
+    def order(self, columna, desc=False):
+        self.orden = (columna, desc)
+        return self
+
+    def limit(self, cantidad):
+        self.rango = (0, cantidad - 1)
+        return self
+
+    def range(self, desde, hasta):
+        self.rango = (desde, hasta)
+        return self
+
+    def single(self):
+        self.unico = True
+        return self
+
+    def insert(self, payload):
+        self.operacion, self.payload = 'insert', payload
+        return self
+
+    def upsert(self, payload, on_conflict='id'):
+        self.operacion, self.payload, self.conflicto = 'upsert', payload, on_conflict
+        return self
+
+    def update(self, payload):
+        self.operacion, self.payload = 'update', payload
+        return self
+
+    def delete(self):
+        self.operacion = 'delete'
+        return self
+
+    # Ejecución --------------------------------------------------------------
+
+    def execute(self):
+        self.cliente.llamadas.append((self.tabla, self.operacion))
+        fallo = self.cliente.fallos.get((self.tabla, self.operacion))
+        if fallo is not None and fallo(self.payload):
+            raise Exception(f"fallo simulado en {self.tabla}.{self.operacion}")
+
+        filas = self.cliente.tablas.setdefault(self.tabla, [])
+
+        if self.operacion in ('insert', 'upsert'):
+            nuevas = self.payload if isinstance(self.payload, list) else [self.payload]
+            guardadas = []
+            for nueva in nuevas:
+                nueva = dict(nueva)
+                existente = None
+                if self.operacion == 'upsert' and nueva.get(self.conflicto) is not None:
+                    existente = next(
+                        (fila for fila in filas if str(fila.get(self.conflicto)) == str(nueva[self.conflicto])),
+                        None
+                    )
+                if existente is not None:
+                    existente.update(nueva)
+                    guardadas.append(dict(existente))
+                    continue
+                nueva.setdefault('id', next(self.cliente.ids))
+                filas.append(nueva)
+                guardadas.append(dict(nueva))
+            return Respuesta(guardadas)
+
+        coinciden = [fila for fila in filas if all(filtro(fila) for filtro in self.filtros)]
+
+        if self.operacion == 'update':
+            for fila in coinciden:
+                fila.update(self.payload)
+            return Respuesta([dict(fila) for fila in coinciden])
+
+        if self.operacion == 'delete':
+            for fila in coinciden:
+                filas.remove(fila)
+            return Respuesta(coinciden)
+
+        if self.orden is not None:
+            columna, desc = self.orden
+            coinciden.sort(key=lambda fila: str(fila.get(columna)), reverse=desc)
+        total = len(coinciden)
+        if self.rango is not None:
+            coinciden = coinciden[self.rango[0]:self.rango[1] + 1]
+        coinciden = [dict(fila) for fila in coinciden]
+        if self.unico:
+            return Respuesta(coinciden[0] if coinciden else None)
+        return Respuesta(coinciden, total if self.contar else None)
+
+
+class LlamadaRpc:
+    def __init__(self, cliente, nombre, parametros):
+        self.cliente = cliente
+        self.nombre = nombre
+        self.parametros = parametros
+
+    def execute(self):
+        self.cliente.llamadas.append(('rpc', self.nombre))
+        if self.nombre not in self.cliente.rpcs:
+            raise Exception(f"rpc {self.nombre} no existe")
+        return Respuesta(self.cliente.rpcs[self.nombre](self.parametros))
+
+
+class SupabaseFalso:
+    """
+    Args:
+        tablas: {tabla: [filas]} (se modifican en el lugar)
+        rpcs: {nombre: función(parámetros) → data}
+        fallos: {(tabla, operación): función(payload) → bool} para simular errores
+    """
+
+    def __init__(self, tablas=None, rpcs=None, fallos=None):
+        self.tablas = tablas if tablas is not None else {}
+        self.rpcs = rpcs or {}
+        self.fallos = fallos or {}
+        self.llamadas = []
+        self.ids = (f"id-{numero}" for numero in itertools.count(1))
+
+    def table(self, tabla):
+        return Consulta(self, tabla)
+
+    def rpc(self, nombre, parametros=None):
+        return LlamadaRpc(self, nombre, parametros or {})
@@ -0,0 +1,102 @@
+"""
+Tests de la API consolidada (backend/main.py).
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+import bot_webhook
+import db_manager
+import main
+
+
+@pytest.fixture
+def bot_webhook_sin_env(monkeypatch):
+    """
+    BOT_MODO=webhook sin .env ni SUPABASE_KEY para el bot: si algo intenta
+    cargar esas credenciales, sale con SystemExit como db_manager.
+    """
+    def sin_env():
+        sys.exit(1)
+
+    monkeypatch.setattr(db_manager, 'inicializar_supabase', sin_env)
+    monkeypatch.setattr(bot_webhook, 'inicializar_supabase', sin_env, raising=False)
+    monkeypatch.setattr(main, 'BOT_MODO', 'webhook')
+    monkeypatch.setenv('TELEGRAM_TOKEN', '123:abc')
+    monkeypatch.setenv('TELEGRAM_WEBHOOK_SECRET', 'secreto')
+
+    creadas = []
+
+    def crear_aplicacion(token, supabase, webhook=False):
+        creadas.append(supabase)
+        raise RuntimeError("sin red en los tests")
+
+    monkeypatch.setattr(bot_webhook, 'crear_aplicacion', crear_aplicacion)
+    return creadas
+
+
+def test_bot_webhook_usa_las_credenciales_de_la_api(monkeypatch, bot_webhook_sin_env):
+    monkeypatch.setattr(main, 'SUPABASE_URL', 'https://test.supabase.co')
+    monkeypatch.setattr(main, 'SUPABASE_SERVICE_ROLE_KEY', 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZSJ9.firma')
+
+    # El error del bot se informa; la API sigue arrancando
+    asyncio.run(main.iniciar_bot())
+
+    assert len(bot_webhook_sin_env) == 1
+    assert bot_webhook_sin_env[0].supabase_url == 'https://test.supabase.co'
+
+
+def test_bot_webhook_sin_credenciales_de_supabase_no_tumba_la_api(monkeypatch, bot_webhook_sin_env):
+    monkeypatch.setattr(main, 'SUPABASE_URL', '')
+    monkeypatch.setattr(main, 'SUPABASE_SERVICE_ROLE_KEY', '')
+
+    asyncio.run(main.iniciar_bot())
+
+    assert bot_webhook_sin_env == []
+
+
+# ============================================================================
+# WEBHOOK DE PST.NET
+# ============================================================================
+
+@pytest.fixture
+def cliente_pst(monkeypatch):
+    """
+    TestClient con PST_NET_SECRET configurado y la cola simulada.
+    """
+    import hmac
+
+    from fastapi.testclient import TestClient
+
+    import pst_net_integration
+    import webhooks_pst
+
+    monkeypatch.setattr(pst_net_integration, 'PST_NET_SECRET', 'secreto')
+    encolados = []
+    monkeypatch.setattr(webhooks_pst.cola_webhooks_pst, 'encolar', lambda evento: encolados.append(evento) or True)
+
+    cliente = TestClient(main.app)
+    cliente.encolados = encolados
+    cliente.firmar = lambda cuerpo: hmac.new(b'secreto', cuerpo, 'sha256').hexdigest()
+    return cliente
+
+
+def test_webhook_pst_con_firma_valida_se_encola(cliente_pst):
+    cuerpo = b'{"event": "pago.completado", "data": {"id": "pago_1"}}'
+
+    response = cliente_pst.post('/webhooks/pst', content=cuerpo, headers={'X-PST-Signature': cliente_pst.firmar(cuerpo)})
+
+    assert response.status_code == 200
+    assert cliente_pst.encolados == [{'event': 'pago.completado', 'data': {'id': 'pago_1'}}]
+
+
+@pytest.mark.parametrize('firma', ['incorrecta', '\xe9', 'sha256=\xff\xfe', None])
+def test_webhook_pst_con_firma_invalida_responde_403(cliente_pst, firma):
+    headers = {} if firma is None else {'X-PST-Signature': firma.encode('latin-1')}
+
+    response = cliente_pst.post('/webhooks/pst', content=b'{}', headers=headers)
+
+    assert response.status_code == 403
+    assert cliente_pst.encolados == []
@@ -0,0 +1,20 @@
+"""
+Tests del arranque del bot (backend/bot_instance.py).
+"""
+
+import bot_instance
+
+
+def test_bot_modo_webhook_solo_en_env_no_inicia_polling(tmp_path, monkeypatch):
+    env = tmp_path / '.env'
+    env.write_text('BOT_MODO="webhook"\n')
+    monkeypatch.setattr(bot_instance, 'ENV_PATH', env)
+    # setenv registra el valor original: al terminar se deshace lo que cargue load_dotenv
+    monkeypatch.setenv('BOT_MODO', 'polling')
+    monkeypatch.delenv('BOT_MODO')
+
+    def no_debe_iniciar():
+        raise AssertionError("se inició el bot en modo polling")
+
+    monkeypatch.setattr(bot_instance, 'obtener_token_telegram', no_debe_iniciar)
+    bot_instance.main()
@@ -0,0 +1,89 @@
+"""
+Tests de la caché de pantallas del bot (backend/cache_pantallas.py).
+"""
+
+import asyncio
+
+from cache_pantallas import (
+    PANTALLA_CLIENTES, PANTALLA_COSTOS, PANTALLA_MOVIMIENTOS, PANTALLA_RESUMEN, CachePantallas, Pantalla
+)
+
+
+def _constructor(texto='pantalla', cacheable=True):
+    """
+    construir() que cuenta cuántas veces se armó la pantalla.
+    """
+    async def construir():
+        construir.veces += 1
+        return Pantalla(f"{texto} {construir.veces}", None, cacheable)
+
+    construir.veces = 0
+    return construir
+
+
+def test_segunda_lectura_no_arma_la_pantalla():
+    cache = CachePantallas()
+    construir = _constructor()
+
+    primera = asyncio.run(cache.obtener((PANTALLA_COSTOS,), construir))
+    segunda = asyncio.run(cache.obtener((PANTALLA_COSTOS,), construir))
+
+    assert primera is segunda
+    assert construir.veces == 1
+    assert cache.contiene((PANTALLA_COSTOS,))
+
+
+def test_parametros_distintos_son_entradas_distintas():
+    cache = CachePantallas()
+    construir = _constructor()
+
+    asyncio.run(cache.obtener((PANTALLA_CLIENTES, 1), construir))
+    asyncio.run(cache.obtener((PANTALLA_CLIENTES, 2), construir))
+
+    assert construir.veces == 2
+
+
+def test_invalidar_por_tabla_descarta_solo_las_dependientes():
+    cache = CachePantallas()
+    for clave in ((PANTALLA_RESUMEN,), (PANTALLA_COSTOS,), (PANTALLA_CLIENTES, 1), (PANTALLA_MOVIMIENTOS, 0)):
+        asyncio.run(cache.obtener(clave, _constructor()))
+
+    cache.invalidar_por('costos')
+
+    assert not cache.contiene((PANTALLA_RESUMEN,))
+    assert not cache.contiene((PANTALLA_COSTOS,))
+    assert cache.contiene((PANTALLA_CLIENTES, 1))
+    assert cache.contiene((PANTALLA_MOVIMIENTOS, 0))
+
+
+def test_escritura_durante_el_armado_no_se_cachea():
+    cache = CachePantallas()
+
+    async def construir():
+        # Un handler de escritura invalida mientras se lee la base
+        cache.invalidar_por('ingresos')
+        return Pantalla('leída antes de la escritura', None)
+
+    asyncio.run(cache.obtener((PANTALLA_RESUMEN,), construir))
+
+    assert not cache.contiene((PANTALLA_RESUMEN,))
+
+
+def test_pantalla_no_cacheable():
+    cache = CachePantallas()
+    construir = _constructor('error', cacheable=False)
+
+    asyncio.run(cache.obtener((PANTALLA_RESUMEN,), construir))
+    asyncio.run(cache.obtener((PANTALLA_RESUMEN,), construir))
+
+    assert construir.veces == 2
+
+
+def test_vence_por_ttl():
+    cache = CachePantallas(ttl=0)
+    construir = _constructor()
+
+    asyncio.run(cache.obtener((PANTALLA_COSTOS,), construir))
+    asyncio.run(cache.obtener((PANTALLA_COSTOS,), construir))
+
+    assert construir.veces == 2
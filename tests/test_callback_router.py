@@ -0,0 +1,78 @@
+"""
+Tests del formato compacto de callback_data (backend/callback_router.py).
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from callback_router import (
+    CONFIRMAR_BORRAR_COSTO, CONFIRMAR_BORRAR_INGRESO, EDITAR_CLIENTE, LIMITE_CALLBACK,
+    NUEVO_COSTO_TIPO, SET_ESTADO, RouterCallbacks, callback, decodificar, extraer_extra, extraer_id
+)
+
+
+UUID = '550e8400-e29b-41d4-a716-446655440000'
+
+
+def test_uuid_viaja_en_22_caracteres_y_vuelve_igual():
+    data = callback(CONFIRMAR_BORRAR_COSTO, UUID)
+
+    assert data == f"{CONFIRMAR_BORRAR_COSTO}:VQ6EAOKbQdSnFkRmVUQAAA"
+    assert decodificar(data) == (CONFIRMAR_BORRAR_COSTO, UUID, None)
+
+
+def test_id_no_uuid_y_extra():
+    assert decodificar(callback(EDITAR_CLIENTE, 42)) == (EDITAR_CLIENTE, '42', None)
+    assert extraer_extra(callback(SET_ESTADO, UUID, 'Prospecto')) == 'Prospecto'
+
+
+def test_excede_64_bytes():
+    with pytest.raises(ValueError):
+        callback(SET_ESTADO, UUID, 'x' * LIMITE_CALLBACK)
+
+    # Justo en el límite se acepta
+    data = callback(SET_ESTADO, UUID)
+    assert len(callback(SET_ESTADO, UUID, 'x' * (LIMITE_CALLBACK - len(data) - 1)).encode('utf-8')) == LIMITE_CALLBACK
+
+
+def test_id_codificado_invalido():
+    with pytest.raises(ValueError):
+        decodificar('ec:abc')
+
+
+def test_formato_anterior_usa_el_prefijo_mas_largo():
+    assert decodificar(f'confirmar_borrar_costo_{UUID}') == (CONFIRMAR_BORRAR_COSTO, UUID, None)
+    assert decodificar(f'confirmar_borrar_{UUID}') == (CONFIRMAR_BORRAR_INGRESO, UUID, None)
+
+
+def test_formato_anterior_con_id_y_extra():
+    assert decodificar(f'set_estado_{UUID}_Activo') == (SET_ESTADO, UUID, 'Activo')
+    assert decodificar('nuevo_costo_tipo_Fijo') == (NUEVO_COSTO_TIPO, None, 'Fijo')
+    assert extraer_id(f'confirmar_borrar_costo_{UUID}') == UUID
+
+
+def test_accion_simple():
+    assert decodificar('menu_principal') == ('menu_principal', None, None)
+
+
+def test_router_despacha_por_codigo():
+    router = RouterCallbacks()
+    recibidos = []
+
+    async def handler(update, context):
+        recibidos.append(extraer_id(update.callback_query.data))
+
+    router.registrar(CONFIRMAR_BORRAR_COSTO, handler)
+    with pytest.raises(ValueError):
+        router.registrar(CONFIRMAR_BORRAR_COSTO, handler)
+
+    def update(data):
+        return SimpleNamespace(callback_query=SimpleNamespace(data=data))
+
+    assert asyncio.run(router.despachar(update(f'confirmar_borrar_costo_{UUID}'), None))
+    assert asyncio.run(router.despachar(update(callback(CONFIRMAR_BORRAR_COSTO, UUID)), None))
+    assert not asyncio.run(router.despachar(update('ec:abc'), None))
+    assert not asyncio.run(router.despachar(update('sin_handler'), None))
+    assert recibidos == [UUID, UUID]
@@ -0,0 +1,127 @@
+"""
+Tests del servicio de cotización del dólar blue (backend/cotizacion_dolar.py).
+"""
+
+import asyncio
+
+import cotizacion_dolar
+from cotizacion_dolar import ServicioCotizacion
+from fake_supabase import SupabaseFalso
+
+
+def _servicio(ttl=300, demora=0.05):
+    """
+    Servicio con DolarAPI simulada: cuenta las consultas y tarda `demora` segundos.
+    """
+    servicio = ServicioCotizacion(ttl=ttl)
+    servicio.configurar_supabase(SupabaseFalso({'cotizaciones': []}))
+    servicio.consultas = 0
+
+    async def consultar():
+        servicio.consultas += 1
+        await asyncio.sleep(demora)
+        return servicio._actualizar({
+            'compra': 1180, 'venta': 1200 + servicio.consultas, 'fechaActualizacion': f'v{servicio.consultas}'
+        })
+
+    servicio._consultar_async = consultar
+    return servicio
+
+
+def test_llamadas_concurrentes_comparten_una_sola_consulta():
+    servicio = _servicio()
+
+    async def probar():
+        return await asyncio.gather(*(servicio.obtener() for _ in range(20)))
+
+    resultados = asyncio.run(probar())
+
+    assert servicio.consultas == 1
+    assert {resultado['venta'] for resultado in resultados} == {1201.0}
+    assert not any(resultado['desactualizada'] for resultado in resultados)
+
+
+def test_dentro_del_ttl_responde_desde_memoria():
+    servicio = _servicio()
+
+    async def probar():
+        await servicio.obtener()
+        return await servicio.obtener()
+
+    assert asyncio.run(probar())['venta'] == 1201.0
+    assert servicio.consultas == 1
+
+
+def test_vencida_sirve_la_anterior_y_refresca_una_vez_en_segundo_plano():
+    servicio = _servicio(ttl=0)
+
+    async def probar():
+        await servicio.obtener()
+        vencidas = await asyncio.gather(*(servicio.obtener() for _ in range(10)))
+        await servicio._tarea_refresco
+        return vencidas
+
+    vencidas = asyncio.run(probar())
+
+    assert all(resultado['desactualizada'] and resultado['venta'] == 1201.0 for resultado in vencidas)
+    assert servicio.consultas == 2
+
+
+def test_error_sin_cotizacion_previa():
+    servicio = ServicioCotizacion()
+
+    async def falla():
+        raise RuntimeError("sin red")
+
+    servicio._consultar_async = falla
+
+    assert asyncio.run(servicio.obtener()) == {'error': 'sin red'}
+
+
+def test_persiste_una_vez_por_valor_publicado():
+    servicio = _servicio()
+    supabase = servicio._supabase
+
+    for _ in range(3):
+        servicio._actualizar({'compra': 1, 'venta': 2, 'fechaActualizacion': 'misma'})
+    servicio._segundo_plano.shutdown(wait=True)
+
+    assert supabase.llamadas.count(('cotizaciones', 'insert')) == 1
+
+
+def test_instancia_del_proceso():
+    assert isinstance(cotizacion_dolar.servicio_cotizacion, ServicioCotizacion)
+
+
+def _cotizaciones():
+    return SupabaseFalso({'cotizaciones': [
+        # Del bot
+        {'created_at': '2026-10-01T09:00:00', 'venta': 1200},
+        {'created_at': '2026-10-01T18:00:00', 'venta': 1210},
+        {'created_at': '2026-10-03T12:00:00', 'venta': None},
+        # Importadas de la planilla
+        {'fecha': '2026-10-01', 'blue_venta': 1100},
+        {'fecha': '2026-10-03', 'blue_venta': 1230},
+        {'fecha': '2026-10-05', 'blue_venta': 1250},
+    ]})
+
+
+def test_ventas_por_fecha_combina_bot_y_planilla():
+    ventas = cotizacion_dolar.ventas_por_fecha(_cotizaciones(), ['2026-10-01', '2026-10-03', '2026-10-05'])
+
+    # El día con ambas usa la última del bot; los demás solo existen en la planilla
+    assert ventas == {'2026-10-01': 1210.0, '2026-10-03': 1230.0, '2026-10-05': 1250.0}
+
+
+def test_ventas_por_fecha_usa_la_anterior_mas_cercana():
+    ventas = cotizacion_dolar.ventas_por_fecha(_cotizaciones(), ['2026-10-02', '2026-10-20', '2026-09-01'], max_dias=7)
+
+    assert ventas == {'2026-10-02': 1210.0}
+
+
+def test_ventas_por_fecha_con_un_origen_fallido():
+    supabase = _cotizaciones()
+    # Falla la lectura de la planilla (la primera); la del bot responde
+    supabase.fallos[('cotizaciones', 'select')] = lambda payload: supabase.llamadas.count(('cotizaciones', 'select')) == 1
+
+    assert cotizacion_dolar.ventas_por_fecha(supabase, ['2026-10-01', '2026-10-05'], max_dias=2) == {'2026-10-01': 1210.0}
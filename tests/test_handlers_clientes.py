@@ -0,0 +1,51 @@
+"""
+Tests de los handlers de clientes (backend/handlers_clientes.py).
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import handlers_clientes
+from callback_router import TOGGLE_COMISION, callback
+from directorio_clientes import directorio_clientes
+from fake_supabase import SupabaseFalso
+
+
+CLIENTE_ID = '550e8400-e29b-41d4-a716-446655440000'
+
+
+class QueryFalsa:
+    def __init__(self, data):
+        self.data = data
+        self.respuestas = []
+
+    async def answer(self, texto=None, show_alert=False):
+        self.respuestas.append(texto)
+
+
+def _contexto(supabase):
+    def create_task(corrutina):
+        corrutina.close()
+
+    return SimpleNamespace(
+        bot_data={'supabase': supabase},
+        application=SimpleNamespace(create_task=create_task)
+    )
+
+
+def test_toggle_comision_usa_el_valor_actual_de_supabase():
+    supabase = SupabaseFalso({'clientes': [
+        {'id': CLIENTE_ID, 'nombre': 'Acme', 'comisiona_agustin': False}
+    ]})
+
+    # El directorio quedó con un valor viejo (ej: editado desde la webapp)
+    directorio_clientes.guardar({'id': CLIENTE_ID, 'nombre': 'Acme', 'comisiona_agustin': True})
+
+    query = QueryFalsa(callback(TOGGLE_COMISION, CLIENTE_ID))
+    asyncio.run(handlers_clientes.handler_toggle_comision(
+        SimpleNamespace(callback_query=query), _contexto(supabase)
+    ))
+
+    assert supabase.tablas['clientes'][0]['comisiona_agustin'] is True
+    assert "✅ Comisión activada" in query.respuestas
+    assert directorio_clientes.obtener(supabase, CLIENTE_ID)['comisiona_agustin'] is True
@@ -0,0 +1,352 @@
+"""
+Tests de la migración de CSVs (master_migration.py) contra un Supabase en memoria.
+"""
+
+import os
+
+os.environ.setdefault('SUPABASE_URL', 'https://test.supabase.co')
+os.environ.setdefault('SUPABASE_KEY', 'eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.firma')
+
+import pytest
+
+import master_migration as mm
+from fake_supabase import SupabaseFalso
+
+
+@pytest.fixture
+def base(monkeypatch):
+    """
+    Supabase falso y estado global de la corrida limpio en cada test.
+    """
+    supabase = SupabaseFalso({'clientes': [], 'ingresos': [], 'costos': [], 'cotizaciones': []})
+    monkeypatch.setattr(mm, 'supabase', supabase)
+    monkeypatch.setattr(mm, '_indices', {})
+    monkeypatch.setattr(mm, 'stats', {
+        tabla: {'insertados': 0, 'actualizados': 0, 'sin_cambios': 0, 'errores': 0}
+        for tabla in mm.stats
+    })
+    monkeypatch.setattr(mm, 'manifiesto', None)
+    monkeypatch.setattr(mm, 'simulacion', False)
+    monkeypatch.setattr(mm, 'filas_por_bloque', None)
+    return supabase
+
+
+def _costo(nombre, monto=10.0):
+    return {'nombre': nombre, 'tipo': 'Fijo', 'monto_usd': monto, 'observacion': None}
+
+
+# ============================================================================
+# CARGA POR LOTES
+# ============================================================================
+
+def test_envia_un_request_por_lote(base):
+    mm.upsert_por_lotes('costos', [_costo(f'C{numero}') for numero in range(7)], tamano_lote=3)
+
+    assert base.llamadas.count(('costos', 'insert')) == 3
+    assert len(base.tablas['costos']) == 7
+    assert mm.stats['costos']['insertados'] == 7
+
+
+def test_lote_fallido_se_reintenta_fila_por_fila(base):
+    # El lote completo falla por una sola fila inválida
+    base.fallos[('costos', 'insert')] = lambda lote: any(fila['nombre'] == 'MALO' for fila in lote)
+
+    registros = [_costo('A'), _costo('B'), _costo('MALO'), _costo('C')]
+    mm.upsert_por_lotes('costos', registros, tamano_lote=10)
+
+    assert sorted(fila['nombre'] for fila in base.tablas['costos']) == ['A', 'B', 'C']
+    assert mm.stats['costos']['insertados'] == 3
+    assert mm.stats['costos']['errores'] == 1
+    # 1 lote fallido + 4 reintentos individuales
+    assert base.llamadas.count(('costos', 'insert')) == 5
+
+
+def test_existentes_se_actualizan_por_id(base):
+    base.tablas['costos'].append({'id': 'c-1', **_costo('Hosting', 5.0)})
+
+    mm.upsert_por_lotes('costos', [_costo('Hosting', 8.0), _costo('Dominio')], tamano_lote=10)
+
+    por_nombre = {fila['nombre']: fila for fila in base.tablas['costos']}
+    assert por_nombre['Hosting']['id'] == 'c-1'
+    assert por_nombre['Hosting']['monto_usd'] == 8.0
+    assert mm.stats['costos'] == {'insertados': 1, 'actualizados': 1, 'sin_cambios': 0, 'errores': 0}
+
+
+def test_clave_repetida_en_la_base_actualiza_todas_sus_filas(base):
+    base.tablas['costos'].extend([
+        {'id': 'c-1', **_costo('Hosting', 5.0)},
+        {'id': 'c-2', **_costo('Hosting', 6.0)},
+    ])
+
+    mm.upsert_por_lotes('costos', [_costo('Hosting', 9.0)], tamano_lote=10)
+
+    assert [fila['monto_usd'] for fila in base.tablas['costos']] == [9.0, 9.0]
+    assert mm.stats['costos']['actualizados'] == 2
+
+
+def _ingreso(id_ingreso, monto):
+    return {'id': id_ingreso, 'cliente_id': 'cli-1', 'fecha_cobro': '2026-10-01', 'monto_usd_total': monto}
+
+
+def test_ingresos_del_mismo_dia_actualizan_solo_la_primera_fila(base):
+    # Dos pagos del mismo cliente en el día son ingresos distintos
+    base.tablas['ingresos'].extend([_ingreso('i-1', 100.0), _ingreso('i-2', 250.0)])
+
+    registro = _ingreso(None, 120.0)
+    del registro['id']
+    mm.upsert_por_lotes('ingresos', [registro], tamano_lote=10)
+
+    assert [(fila['id'], fila['monto_usd_total']) for fila in base.tablas['ingresos']] == [
+        ('i-1', 120.0), ('i-2', 250.0)
+    ]
+    assert mm.stats['ingresos']['actualizados'] == 1
+
+
+def test_dry_run_de_ingresos_del_mismo_dia_compara_solo_la_primera_fila(base, monkeypatch):
+    monkeypatch.setattr(mm, 'simulacion', True)
+    base.tablas['ingresos'].extend([_ingreso('i-1', 100.0), _ingreso('i-2', 250.0)])
+
+    registro = _ingreso(None, 100.0)
+    del registro['id']
+    mm.upsert_por_lotes('ingresos', [registro], tamano_lote=10)
+
+    assert mm.stats['ingresos'] == {'insertados': 0, 'actualizados': 0, 'sin_cambios': 1, 'errores': 0}
+
+
+def test_filas_repetidas_en_el_csv_gana_la_ultima(base):
+    mm.upsert_por_lotes('costos', [_costo('Hosting', 1.0), _costo('Hosting', 2.0)], tamano_lote=10)
+
+    assert [fila['monto_usd'] for fila in base.tablas['costos']] == [2.0]
+
+
+# ============================================================================
+# NORMALIZACIÓN POR COLUMNAS
+# ============================================================================
+
+def test_normalizar_clientes():
+    df = mm.pd.DataFrame({
+        'Cliente': [' Acme ', '', 'Beta'],
+        'Honorario USD': ['$765,000', '$1', 'abc'],
+        'Estado': ['Activo', None, None],
+        'Activo?': ['Sí', 'No', ''],
+    })
+
+    registros = mm.normalizar_clientes(df)
+
+    assert [registro['nombre'] for registro in registros] == ['Acme', 'Beta']
+    assert registros[0]['honorario_usd'] == 765000.0
+    assert registros[1]['estado'] == 'Desconocido'
+
+
+def test_normalizar_ingresos_resuelve_cliente_y_descarta_invalidos():
+    df = mm.pd.DataFrame({
+        'Cliente': ['Acme', 'Nadie', 'Acme', None],
+        'Fecha de cobro': ['15/01/2026', '16/01/2026', '', '17/01/2026'],
+        'Montro cobrado USD': ['$500.00', '1', '2', '3'],
+    })
+
+    registros, errores = mm.normalizar_ingresos(df, {'Acme': 'cli-1'})
+
+    assert errores == 2                       # cliente inexistente + sin fecha
+    assert len(registros) == 1
+    assert registros[0]['cliente_id'] == 'cli-1'
+    assert registros[0]['fecha_cobro'] == '2026-01-15'
+    assert registros[0]['monto_usd_total'] == 500.0
+    assert registros[0]['estado'] == 'Pendiente'
+
+
+def test_cotizaciones_despues_del_header():
+    df = mm.pd.DataFrame([
+        [None, None, None],
+        ['Fecha', 'Hora', 'Blue Venta'],
+        ['15/01/2026', '14:30', '$1.200,00'],
+        ['', '', ''],
+    ])
+
+    registros = mm.normalizar_cotizaciones(mm.filas_despues_del_header(df))
+
+    assert len(registros) == 1
+    assert registros[0]['fecha'] == '2026-01-15'
+    assert registros[0]['blue_venta'] == 1200.0
+
+
+# ============================================================================
+# PLANIFICADOR POR DEPENDENCIAS
+# ============================================================================
+
+def _migraciones_registradas(monkeypatch, fallan=()):
+    import threading
+    import time
+
+    eventos = []
+    lock = threading.Lock()
+
+    def migracion(tabla):
+        def migrar(tamano_lote):
+            with lock:
+                eventos.append(('inicio', tabla))
+            time.sleep(0.05)
+            with lock:
+                eventos.append(('fin', tabla))
+            return tabla not in fallan
+        return migrar
+
+    monkeypatch.setattr(mm, 'MIGRACIONES', {tabla: migracion(tabla) for tabla in mm.MIGRACIONES})
+    return eventos
+
+
+def test_planificador_respeta_dependencias(base, monkeypatch):
+    eventos = _migraciones_registradas(monkeypatch)
+    dependencias = {'clientes': (), 'ingresos': ('clientes',), 'costos': (), 'cotizaciones': ()}
+
+    resultados = mm.ejecutar_migraciones(tamano_lote=10, hilos=3, dependencias=dependencias)
+
+    assert resultados == {'clientes': True, 'ingresos': True, 'costos': True, 'cotizaciones': True}
+    assert eventos.index(('fin', 'clientes')) < eventos.index(('inicio', 'ingresos'))
+    # Las independientes arrancan juntas, antes de que termine la primera
+    primer_fin = next(indice for indice, (tipo, _) in enumerate(eventos) if tipo == 'fin')
+    assert {tabla for tipo, tabla in eventos[:primer_fin]} == {'clientes', 'costos', 'cotizaciones'}
+
+
+def test_planificador_omite_dependientes_de_una_tabla_fallida(base, monkeypatch):
+    eventos = _migraciones_registradas(monkeypatch, fallan=('clientes',))
+    dependencias = {'clientes': (), 'ingresos': ('clientes',), 'costos': ()}
+
+    resultados = mm.ejecutar_migraciones(tamano_lote=10, hilos=2, dependencias=dependencias)
+
+    assert resultados == {'clientes': False, 'ingresos': None, 'costos': True}
+    assert ('inicio', 'ingresos') not in eventos
+
+
+def test_planificador_rechaza_dependencias_circulares(base, monkeypatch):
+    _migraciones_registradas(monkeypatch)
+
+    with pytest.raises(ValueError):
+        mm.ejecutar_migraciones(dependencias={'clientes': ('ingresos',), 'ingresos': ('clientes',)})
+
+
+# ============================================================================
+# MANIFIESTO Y REANUDACIÓN
+# ============================================================================
+
+@pytest.fixture
+def con_manifiesto(base, monkeypatch, tmp_path):
+    base.tablas.update({'migraciones': [], 'migraciones_checkpoint': []})
+    manifiesto = mm.ManifiestoMigracion(str(tmp_path / 'manifiesto.json'))
+    monkeypatch.setattr(mm, 'manifiesto', manifiesto)
+    return manifiesto
+
+
+def test_reanudar_omite_registros_con_huella_sin_cambios(base, con_manifiesto):
+    mm.upsert_por_lotes('costos', [_costo('A', 1.0), _costo('B', 2.0)], tamano_lote=10)
+    base.llamadas.clear()
+
+    mm.upsert_por_lotes('costos', [_costo('A', 1.0), _costo('B', 3.0)], tamano_lote=10)
+
+    assert base.llamadas.count(('costos', 'upsert')) == 1
+    assert mm.stats['costos']['sin_cambios'] == 1
+    assert {fila['nombre']: fila['monto_usd'] for fila in base.tablas['costos']} == {'A': 1.0, 'B': 3.0}
+
+
+def test_reanudar_reenvia_solo_lo_que_fallo(base, con_manifiesto):
+    base.fallos[('costos', 'insert')] = lambda lote: any(fila['nombre'] == 'B' for fila in lote)
+    mm.upsert_por_lotes('costos', [_costo('A'), _costo('B'), _costo('C')], tamano_lote=10)
+    assert mm.stats['costos']['errores'] == 1
+
+    # Segunda corrida (manifiesto recargado del disco), ya sin el error
+    base.fallos.clear()
+    base.llamadas.clear()
+    mm.manifiesto = mm.ManifiestoMigracion(con_manifiesto.ruta)
+    mm._indices.clear()
+    mm.upsert_por_lotes('costos', [_costo('A'), _costo('B'), _costo('C')], tamano_lote=10)
+
+    assert base.llamadas.count(('costos', 'insert')) == 1
+    assert sorted(fila['nombre'] for fila in base.tablas['costos']) == ['A', 'B', 'C']
+
+
+def test_tabla_completa_con_el_mismo_csv_queda_al_dia(base, con_manifiesto):
+    con_manifiesto.iniciar_tabla('costos', 'huella-csv')
+    assert not con_manifiesto.tabla_al_dia('costos', 'huella-csv')
+
+    con_manifiesto.finalizar_tabla('costos', completada=True)
+
+    assert con_manifiesto.tabla_al_dia('costos', 'huella-csv')
+    assert not con_manifiesto.tabla_al_dia('costos', 'otro-csv')
+    assert not mm.ManifiestoMigracion(con_manifiesto.ruta, forzar=True).tabla_al_dia('costos', 'huella-csv')
+
+
+# ============================================================================
+# SIMULACIÓN (--dry-run)
+# ============================================================================
+
+def test_dry_run_no_escribe_y_clasifica_cambios(base, monkeypatch):
+    monkeypatch.setattr(mm, 'simulacion', True)
+    base.tablas['costos'].extend([
+        {'id': 'c-1', **_costo('A', 1.0)},
+        {'id': 'c-2', **_costo('B', 2.0)},
+    ])
+
+    mm.upsert_por_lotes('costos', [_costo('A', 1.0), _costo('B', 5.0), _costo('C')], tamano_lote=10)
+
+    assert {operacion for _, operacion in base.llamadas} == {'select'}
+    assert len(base.tablas['costos']) == 2
+    assert mm.stats['costos'] == {'insertados': 1, 'actualizados': 1, 'sin_cambios': 1, 'errores': 0}
+
+
+def test_diff_compara_contra_cada_fila_de_una_clave_repetida():
+    actuales = {('Hosting',): [
+        {'id': 'c-1', 'nombre': 'Hosting', 'monto_usd': '9.00'},
+        {'id': 'c-2', 'nombre': 'Hosting', 'monto_usd': 5},
+    ]}
+
+    diff = mm.calcular_diff([{'nombre': 'Hosting', 'monto_usd': 9.0}], actuales, ('nombre',))
+
+    assert diff['insertar'] == []
+    assert diff['sin_cambios'] == 1
+    assert diff['actualizar'] == [('Hosting', {'monto_usd': (5, 9.0)})]
+
+
+# ============================================================================
+# LECTURA POR BLOQUES (--stream)
+# ============================================================================
+
+@pytest.fixture
+def csvs(monkeypatch, tmp_path):
+    """
+    CSVs temporales en lugar de los de la raíz del proyecto.
+    """
+    archivos = {}
+
+    def escribir(tabla, contenido):
+        ruta = tmp_path / f'{tabla}.csv'
+        ruta.write_text(contenido, encoding='utf-8')
+        archivos[tabla] = str(ruta)
+
+    monkeypatch.setattr(mm, 'CSV_FILES', archivos)
+    monkeypatch.setattr(mm, 'filas_leidas', {tabla: 0 for tabla in mm.filas_leidas})
+    return escribir
+
+
+def test_stream_repetidos_entre_bloques_se_actualizan(base, monkeypatch, csvs):
+    monkeypatch.setattr(mm, 'filas_por_bloque', 2)
+    csvs('costos', 'Nombre,Tipo,Monto USD,Observación\n'
+                   'A,Fijo,1,\nB,Fijo,2,\nC,Fijo,3,\nA,Fijo,4,\nB,Fijo,5,\n')
+
+    assert mm.migrate_costos(tamano_lote=10)
+
+    assert {fila['nombre']: fila['monto_usd'] for fila in base.tablas['costos']} == {'A': 4.0, 'B': 5.0, 'C': 3.0}
+    assert mm.stats['costos']['insertados'] == 3
+    assert mm.stats['costos']['actualizados'] == 2
+    assert mm.filas_leidas['costos'] == 5
+
+
+def test_stream_encuentra_el_header_de_cotizaciones_en_otro_bloque(base, monkeypatch, csvs):
+    monkeypatch.setattr(mm, 'filas_por_bloque', 2)
+    csvs('cotizaciones', ',,\n,,\n,,\nFecha,Hora,Blue Venta\n'
+                         '15/01/2026,14:30,"$1.200,00"\n16/01/2026,14:30,"$1.210,00"\n')
+
+    assert mm.migrate_cotizaciones(tamano_lote=10)
+
+    assert [(fila['fecha'], fila['blue_venta']) for fila in base.tablas['cotizaciones']] == [
+        ('2026-01-15', 1200.0), ('2026-01-16', 1210.0)
+    ]
@@ -0,0 +1,63 @@
+"""
+Tests del parser de montos compartido (backend/montos.py).
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from montos import FORMATO_AR, FORMATO_EN, parsear_monto, parsear_monto_api, parsear_montos
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('$765,000', 765000.0),
+    ('1.255,50', 1255.5),
+    ('$500.00', 500.0),
+    ('$1485,00', 1485.0),
+    ('1485,00 ARS', 1485.0),
+    ('1.255.000', 1255000.0),
+    ('1,255.50', 1255.5),
+    ('-1.255,50', -1255.5),
+])
+def test_formatos_de_planilla(texto, esperado):
+    assert parsear_monto(texto) == esperado
+
+
+@pytest.mark.parametrize('texto', ['0,500', '0.500'])
+def test_cero_inicial_antes_de_un_grupo_es_decimal(texto):
+    assert parsear_monto(texto) == 0.5
+
+
+def test_cero_inicial_no_es_grupo_de_miles_en_formato_fijo():
+    assert parsear_monto('0,500', FORMATO_EN) is None
+    assert parsear_monto('0,500', FORMATO_AR) == 0.5
+
+
+@pytest.mark.parametrize('texto', ['\t500', '500\n', '  500  ', '\r\n$500 \t'])
+def test_espacios_de_los_extremos(texto):
+    assert parsear_monto(texto) == 500.0
+
+
+@pytest.mark.parametrize('texto, esperado', [('.5', 0.5), (',5', 0.5), ('-.5', -0.5)])
+def test_decimal_sin_parte_entera(texto, esperado):
+    assert parsear_monto(texto) == esperado
+
+
+@pytest.mark.parametrize('texto', ['1e5', '1E5', 'abc', '.', '-', '', '   ', '1,2,3', '12,34.567,8'])
+def test_invalidos(texto):
+    assert parsear_monto(texto) is None
+
+
+def test_lote_mixto():
+    resultado = parsear_montos(['$765,000', 12.5, None, '—', np.int64(3)])
+    assert resultado[:2].tolist() == [765000.0, 12.5]
+    assert math.isnan(resultado[2]) and math.isnan(resultado[3])
+    assert resultado[4] == 3.0
+
+
+def test_monto_api():
+    assert parsear_monto_api('1,255.50') == 1255.5
+    assert parsear_monto_api(None) == 0.0
+    with pytest.raises(ValueError):
+        parsear_monto_api('1.255,50')
@@ -0,0 +1,195 @@
+"""
+Tests de la sincronización PST.NET → Supabase (backend/pst_net_integration.py).
+"""
+
+import pytest
+
+import pst_net_integration as pst
+from fake_supabase import SupabaseFalso
+
+
+def _pago(numero, monto=100):
+    return {'id': f'pago_{numero}', 'cliente_id': 'cliente-1', 'monto': monto, 'fecha': '2026-10-01T10:00:00Z'}
+
+
+@pytest.fixture
+def entorno(monkeypatch):
+    """
+    PST.NET simulado: pagos pendientes, confirmaciones registradas y cotización fija.
+    """
+    estado = {'pagos': [], 'marcados': []}
+
+    monkeypatch.setattr(pst, 'iterar_pagos_pendientes', lambda: iter(list(estado['pagos'])))
+    monkeypatch.setattr(pst, 'marcar_pagos_sincronizados', lambda ids: estado['marcados'].extend(ids) or len(ids))
+    monkeypatch.setattr(pst, 'obtener_dolar_venta', lambda: 1000.0)
+    monkeypatch.setattr(pst, 'registrar_ingresos', lambda supabase, filas: True)
+    return estado
+
+
+def _ingresos(supabase):
+    return [fila['metadata']['pago_id_pst'] for fila in supabase.tablas['ingresos']]
+
+
+def test_sincroniza_y_confirma(entorno):
+    supabase = SupabaseFalso({'ingresos': [], 'cotizaciones': []})
+    entorno['pagos'] = [_pago(1), _pago(2), _pago(3, monto=0)]
+
+    resultado = pst.sincronizar_pagos_pst_net(supabase)
+
+    assert resultado == {'total': 3, 'exitosos': 2, 'fallidos': 1, 'repetidos': 0}
+    assert _ingresos(supabase) == ['pago_1', 'pago_2']
+    assert supabase.tablas['ingresos'][0]['monto_ars'] == 100_000.0
+    assert entorno['marcados'] == ['pago_1', 'pago_2']
+
+
+def test_corrida_cortada_antes_de_confirmar_no_duplica(entorno, monkeypatch):
+    supabase = SupabaseFalso({'ingresos': [], 'cotizaciones': []})
+    entorno['pagos'] = [_pago(1), _pago(2)]
+
+    def muere(ids):
+        raise RuntimeError("proceso terminado")
+
+    with monkeypatch.context() as m:
+        m.setattr(pst, 'marcar_pagos_sincronizados', muere)
+        with pytest.raises(RuntimeError):
+            pst.sincronizar_pagos_pst_net(supabase)
+
+    # PST.NET los sigue listando como pendientes; llega además uno nuevo
+    entorno['pagos'] = [_pago(1), _pago(2), _pago(3)]
+    resultado = pst.sincronizar_pagos_pst_net(supabase)
+
+    assert resultado == {'total': 3, 'exitosos': 1, 'fallidos': 0, 'repetidos': 2}
+    assert _ingresos(supabase) == ['pago_1', 'pago_2', 'pago_3']
+    assert sorted(entorno['marcados']) == ['pago_1', 'pago_2', 'pago_3']
+
+
+def test_repetidos_en_la_misma_corrida(entorno, monkeypatch):
+    monkeypatch.setattr(pst, 'LOTE_INGRESOS', 2)
+    supabase = SupabaseFalso({'ingresos': [], 'cotizaciones': []})
+    # La paginación por offset puede volver a entregar un pago ya visto
+    entorno['pagos'] = [_pago(1), _pago(2), _pago(2), _pago(3), _pago(3)]
+
+    resultado = pst.sincronizar_pagos_pst_net(supabase)
+
+    assert resultado['repetidos'] == 2
+    assert _ingresos(supabase) == ['pago_1', 'pago_2', 'pago_3']
+
+
+def test_consulta_de_registrados_por_tandas(monkeypatch):
+    monkeypatch.setattr(pst, 'LOTE_CONSULTA_REGISTRADOS', 2)
+    supabase = SupabaseFalso({'ingresos': [
+        {'id': 'i1', 'metadata': {'fuente': 'PST.NET', 'pago_id_pst': 'pago_1'}},
+        {'id': 'i2', 'metadata': {'fuente': 'PST.NET', 'pago_id_pst': 'pago_4'}},
+        {'id': 'i3', 'metadata': None},
+    ]})
+
+    assert pst.pagos_ya_registrados(supabase, ['pago_1', 'pago_2', 'pago_3', 'pago_4', None]) == {'pago_1', 'pago_4'}
+    assert supabase.llamadas == [('ingresos', 'select')] * 2
+
+
+class _SupabaseDesordenado(SupabaseFalso):
+    """
+    Devuelve las filas insertadas en otro orden y sin una de ellas.
+    """
+
+    def table(self, tabla):
+        consulta = super().table(tabla)
+        ejecutar = consulta.execute
+
+        def execute():
+            respuesta = ejecutar()
+            if consulta.operacion == 'insert':
+                respuesta.data = list(reversed(respuesta.data))[1:]
+            return respuesta
+
+        consulta.execute = execute
+        return consulta
+
+
+def test_filas_devueltas_se_asocian_por_pago():
+    supabase = _SupabaseDesordenado({'ingresos': []})
+    filas = [pst.preparar_ingreso_pst_net(_pago(numero)) for numero in (1, 2, 3)]
+
+    insertadas = pst._insertar_filas(supabase, filas)
+
+    assert [fila and fila['metadata']['pago_id_pst'] for fila in insertadas] == ['pago_1', 'pago_2', None]
+
+
+def test_lote_rechazado_se_reintenta_fila_por_fila():
+    supabase = SupabaseFalso(
+        {'ingresos': []},
+        fallos={('ingresos', 'insert'): lambda filas: any(fila['metadata']['pago_id_pst'] == 'pago_2' for fila in filas)}
+    )
+    filas = [pst.preparar_ingreso_pst_net(_pago(numero)) for numero in (1, 2, 3)]
+
+    insertadas = pst._insertar_filas(supabase, filas)
+
+    assert [fila and fila['metadata']['pago_id_pst'] for fila in insertadas] == ['pago_1', None, 'pago_3']
+    assert supabase.llamadas.count(('ingresos', 'insert')) == 4
+
+
+def test_firma_del_webhook(monkeypatch):
+    import hmac
+
+    monkeypatch.setattr(pst, 'PST_NET_SECRET', 'secreto')
+    cuerpo = b'{"event": "pago.completado"}'
+    firma = hmac.new(b'secreto', cuerpo, pst.ALGORITMO_FIRMA_PST_NET).hexdigest()
+
+    assert pst.validar_webhook_pst_net(cuerpo, firma)
+    assert pst.validar_webhook_pst_net(cuerpo, f" SHA256={firma.upper()} ")
+    assert not pst.validar_webhook_pst_net(cuerpo + b' ', firma)
+    assert not pst.validar_webhook_pst_net(cuerpo, None)
+
+    monkeypatch.setattr(pst, 'PST_NET_SECRET', '')
+    assert not pst.validar_webhook_pst_net(cuerpo, firma)
+
+
+def test_webhook_reenviado_no_duplica(entorno):
+    supabase = SupabaseFalso({'ingresos': [], 'cotizaciones': []})
+    eventos = [{'event': 'pago.completado', 'data': _pago(1)}, {'event': 'pago.reembolsado', 'data': _pago(2)}]
+
+    primero = pst.procesar_webhooks_pst_net(eventos, supabase)
+    reenvio = pst.procesar_webhooks_pst_net(eventos[:1], supabase)
+
+    assert primero == {'total': 2, 'exitosos': 1, 'fallidos': 0, 'ignorados': 1, 'repetidos': 0}
+    assert reenvio == {'total': 1, 'exitosos': 0, 'fallidos': 0, 'ignorados': 0, 'repetidos': 1}
+    assert _ingresos(supabase) == ['pago_1']
+    assert entorno['marcados'] == ['pago_1', 'pago_1']
+
+
+def _api_de_pagos(monkeypatch, responder):
+    """
+    /pagos simulado: responder(params) → (pagos, cursor). Devuelve los params pedidos.
+    """
+    pedidos = []
+
+    def pedir_pagina(endpoint, params):
+        pedidos.append(params)
+        return responder(params)
+
+    monkeypatch.setattr(pst, '_pedir_pagina', pedir_pagina)
+    return pedidos
+
+
+def test_recorre_por_offset_hasta_la_pagina_corta(monkeypatch):
+    pagos = [_pago(numero) for numero in range(5)]
+    pedidos = _api_de_pagos(monkeypatch, lambda params: (pagos[params.get('offset', 0):][:2], None))
+
+    assert [pago['id'] for pago in pst.iterar_pagos_pendientes(por_pagina=2)] == [pago['id'] for pago in pagos]
+    assert [params.get('offset') for params in pedidos] == [None, 2, 4]
+
+
+def test_api_que_ignora_el_offset_no_cicla(monkeypatch):
+    pedidos = _api_de_pagos(monkeypatch, lambda params: ([_pago(1), _pago(2)], None))
+
+    assert [pago['id'] for pago in pst.iterar_pagos_pendientes(por_pagina=2)] == ['pago_1', 'pago_2']
+    assert len(pedidos) == 2
+
+
+def test_maximo_de_paginas(monkeypatch):
+    monkeypatch.setattr(pst, 'PST_NET_MAXIMO_PAGINAS', 3)
+    # Un cursor que nunca se agota con pagos siempre nuevos
+    pedidos = _api_de_pagos(monkeypatch, lambda params: ([_pago(int(params.get('cursor', 0)))], int(params.get('cursor', 0)) + 1))
+
+    assert len(list(pst.iterar_pagos_pendientes(por_pagina=1))) == 3
+    assert len(pedidos) == 3
@@ -0,0 +1,103 @@
+"""
+Tests de la cola de webhooks de PST.NET (backend/webhooks_pst.py).
+"""
+
+import asyncio
+
+import webhooks_pst
+from webhooks_pst import ColaWebhooksPst
+
+
+def _evento(pago_id):
+    return {'event': 'pago.completado', 'data': {'id': pago_id, 'cliente_id': 'cliente-1', 'monto': 100}}
+
+
+def _procesador(fallas):
+    """
+    procesar_webhooks_pst_net simulado: registra los lotes y falla las primeras `fallas` veces.
+    """
+    def procesar(eventos, supabase):
+        procesar.lotes.append([evento['data']['id'] for evento in eventos])
+        if len(procesar.lotes) <= fallas:
+            raise RuntimeError("Supabase caído")
+        return {'total': len(eventos), 'exitosos': len(eventos), 'fallidos': 0}
+
+    procesar.lotes = []
+    return procesar
+
+
+async def _esperar_lotes(procesar, cantidad):
+    for _ in range(200):
+        if len(procesar.lotes) >= cantidad:
+            # Dejar que _procesar termine de actualizar los pagos vistos
+            await asyncio.sleep(0.01)
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"se esperaban {cantidad} lote(s): {procesar.lotes}")
+
+
+def test_reenvio_tras_lote_fallido_se_procesa(monkeypatch):
+    procesar = _procesador(fallas=1)
+    monkeypatch.setattr(webhooks_pst, 'procesar_webhooks_pst_net', procesar)
+    cola = ColaWebhooksPst(lote=10, espera=0)
+
+    async def probar():
+        await cola.iniciar(supabase=None)
+        assert cola.encolar(_evento('pago_1'))
+        await _esperar_lotes(procesar, 1)
+
+        # PST.NET reenvía el pago del lote fallido
+        assert cola.encolar(_evento('pago_1'))
+        await _esperar_lotes(procesar, 2)
+
+        # Ya registrado: un nuevo reenvío se descarta
+        assert cola.encolar(_evento('pago_1'))
+        await asyncio.sleep(0.05)
+        await cola.detener()
+
+    asyncio.run(probar())
+
+    assert procesar.lotes == [['pago_1'], ['pago_1']]
+
+
+def test_reenvio_de_un_pago_todavia_encolado_se_descarta(monkeypatch):
+    procesar = _procesador(fallas=0)
+    monkeypatch.setattr(webhooks_pst, 'procesar_webhooks_pst_net', procesar)
+    cola = ColaWebhooksPst(lote=10, espera=0.2)
+
+    async def probar():
+        await cola.iniciar(supabase=None)
+        for pago_id in ('pago_1', 'pago_1', 'pago_2'):
+            assert cola.encolar(_evento(pago_id))
+        await _esperar_lotes(procesar, 1)
+        await cola.detener()
+
+    asyncio.run(probar())
+
+    assert procesar.lotes == [['pago_1', 'pago_2']]
+
+
+def test_lote_con_pagos_fallidos_no_se_recuerda(monkeypatch):
+    def procesar(eventos, supabase):
+        procesar.lotes.append([evento['data']['id'] for evento in eventos])
+        return {'total': len(eventos), 'exitosos': 0, 'fallidos': len(eventos)}
+
+    procesar.lotes = []
+    monkeypatch.setattr(webhooks_pst, 'procesar_webhooks_pst_net', procesar)
+    cola = ColaWebhooksPst(lote=10, espera=0)
+
+    async def probar():
+        await cola.iniciar(supabase=None)
+        cola.encolar(_evento('pago_1'))
+        await _esperar_lotes(procesar, 1)
+        cola.encolar(_evento('pago_1'))
+        await _esperar_lotes(procesar, 2)
+        await cola.detener()
+
+    asyncio.run(probar())
+
+    assert procesar.lotes == [['pago_1'], ['pago_1']]
+
+
+def test_sin_iniciar_rechaza():
+    assert not ColaWebhooksPst().encolar(_evento('pago_1'))